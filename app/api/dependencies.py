@@ -6,7 +6,7 @@ from fastapi import Header, HTTPException, Request, status
 from redis.exceptions import RedisError
 
 from app.core.config import get_settings
-from app.core.redis_client import get_redis_client
+from app.core.redis_client import get_async_redis_client
 
 logger = logging.getLogger(__name__)
 
@@ -20,24 +20,28 @@ def require_service_api_key(x_api_key: str = Header(..., alias="X-API-Key")) ->
     return x_api_key
 
 
-def enforce_rate_limit(api_key: str, request: Request) -> None:
+async def enforce_rate_limit(api_key: str, request: Request) -> None:
     settings = get_settings()
-    redis_client = get_redis_client()
+    redis_client = get_async_redis_client()
     client_host = request.client.host if request.client else "unknown"
     key = f"rl:{api_key}:{client_host}"
     try:
-        current = redis_client.incr(key)
-        if current == 1:
-            redis_client.expire(key, settings.rate_limit_window_seconds)
-        if current > settings.rate_limit_max_requests:
-            ttl = redis_client.ttl(key)
-            retry_after = ttl if ttl and ttl > 0 else settings.rate_limit_window_seconds
-            raise HTTPException(
-                status_code=429,
-                detail=f"Rate limit exceeded. Try again in {retry_after} seconds.",
-            )
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.ttl(key)
+            current, ttl = await pipe.execute()
+        if ttl == -1:
+            await redis_client.expire(key, settings.rate_limit_window_seconds)
+            ttl = settings.rate_limit_window_seconds
     except RedisError:
         logger.warning("Redis unavailable for rate limiting; allowing request", exc_info=True)
+        return
+    if current > settings.rate_limit_max_requests:
+        retry_after = ttl if ttl and ttl > 0 else settings.rate_limit_window_seconds
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded. Try again in {retry_after} seconds.",
+        )
 
 
 def validate_diff_size(diff: str | None) -> None:
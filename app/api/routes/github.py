@@ -2,17 +2,27 @@ from __future__ import annotations
 
 import hashlib
 import hmac
-import json
 import logging
+from datetime import timedelta
 from typing import Set
 
+import orjson
 from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.core.db import SessionLocal
-from app.services.review_service import create_review_request
-from app.workers.queue import review_queue
+from app.core.db import AsyncSessionLocal
+from app.models.review_request import generate_uuid
+from app.services.admission import ADMISSION_DECISIONS, check_admission, overload_debounce_seconds
+from app.services.github_deliveries import claim_delivery, record_delivery, release_delivery
+from app.services.review_coalescing import register_latest_review_async
+from app.services.review_service import (
+    create_review_request_async,
+    fail_unqueued_review_async,
+    supersede_pending_review_async,
+)
+from app.services.webhook_ingest import PullRequestEvent, buffer_event
+from app.workers.queue import cancel_pending_job_async, enqueue_review_async, select_review_queue
 from app.workers.review_worker import process_review_job
 
 logger = logging.getLogger(__name__)
@@ -21,12 +31,9 @@ HANDLED_ACTIONS: Set[str] = {"opened", "synchronize", "ready_for_review"}
 router = APIRouter(prefix="/github", tags=["github"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def _is_valid_signature(secret: str, payload: bytes, signature: str | None) -> bool:
@@ -41,7 +48,8 @@ async def github_webhook(
     request: Request,
     x_github_event: str = Header(..., alias="X-GitHub-Event"),
     x_hub_signature_256: str | None = Header(None, alias="X-Hub-Signature-256"),
-    db: Session = Depends(get_db),
+    x_github_delivery: str | None = Header(None, alias="X-GitHub-Delivery"),
+    db: AsyncSession = Depends(get_db),
 ):
     settings = get_settings()
     if not settings.github_webhook_secret:
@@ -54,44 +62,113 @@ async def github_webhook(
     if x_github_event != "pull_request":
         return {"status": "ignored", "reason": f"event {x_github_event} not handled"}
 
+    # Redeliveries and proxy retries reuse the delivery id; answer them from Redis
+    # without touching the database or the queue.
+    claimed, original_review_id = await claim_delivery(x_github_delivery)
+    if not claimed:
+        logger.info("Duplicate GitHub delivery %s (review %s)", x_github_delivery, original_review_id)
+        return {"status": "duplicate", "review_id": original_review_id}
+
     try:
-        payload = json.loads(raw_body)
-    except json.JSONDecodeError as exc:
+        payload = orjson.loads(raw_body)
+    except orjson.JSONDecodeError as exc:
+        await release_delivery(x_github_delivery)
         raise HTTPException(status_code=400, detail="Invalid JSON payload") from exc
 
-    action = payload.get("action")
-    if action not in HANDLED_ACTIONS:
-        return {"status": "ignored", "reason": f"action {action} not handled"}
+    event = PullRequestEvent.from_payload(payload)
+    if event.action not in HANDLED_ACTIONS:
+        return {"status": "ignored", "reason": f"action {event.action} not handled"}
 
-    pull_request = payload.get("pull_request") or {}
-    repository = payload.get("repository") or {}
-    repo_full_name = repository.get("full_name")
-    pr_number = pull_request.get("number")
-
-    if not repo_full_name or not pr_number:
+    if not event.repo_full_name or not event.pr_number:
+        await release_delivery(x_github_delivery)
         raise HTTPException(status_code=400, detail="Missing repository or pull request information")
 
-    review = create_review_request(
-        db,
-        source="github",
-        diff=None,
-        repo=repo_full_name,
-        pr_number=pr_number,
-    )
-
-    review_queue.enqueue(
-        process_review_job,
-        review.id,
-        job_id=review.id,
-        description=f"Process review {review.id}",
-    )
+    # GitHub does not retry on 503, so an overloaded queue never rejects a webhook:
+    # draft PRs are dropped and, in direct mode, everything else is debounced for longer.
+    decision = await check_admission(select_review_queue("github", event.changed_lines).name)
+    if not decision.admitted and event.draft:
+        ADMISSION_DECISIONS.labels(endpoint="github", decision="shed").inc()
+        await release_delivery(x_github_delivery)
+        logger.warning(
+            "Shed draft PR %s#%s: review queue %s is overloaded (depth=%s, drain=%.0fs)",
+            event.repo_full_name,
+            event.pr_number,
+            decision.load.queue,
+            decision.load.depth,
+            decision.load.drain_seconds,
+        )
+        return {"status": "shed", "reason": "review queue overloaded"}
+
+    if settings.github_ingest_mode == "stream":
+        # Write-behind: ingest_worker persists and enqueues buffered events in batches.
+        review_id = generate_uuid()
+        try:
+            await buffer_event(event, review_id, x_github_delivery)
+        except Exception:
+            await release_delivery(x_github_delivery)
+            raise
+        await record_delivery(x_github_delivery, review_id)
+        ADMISSION_DECISIONS.labels(endpoint="github", decision="admitted").inc()
+        return {"status": "accepted", "review_id": review_id}
+
+    delay = settings.github_webhook_debounce_seconds
+    if decision.admitted:
+        ADMISSION_DECISIONS.labels(endpoint="github", decision="admitted").inc()
+    else:
+        ADMISSION_DECISIONS.labels(endpoint="github", decision="coalesced").inc()
+        delay = overload_debounce_seconds(decision, delay)
+    review = None
+    try:
+        review = await create_review_request_async(
+            db,
+            source="github",
+            diff=None,
+            repo=event.repo_full_name,
+            pr_number=event.pr_number,
+            installation_id=event.installation_id,
+            head_sha=event.head_sha,
+        )
+
+        previous_id = await register_latest_review_async(event.repo_full_name, event.pr_number, review.id)
+        if previous_id:
+            await cancel_pending_job_async(previous_id)
+            await supersede_pending_review_async(db, previous_id)
+            logger.info(
+                "Review %s superseded by %s for %s#%s",
+                previous_id,
+                review.id,
+                event.repo_full_name,
+                event.pr_number,
+            )
+
+        await enqueue_review_async(
+            review.id,
+            process_review_job,
+            source="github",
+            changed_lines=event.changed_lines,
+            repo=event.repo_full_name,
+            installation_id=event.installation_id,
+            delay=timedelta(seconds=delay) if delay > 0 else None,
+        )
+    except Exception:
+        if review is not None:
+            # GitHub does not redeliver on its own, so the committed review would stay pending forever.
+            try:
+                await fail_unqueued_review_async(db, review.id)
+            except Exception:
+                logger.exception("Failed to mark unqueued review %s as failed", review.id)
+        await release_delivery(x_github_delivery)
+        raise
+    await record_delivery(x_github_delivery, review.id)
 
     logger.info(
-        "Queued GitHub review %s for %s#%s (action=%s)",
+        "Queued GitHub review %s for %s#%s at %s (action=%s, delay=%ss)",
         review.id,
-        repo_full_name,
-        pr_number,
-        action,
+        event.repo_full_name,
+        event.pr_number,
+        event.head_sha,
+        event.action,
+        delay,
     )
 
     return {"status": "queued", "review_id": review.id}
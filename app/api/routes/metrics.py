@@ -0,0 +1,22 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.routes.reviews import get_db
+from app.schemas.metrics_schemas import MetricsResponse
+from app.services.metrics_rollups import get_metrics_summary
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_model=MetricsResponse)
+def get_metrics(
+    days: int = Query(30, ge=1, le=365),
+    repo: Optional[str] = None,
+    pipeline: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> MetricsResponse:
+    """Review, finding and LLM totals of the last ``days`` days, read from the daily rollups."""
+
+    return get_metrics_summary(db, days=days, repo=repo, pipeline=pipeline)
@@ -1,7 +1,12 @@
-import json
-from typing import List
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+import orjson
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import (
@@ -9,15 +14,37 @@ from app.api.dependencies import (
     require_service_api_key,
     validate_diff_size,
 )
-from app.core.db import SessionLocal
+from app.core.db import AsyncSessionLocal, SessionLocal
+from app.core.redis_client import get_async_redis_client
+from app.models.review_request import ReviewRequest
 from app.schemas.review_schemas import (
-    ReviewComment,
+    ReviewCommentPage,
     ReviewCreateRequest,
-    ReviewMetrics,
+    ReviewImportResponse,
+    ReviewListResponse,
     ReviewResponse,
+    ReviewSummary,
+)
+from app.services.admission import ADMISSION_DECISIONS, check_admission
+from app.services.review_cache import cache_response, etag_matches, get_cached_response
+from app.services.review_comments import list_review_comments, to_schema
+from app.services.review_events import channel, stream_events
+from app.services.review_export import (
+    ImportReport,
+    InvalidRecordError,
+    import_review_batch,
+    iter_review_records,
+    parse_records,
 )
-from app.services.review_service import create_review_request, get_review_with_result
-from app.workers.queue import review_queue
+from app.services.review_service import (
+    InvalidCursorError,
+    build_review_response,
+    create_review_request_async,
+    get_review_status_async,
+    get_review_with_result,
+    list_reviews,
+)
+from app.workers.queue import enqueue_review_async, estimate_changed_lines, select_review_queue
 from app.workers.review_worker import process_review_job
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
@@ -31,21 +58,37 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 @router.post("", response_model=ReviewResponse, status_code=201)
-def submit_review_request(
+async def submit_review_request(
     payload: ReviewCreateRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     api_key: str = Depends(require_service_api_key),
 ) -> ReviewResponse:
-    enforce_rate_limit(api_key, request)
+    await enforce_rate_limit(api_key, request)
 
     if payload.source == "manual" and not payload.diff:
         raise HTTPException(status_code=400, detail="diff is required for manual source")
 
     validate_diff_size(payload.diff)
 
-    review = create_review_request(
+    changed_lines = estimate_changed_lines(payload.diff)
+    decision = await check_admission(select_review_queue(payload.source, changed_lines).name)
+    if not decision.admitted:
+        ADMISSION_DECISIONS.labels(endpoint="reviews", decision="rejected").inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Review queue is overloaded, retry later",
+            headers={"Retry-After": str(decision.retry_after)},
+        )
+    ADMISSION_DECISIONS.labels(endpoint="reviews", decision="admitted").inc()
+
+    review = await create_review_request_async(
         db,
         source=payload.source,
         diff=payload.diff,
@@ -53,11 +96,12 @@ def submit_review_request(
         pr_number=payload.pr_number,
     )
 
-    review_queue.enqueue(
-        process_review_job,
+    await enqueue_review_async(
         review.id,
-        job_id=review.id,
-        description=f"Process review {review.id}",
+        process_review_job,
+        source=payload.source,
+        changed_lines=changed_lines,
+        repo=payload.repo,
     )
 
     return ReviewResponse(
@@ -72,44 +116,197 @@ def submit_review_request(
     )
 
 
-@router.get("/{review_id}", response_model=ReviewResponse)
-def get_review(review_id: str, db: Session = Depends(get_db)) -> ReviewResponse:
-    review, result = get_review_with_result(db, review_id)
-    if not review:
+@router.get("", response_model=ReviewListResponse)
+def list_review_requests(
+    status: Optional[str] = None,
+    repo: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(25, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> ReviewListResponse:
+    try:
+        rows, next_cursor = list_reviews(
+            db,
+            status=status,
+            repo=repo,
+            source=source,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    items = [
+        ReviewSummary(
+            id=row.id,
+            source=row.source,
+            status=row.status,
+            repo=row.repo,
+            pr_number=int(row.pr_number) if row.pr_number and row.pr_number.isdigit() else None,
+            head_sha=row.head_sha,
+            diff_size=row.diff_size,
+            created_at=row.created_at.isoformat() if row.created_at else None,
+            updated_at=row.updated_at.isoformat() if row.updated_at else None,
+        )
+        for row in rows
+    ]
+    return ReviewListResponse(items=items, next_cursor=next_cursor)
+
+
+def _export_lines(**filters) -> Iterator[bytes]:
+    # The stream outlives the request's dependencies, so it owns its session.
+    db = SessionLocal()
+    try:
+        for record in iter_review_records(db, **filters):
+            yield orjson.dumps(record) + b"\n"
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_reviews(
+    status: Optional[str] = None,
+    repo: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    include_diff: bool = False,
+    api_key: str = Depends(require_service_api_key),
+) -> StreamingResponse:
+    """Matching reviews with their results as NDJSON, oldest first, in constant memory."""
+
+    return StreamingResponse(
+        _export_lines(
+            status=status,
+            repo=repo,
+            source=source,
+            created_after=created_after,
+            created_before=created_before,
+            include_diff=include_diff,
+        ),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="reviews.ndjson"'},
+    )
+
+
+async def _request_lines(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+@router.post("/import", response_model=ReviewImportResponse)
+async def import_reviews(
+    request: Request,
+    batch_size: int = Query(500, ge=1, le=5000),
+    api_key: str = Depends(require_service_api_key),
+) -> ReviewImportResponse:
+    """Insert NDJSON records in the export format, one transaction per batch; existing ids are skipped."""
+
+    report = ImportReport()
+    db = SessionLocal()
+
+    async def _import(lines, first_line: int) -> None:
+        records = list(parse_records(lines, first_line))
+        if records:
+            batch_report = await asyncio.to_thread(import_review_batch, db, records)
+            report.imported += batch_report.imported
+            report.skipped += batch_report.skipped
+
+    try:
+        lines, first_line, number = [], 1, 0
+        async for line in _request_lines(request):
+            number += 1
+            lines.append(line)
+            if len(lines) >= batch_size:
+                await _import(lines, first_line)
+                lines, first_line = [], number + 1
+        await _import(lines, first_line)
+    except InvalidRecordError as exc:
+        raise HTTPException(
+            status_code=400, detail=f"{exc}; {report.imported} review(s) imported before it"
+        ) from exc
+    finally:
+        await asyncio.to_thread(db.close)
+    return ReviewImportResponse(imported=report.imported, skipped=report.skipped)
+
+
+@router.get("/{review_id}/comments", response_model=ReviewCommentPage)
+def list_comments(
+    review_id: str,
+    severity: Optional[str] = None,
+    category: Optional[str] = None,
+    file_path: Optional[str] = None,
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> ReviewCommentPage:
+    """Findings of one review in pipeline order, filtered and paged in SQL."""
+
+    rows, next_cursor = list_review_comments(
+        db,
+        review_id,
+        severity=severity,
+        category=category,
+        file_path=file_path,
+        after=cursor,
+        limit=limit,
+    )
+    if not rows and cursor is None and db.get(ReviewRequest, review_id) is None:
         raise HTTPException(status_code=404, detail="Review request not found")
+    return ReviewCommentPage(items=[to_schema(row) for row in rows], next_cursor=next_cursor)
 
-    comments: List[ReviewComment] = []
-    agents: List[str] = []
-    metrics: ReviewMetrics | None = None
-    if result and result.raw_response:
-        try:
-            parsed = json.loads(result.raw_response)
-            if isinstance(parsed, list):
-                comments = [ReviewComment(**comment) for comment in parsed]
-            elif isinstance(parsed, dict):
-                payload = parsed.get("comments", [])
-                metadata = parsed.get("metadata", {})
-                if isinstance(payload, list):
-                    comments = [ReviewComment(**comment) for comment in payload]
-                if isinstance(metadata, dict):
-                    agents = [str(agent) for agent in metadata.get("agents_run", [])]
-                    severity_breakdown = metadata.get("severity_breakdown", {})
-                    metrics = ReviewMetrics(
-                        total_comments=metadata.get("total_comments", 0),
-                        files_reviewed=metadata.get("files_reviewed", 0),
-                        severity_breakdown={str(k): int(v) for k, v in severity_breakdown.items()},
-                        categories_detected=[str(cat) for cat in metadata.get("categories_detected", [])],
-                    )
-        except json.JSONDecodeError:
-            comments = []
 
-    return ReviewResponse(
-        id=review.id,
-        status=review.status,
-        summary=result.summary if result else None,
-        comments=comments,
-        agents=agents,
-        metrics=metrics,
-        created_at=review.created_at.isoformat() if review.created_at else None,
-        updated_at=review.updated_at.isoformat() if review.updated_at else None,
+@router.get("/{review_id}/events")
+async def stream_review_events(review_id: str, request: Request) -> StreamingResponse:
+    """Server-sent events: ``status`` on every transition and ``finding`` per stored comment."""
+
+    # Subscribe before reading the status so no transition can slip in between.
+    pubsub = get_async_redis_client().pubsub()
+    try:
+        await pubsub.subscribe(channel(review_id))
+        # A short-lived session: the stream can stay open for minutes.
+        async with AsyncSessionLocal() as db:
+            status = await get_review_status_async(db, review_id)
+    except BaseException:
+        # No stream will own the subscribed connection, so give it back here.
+        await pubsub.aclose()
+        raise
+    if status is None:
+        await pubsub.aclose()
+        raise HTTPException(status_code=404, detail="Review request not found")
+
+    return StreamingResponse(
+        stream_events(review_id, status, pubsub, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@router.get("/{review_id}", response_model=ReviewResponse)
+def get_review(
+    review_id: str,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    db: Session = Depends(get_db),
+) -> Response:
+    cached = get_cached_response(review_id)
+    if cached is None:
+        review, result = get_review_with_result(db, review_id)
+        if not review:
+            raise HTTPException(status_code=404, detail="Review request not found")
+        cached = cache_response(build_review_response(review, result))
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -6,13 +6,11 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import HTMLResponse
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
 from app.core.db import SessionLocal
-from app.models.review_request import ReviewRequest
 from app.schemas.review_schemas import ReviewComment
-from app.services.review_service import get_review_with_result
+from app.services.review_service import get_review_with_result, list_reviews as list_review_page
 
 router = APIRouter(prefix="/ui", tags=["ui"])
 
@@ -53,12 +51,7 @@ def _layout(body: str) -> HTMLResponse:
 
 @router.get("/reviews", response_class=HTMLResponse)
 def list_reviews(db: Session = Depends(get_db)) -> HTMLResponse:
-    reviews = (
-        db.query(ReviewRequest)
-        .order_by(desc(ReviewRequest.created_at))
-        .limit(25)
-        .all()
-    )
+    reviews, _ = list_review_page(db, limit=25)
 
     rows = "".join(
         f"<tr><td><a href='/ui/reviews/{r.id}'>{r.id}</a></td>"
@@ -17,14 +17,150 @@ class Settings(BaseSettings):
             "For local development you can paste a classic PAT here."
         ),
     )
+    github_app_token_refresh_margin_seconds: int = Field(
+        default=600, description="Refresh cached installation tokens in the background this long before expiry"
+    )
     github_webhook_secret: str | None = Field(default=None, description="Shared secret for GitHub webhooks")
+    github_webhook_debounce_seconds: int = Field(
+        default=10,
+        description="Delay before a webhook-triggered review starts; newer pushes to the PR replace it (0 disables)",
+    )
+    github_delivery_ttl_seconds: int = Field(
+        default=72 * 3600, description="How long X-GitHub-Delivery ids are remembered for webhook dedup"
+    )
+    github_ingest_mode: str = Field(
+        default="direct",
+        description="direct: webhooks insert and enqueue inline; stream: buffer in a Redis Stream for ingest_worker",
+    )
+    github_ingest_batch_size: int = Field(default=200, description="Maximum webhook events persisted per ingest batch")
+    github_ingest_block_ms: int = Field(default=1000, description="How long the ingest consumer waits for new events")
+    github_ingest_claim_idle_seconds: int = Field(
+        default=60, description="Idle time after which unacknowledged ingest entries are taken over by another consumer"
+    )
+    github_ingest_stream_maxlen: int = Field(
+        default=100_000, description="Approximate cap on buffered webhook events kept in the ingest stream"
+    )
     github_api_base: str = Field(default="https://api.github.com", description="Base URL for GitHub API")
+    github_rate_limit_enabled: bool = Field(
+        default=True, description="Track GitHub quota headers in Redis and pace/defer calls across workers"
+    )
+    github_rate_limit_reserve: int = Field(
+        default=50, description="Requests kept in reserve per token; jobs are deferred to the reset below this"
+    )
+    github_rate_limit_pace_threshold: int = Field(
+        default=500, description="Remaining quota below which requests are spread evenly until the reset"
+    )
+    github_rate_limit_max_pace_seconds: float = Field(
+        default=5.0, description="Upper bound on the pacing delay applied to a single GitHub request"
+    )
+    github_diff_strategy: str = Field(
+        default="auto", description="How PR diffs are fetched: diff, files, or auto (diff with files fallback)"
+    )
+    github_files_concurrency: int = Field(default=8, description="Parallel requests when paging the PR files API")
+    github_files_per_page: int = Field(default=100, description="Page size for the PR files API (max 100)")
+    review_interactive_max_lines: int = Field(
+        default=400, description="Manual submissions up to this many changed lines use the reviews-interactive queue"
+    )
+    review_small_max_lines: int = Field(
+        default=800, description="Reviews up to this many changed lines use reviews-small; larger ones reviews-large"
+    )
+    review_interactive_timeout_seconds: int = Field(default=120, description="Job timeout for reviews-interactive")
+    review_small_timeout_seconds: int = Field(default=300, description="Job timeout for reviews-small")
+    review_large_timeout_seconds: int = Field(default=1800, description="Job timeout for reviews-large")
+    review_lease_seconds: int = Field(
+        default=2100,
+        description="A review running this long has lost its worker and is marked failed by maintenance (0 disables)",
+    )
+    fair_scheduling_enabled: bool = Field(
+        default=False, description="Dispatch reviews round-robin across tenants via app.workers.fair_dispatcher"
+    )
+    fair_scheduling_queues: str = Field(
+        default="reviews-small,reviews-large", description="Comma-separated review queues under fair scheduling"
+    )
+    fair_tenant_key: str = Field(default="repo", description="What a tenant is for fair scheduling: repo or installation")
+    fair_max_in_flight_per_tenant: int = Field(default=2, description="Dispatched, unfinished reviews allowed per tenant")
+    fair_tenant_weights: str = Field(
+        default="", description="Per-tenant weights, e.g. 'repo:org/api=3,installation:42=2' (default weight 1)"
+    )
+    fair_dispatch_buffer: int = Field(
+        default=4, description="Jobs the dispatcher keeps waiting in each RQ queue; keep close to the worker count"
+    )
+    fair_dispatch_interval_ms: int = Field(default=200, description="Fair dispatcher poll interval when idle")
+    async_worker_concurrency: int = Field(
+        default=32, description="Jobs one app.workers.async_worker process keeps in flight at once"
+    )
+    queue_metrics_interval_seconds: int = Field(
+        default=15, description="How often app.workers.queue_metrics reads the RQ registries"
+    )
+    admission_control_enabled: bool = Field(
+        default=True, description="Reject or shed new reviews when their queue is over the thresholds below"
+    )
+    admission_max_queue_depth: int = Field(
+        default=500, description="Waiting reviews in a queue at which admission control kicks in"
+    )
+    admission_max_drain_seconds: int = Field(
+        default=900, description="Estimated queue drain time at which admission control kicks in"
+    )
+    admission_throughput_window_seconds: int = Field(
+        default=300, description="Window of recent completions used to estimate queue throughput"
+    )
+    admission_min_retry_after_seconds: int = Field(
+        default=30, description="Smallest Retry-After returned to rejected submissions"
+    )
+    admission_max_coalesce_seconds: int = Field(
+        default=300, description="Longest debounce applied to webhook reviews while their queue is overloaded"
+    )
+    diff_compression_level: int = Field(default=6, ge=1, le=9, description="zlib level for stored review diffs")
+    diff_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="Size of the per-process LRU cache of decompressed diffs"
+    )
+    review_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600, description="How long serialized responses of finished reviews stay cached in Redis"
+    )
+    review_events_findings_enabled: bool = Field(
+        default=True, description="Publish each finding on /reviews/{id}/events, not only status changes"
+    )
+    db_pool_size: int = Field(default=10, description="Connections kept open per process (server databases)")
+    db_max_overflow: int = Field(default=20, description="Extra connections opened above db_pool_size under load")
+    db_pool_timeout_seconds: float = Field(default=30.0, description="How long a checkout waits for a free connection")
+    db_pool_recycle_seconds: int = Field(
+        default=1800, description="Reconnect connections older than this (stays below server/proxy idle limits)"
+    )
+    db_pool_pre_ping: bool = Field(default=True, description="Test pooled connections before use (server databases)")
+    db_statement_timeout_ms: int = Field(default=30_000, description="Postgres statement_timeout (0 disables)")
+    sqlite_journal_mode: str = Field(default="WAL", description="SQLite journal_mode; WAL lets readers run during writes")
+    sqlite_synchronous: str = Field(default="NORMAL", description="SQLite synchronous level (NORMAL is safe with WAL)")
+    sqlite_busy_timeout_ms: int = Field(
+        default=15_000, description="How long a SQLite write waits for the lock held by another process"
+    )
+    sqlite_mmap_size_bytes: int = Field(default=256 * 1024 * 1024, description="SQLite mmap_size (0 disables)")
+    retention_review_days: int = Field(
+        default=180, description="Archive and delete finished reviews older than this many days (0 keeps them)"
+    )
+    retention_diff_days: int = Field(
+        default=14, description="Drop diffs of completed reviews older than this many days (0 keeps them)"
+    )
+    retention_archive_dir: str | None = Field(
+        default="./archive", description="Where deleted reviews are written as gzip JSONL; empty deletes without archiving"
+    )
+    retention_batch_size: int = Field(default=500, ge=1, description="Rows handled per retention transaction")
+    retention_batch_pause_seconds: float = Field(
+        default=0.5, description="Pause between retention batches so live traffic keeps the database"
+    )
+    retention_max_batches: int = Field(default=200, description="Upper bound on batches per retention run")
+    retention_interval_seconds: int = Field(default=3600, description="Delay between scheduled retention runs")
+    retention_job_timeout_seconds: int = Field(default=3600, description="RQ timeout of one retention run")
     service_api_key: str | None = Field(default=None, description="API key required for write endpoints")
     max_diff_chars: int = Field(default=200000, description="Maximum allowed diff size for manual submissions")
     rate_limit_window_seconds: int = Field(default=60)
     rate_limit_max_requests: int = Field(default=30)
     github_comment_sync_enabled: bool = Field(default=False)
     github_comment_max_inline: int = Field(default=10)
+    github_sync_concurrency: int = Field(
+        default=4, description="Maximum GitHub publish jobs running at once across all github-sync workers"
+    )
+    github_sync_max_retries: int = Field(default=3, description="Retries for failed GitHub publish jobs")
+    github_sync_timeout_seconds: int = Field(default=120, description="Job timeout for the github-sync queue")
     log_level: str = Field(default="INFO", description="Application log level")
     enable_prometheus_metrics: bool = Field(default=True)
     prometheus_metrics_path: str = Field(default="/metrics")
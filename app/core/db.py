@@ -1,15 +1,147 @@
-from sqlalchemy import create_engine
+import time
+from typing import Any, Dict
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled database connections by state",
+    ["engine", "state"],
+    multiprocess_mode="livesum",
+)
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(engine=self.logging_name or "default").observe(time.perf_counter() - started)
+
+
+class _TimedAsyncQueuePool(_TimedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync SQLAlchemy URL onto the matching asyncio driver."""
+
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+
+def engine_options(url: str, config: Settings, *, is_async: bool = False) -> Dict[str, Any]:
+    """``create_engine`` keyword arguments for the database profile matching ``url``.
+
+    SQLite gets a busy timeout so concurrent writers from the API and the workers
+    wait for the lock instead of failing. Server databases get a sized,
+    pre-pinged, recycled pool and, on Postgres, a statement timeout.
+    """
+
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        options: Dict[str, Any] = {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": config.sqlite_busy_timeout_ms / 1000,
+            }
+        }
+        if not _is_memory_sqlite(url):
+            options["poolclass"] = _TimedAsyncQueuePool if is_async else _TimedQueuePool
+        return options
+
+    options = {
+        "poolclass": _TimedAsyncQueuePool if is_async else _TimedQueuePool,
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout_seconds,
+        "pool_recycle": config.db_pool_recycle_seconds,
+        "pool_pre_ping": config.db_pool_pre_ping,
+    }
+    if backend == "postgresql" and config.db_statement_timeout_ms:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(config.db_statement_timeout_ms)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={config.db_statement_timeout_ms}"}
+    return options
+
+
+def configure_engine(engine: Engine, config: Settings) -> Engine:
+    """Apply per-connection SQLite pragmas and export pool usage gauges for ``engine``."""
+
+    if engine.dialect.name == "sqlite":
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(f"PRAGMA journal_mode={config.sqlite_journal_mode}")
+                cursor.execute(f"PRAGMA synchronous={config.sqlite_synchronous}")
+                cursor.execute(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}")
+                cursor.execute(f"PRAGMA mmap_size={int(config.sqlite_mmap_size_bytes)}")
+            finally:
+                cursor.close()
+
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        name = pool.logging_name or "default"
+
+        def _record_usage(returning: int) -> None:
+            checked_out = pool.checkedout() - returning
+            idle = min(pool.checkedin() + returning, pool.size())
+            DB_POOL_CONNECTIONS.labels(engine=name, state="checked_out").set(checked_out)
+            DB_POOL_CONNECTIONS.labels(engine=name, state="idle").set(idle)
+            DB_POOL_CONNECTIONS.labels(engine=name, state="overflow").set(max(checked_out + idle - pool.size(), 0))
+
+        event.listen(engine, "checkout", lambda *args: _record_usage(0))
+        # "checkin" fires before the connection is back in the pool.
+        event.listen(engine, "checkin", lambda *args: _record_usage(1))
+    return engine
+
+
+engine = configure_engine(
+    create_engine(settings.database_url, pool_logging_name="sync", **engine_options(settings.database_url, settings)),
+    settings,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Used by the ingest routes so DB round trips never block the event loop.
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    pool_logging_name="async",
+    **engine_options(async_database_url(settings.database_url), settings, is_async=True),
+)
+configure_engine(async_engine.sync_engine, settings)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
@@ -0,0 +1,93 @@
+"""Prometheus plumbing for worker processes, including forked RQ work horses.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set, prometheus_client keeps every metric value
+in a per-process mmap file. Increments made inside a forked job process then
+survive the fork, and :func:`start_metrics_server` serves the merged values of
+all processes. Every job runs in its own process, and each one leaves files
+behind. :func:`compact_process_files` folds a finished job process's files into
+one archive per worker, so the directory stays small.
+
+The variable must be set in the environment before the process starts, because
+prometheus_client decides on the storage backend when it is imported.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+from typing import Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, start_http_server
+from prometheus_client.mmap_dict import MmapedDict
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+
+logger = logging.getLogger(__name__)
+
+# Metric types whose values from dead processes must keep counting.
+_ACCUMULATED_TYPES = ("counter", "histogram", "summary")
+
+
+def multiprocess_dir() -> Optional[str]:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def reset_multiprocess_dir() -> None:
+    """Remove files left by a previous run; call once at start-up, before any job runs.
+
+    Files of the current process are kept: metrics created at import time are
+    already mapped to them.
+    """
+
+    path = multiprocess_dir()
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    own_suffix = f"_{os.getpid()}.db"
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        if not stale.endswith(own_suffix):
+            os.remove(stale)
+
+
+def metrics_registry() -> CollectorRegistry:
+    path = multiprocess_dir()
+    if not path:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=path)
+    return registry
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve ``/metrics`` on ``port``, merged across processes in multiprocess mode."""
+
+    start_http_server(port, registry=metrics_registry())
+    logger.info("Serving metrics on :%d (multiprocess=%s)", port, bool(multiprocess_dir()))
+
+
+def compact_process_files(pid: int, archive_id: Optional[int] = None) -> None:
+    """Fold the metric files of the exited process ``pid`` into this process's archive files.
+
+    Counter, histogram and summary values are added to ``<type>_archive-<archive_id>.db``.
+    The process's own files are then deleted. Live gauges of ``pid`` are dropped
+    as well. Only the process owning the archive may call this, because mmap
+    files are not safe for concurrent writers.
+    """
+
+    path = multiprocess_dir()
+    if not path:
+        return
+    archive_id = os.getpid() if archive_id is None else archive_id
+    for typ in _ACCUMULATED_TYPES:
+        source = os.path.join(path, f"{typ}_{pid}.db")
+        if not os.path.exists(source):
+            continue
+        archive = MmapedDict(os.path.join(path, f"{typ}_archive-{archive_id}.db"))
+        try:
+            for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(source):
+                current, _ = archive.read_value(key)
+                archive.write_value(key, current + value, timestamp)
+        finally:
+            archive.close()
+        os.remove(source)
+    mark_process_dead(pid, path)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from functools import lru_cache
 
 import redis
+import redis.asyncio
 
 from app.core.config import get_settings
 
@@ -11,3 +12,9 @@ from app.core.config import get_settings
 def get_redis_client() -> redis.Redis:
     settings = get_settings()
     return redis.from_url(settings.redis_url)
+
+
+@lru_cache()
+def get_async_redis_client() -> redis.asyncio.Redis:
+    settings = get_settings()
+    return redis.asyncio.from_url(settings.redis_url)
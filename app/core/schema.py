@@ -0,0 +1,62 @@
+"""Bring an existing database up to date with the models.
+
+``create_all`` creates missing tables but never alters tables that already
+exist, so databases created before a model gained columns or indexes need
+them added. :func:`upgrade_schema` does that. It only adds: it never drops or
+changes a column, and running it again does nothing.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import List
+
+from sqlalchemy import MetaData, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade_schema(engine: Engine, metadata: MetaData) -> List[str]:
+    """Create missing tables, columns and indexes; returns a description of each change made."""
+
+    existing_tables = set(inspect(engine).get_table_names())
+    metadata.create_all(bind=engine)
+    applied = [f"CREATE TABLE {table.name}" for table in metadata.sorted_tables if table.name not in existing_tables]
+
+    preparer = engine.dialect.identifier_preparer
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    logger.error(
+                        "Cannot add NOT NULL column %s.%s without a server default; add it by hand",
+                        table.name,
+                        column.name,
+                    )
+                    continue
+                definition = CreateColumn(column).compile(dialect=engine.dialect)
+                statement = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {definition}"
+                connection.exec_driver_sql(statement)
+                applied.append(statement)
+
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(bind=engine)
+                applied.append(f"CREATE INDEX {index.name}")
+
+    for change in applied:
+        logger.info("Schema upgrade: %s", change)
+    return applied
@@ -1,10 +1,39 @@
-import { ReviewRequest, CreateReviewPayload, PipelineConfig, MetricsData } from '../types';
+import {
+  ReviewRequest,
+  ReviewListFilters,
+  ReviewListPage,
+  ReviewSummary,
+  CreateReviewPayload,
+  PipelineConfig,
+  MetricsData,
+  MetricsFilters,
+} from '../types';
 
 // Safely access environment variable with fallback
 const API_BASE_URL = (typeof import.meta !== 'undefined' && import.meta.env?.VITE_API_BASE_URL) 
   ? import.meta.env.VITE_API_BASE_URL 
   : 'http://localhost:8000';
 
+// Listings are summaries; detail fields are filled in by getReview().
+function toReviewRequest(item: ReviewSummary): ReviewRequest {
+  return {
+    id: item.id,
+    source: item.source,
+    status: item.status,
+    repo_full_name: item.repo ?? undefined,
+    pull_request_number: item.pr_number ?? undefined,
+    comments: [],
+    review_metadata: {
+      total_comments: 0,
+      severity_counts: {} as ReviewRequest['review_metadata']['severity_counts'],
+      category_counts: {} as ReviewRequest['review_metadata']['category_counts'],
+      agents_used: [],
+    },
+    created_at: item.created_at,
+    updated_at: item.updated_at,
+  };
+}
+
 class ApiClient {
   private apiKey: string | null = null;
 
@@ -64,14 +93,20 @@ class ApiClient {
     return this.request<ReviewRequest>(`/api/v1/reviews/${id}`);
   }
 
-  async listReviews(): Promise<ReviewRequest[]> {
-    // Mock implementation for now - backend may not have this endpoint yet
-    try {
-      return await this.request<ReviewRequest[]>('/api/v1/reviews');
-    } catch {
-      // Return empty array if endpoint doesn't exist
-      return [];
-    }
+  async listReviewPage(filters: ReviewListFilters = {}): Promise<ReviewListPage> {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') {
+        params.set(key, String(value));
+      }
+    });
+    const query = params.toString();
+    return this.request<ReviewListPage>(`/api/v1/reviews${query ? `?${query}` : ''}`);
+  }
+
+  async listReviews(filters: ReviewListFilters = {}): Promise<{ reviews: ReviewRequest[]; nextCursor: string | null }> {
+    const page = await this.listReviewPage(filters);
+    return { reviews: page.items.map(toReviewRequest), nextCursor: page.next_cursor };
   }
 
   async getConfig(): Promise<PipelineConfig> {
@@ -92,57 +127,15 @@ class ApiClient {
     }
   }
 
-  async getMetrics(): Promise<MetricsData> {
-    // Mock implementation - would need to parse Prometheus metrics
-    try {
-      const response = await fetch(`${API_BASE_URL}/metrics`);
-      const text = await response.text();
-      
-      // Basic parsing of Prometheus format (simplified)
-      return this.parsePrometheusMetrics(text);
-    } catch {
-      return {
-        llm_requests_total: 0,
-        llm_errors_total: 0,
-        llm_latency_p95: 0,
-        llm_tokens_total: 0,
-        reviews_total: 0,
-        reviews_by_status: {
-          pending: 0,
-          running: 0,
-          completed: 0,
-          failed: 0,
-        },
-      };
-    }
-  }
-
-  private parsePrometheusMetrics(text: string): MetricsData {
-    // Simple parsing - in production, use a proper Prometheus parser
-    const lines = text.split('\n');
-    const metrics: MetricsData = {
-      llm_requests_total: 0,
-      llm_errors_total: 0,
-      llm_latency_p95: 0,
-      llm_tokens_total: 0,
-      reviews_total: 0,
-      reviews_by_status: {
-        pending: 0,
-        running: 0,
-        completed: 0,
-        failed: 0,
-      },
-    };
-
-    lines.forEach(line => {
-      if (line.startsWith('llm_requests_total')) {
-        const match = line.match(/llm_requests_total\s+([\d.]+)/);
-        if (match) metrics.llm_requests_total = parseFloat(match[1]);
+  async getMetrics(filters: MetricsFilters = {}): Promise<MetricsData> {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') {
+        params.set(key, String(value));
       }
-      // Add more parsing as needed
     });
-
-    return metrics;
+    const query = params.toString();
+    return this.request<MetricsData>(`/api/v1/metrics${query ? `?${query}` : ''}`);
   }
 
   async healthCheck(): Promise<{ status: string }> {
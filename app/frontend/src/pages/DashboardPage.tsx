@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { ReviewRequest } from '../types';
+import { ReviewRequest, ReviewSource, ReviewStatus } from '../types';
 import { ReviewCard } from '../components/dashboard/ReviewCard';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -15,25 +15,33 @@ export function DashboardPage() {
   const [searchQuery, setSearchQuery] = useState('');
   const [statusFilter, setStatusFilter] = useState<string>('all');
   const [sourceFilter, setSourceFilter] = useState<string>('all');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
+  // Status and source are filtered by the API; search applies to the loaded pages.
   useEffect(() => {
     loadReviews();
-  }, []);
+  }, [statusFilter, sourceFilter]);
 
   useEffect(() => {
     filterReviews();
   }, [reviews, searchQuery, statusFilter, sourceFilter]);
 
-  const loadReviews = async () => {
+  const loadReviews = async (cursor?: string) => {
     setLoading(true);
     try {
-      const data = await apiClient.listReviews();
-      setReviews(data);
+      const page = await apiClient.listReviews({
+        status: statusFilter !== 'all' ? (statusFilter as ReviewStatus) : undefined,
+        source: sourceFilter !== 'all' ? (sourceFilter as ReviewSource) : undefined,
+        cursor,
+      });
+      setReviews(previous => (cursor ? [...previous, ...page.reviews] : page.reviews));
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Failed to load reviews:', error);
       toast.error('Failed to load reviews');
       // Use mock data for demonstration
       setReviews(mockReviews);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
@@ -70,7 +78,7 @@ export function DashboardPage() {
               <h1 className="text-3xl mb-2">Mission Control</h1>
               <p className="text-muted-foreground">Monitor and manage all your code reviews</p>
             </div>
-            <Button onClick={loadReviews} disabled={loading}>
+            <Button onClick={() => loadReviews()} disabled={loading}>
               <RefreshCw className={`w-4 h-4 mr-2 ${loading ? 'animate-spin' : ''}`} />
               Refresh
             </Button>
@@ -157,6 +165,14 @@ export function DashboardPage() {
             ))}
           </div>
         )}
+
+        {nextCursor && !loading && (
+          <div className="text-center mt-6">
+            <Button variant="outline" onClick={() => loadReviews(nextCursor)}>
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
     </div>
   );
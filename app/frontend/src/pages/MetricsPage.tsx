@@ -239,10 +239,10 @@ export function MetricsPage() {
             <div className="p-4 rounded-lg bg-accent/50 border border-border">
               <div className="flex items-center gap-2 mb-2">
                 <Clock className="w-4 h-4 text-[var(--cockpit-purple)]" />
-                <span className="text-sm text-muted-foreground">Avg Response Time</span>
+                <span className="text-sm text-muted-foreground">Median Review Time</span>
               </div>
               <div className="text-2xl text-[var(--cockpit-purple)]">
-                {metrics?.llm_latency_p95 ? (metrics.llm_latency_p95 * 0.7).toFixed(2) : 0}s
+                {metrics?.review_duration_p50.toFixed(2) || 0}s
               </div>
             </div>
           </div>
@@ -254,10 +254,10 @@ export function MetricsPage() {
             <Activity className="w-5 h-5 text-[var(--cockpit-cyan)] flex-shrink-0 mt-0.5" />
             <div className="text-sm space-y-2">
               <p>
-                Metrics are collected from the Prometheus endpoint and refreshed every 30 seconds. These statistics represent cumulative data since the last backend restart.
+                Metrics cover the last 30 days and are refreshed every 30 seconds. They are read from daily rollups that the worker updates as each review finishes.
               </p>
               <p className="text-muted-foreground">
-                Enable Prometheus metrics in your backend configuration to collect detailed performance data.
+                LLM errors count failed reviews of the llm pipeline. Live request and latency series are on the Prometheus endpoint.
               </p>
             </div>
           </div>
@@ -269,15 +269,26 @@ export function MetricsPage() {
 
 // Mock data
 const mockMetrics: MetricsData = {
+  since: '2026-01-01',
+  until: '2026-01-30',
   llm_requests_total: 1247,
   llm_errors_total: 23,
+  llm_latency_p50: 1.1,
   llm_latency_p95: 2.4,
+  llm_tokens_prompt: 38100,
+  llm_tokens_completion: 7720,
   llm_tokens_total: 45820,
+  review_duration_p50: 1.7,
+  review_duration_p95: 3.9,
   reviews_total: 156,
   reviews_by_status: {
     pending: 3,
     running: 5,
     completed: 142,
     failed: 6
-  }
+  },
+  comments_total: 611,
+  comments_by_severity: { info: 240, warning: 280, error: 78, critical: 13 },
+  comments_by_category: { style: 210, bug: 190, security: 96, performance: 115 },
+  daily: []
 };
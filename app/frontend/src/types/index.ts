@@ -47,6 +47,34 @@ export interface ReviewRequest {
   error_message?: string;
 }
 
+// Item of GET /api/v1/reviews; listings carry no diff, comments or metadata.
+export interface ReviewSummary {
+  id: string;
+  source: ReviewSource;
+  status: ReviewStatus;
+  repo?: string | null;
+  pr_number?: number | null;
+  head_sha?: string | null;
+  diff_size?: number | null;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface ReviewListFilters {
+  status?: ReviewStatus;
+  repo?: string;
+  source?: ReviewSource;
+  created_after?: string;
+  created_before?: string;
+  cursor?: string;
+  limit?: number;
+}
+
+export interface ReviewListPage {
+  items: ReviewSummary[];
+  next_cursor: string | null;
+}
+
 export interface CreateReviewPayload {
   source: ReviewSource;
   diff?: string;
@@ -64,11 +92,36 @@ export interface PipelineConfig {
   enable_prometheus_metrics: boolean;
 }
 
+export interface DailyMetrics {
+  day: string;
+  reviews_completed: number;
+  reviews_failed: number;
+  comments: number;
+  llm_tokens: number;
+}
+
+export interface MetricsFilters {
+  days?: number;
+  repo?: string;
+  pipeline?: string;
+}
+
 export interface MetricsData {
+  since: string;
+  until: string;
   llm_requests_total: number;
   llm_errors_total: number;
+  llm_latency_p50: number;
   llm_latency_p95: number;
+  llm_tokens_prompt: number;
+  llm_tokens_completion: number;
   llm_tokens_total: number;
+  review_duration_p50: number;
+  review_duration_p95: number;
   reviews_total: number;
   reviews_by_status: Record<ReviewStatus, number>;
+  comments_total: number;
+  comments_by_severity: Record<string, number>;
+  comments_by_category: Record<string, number>;
+  daily: DailyMetrics[];
 }
@@ -89,12 +89,31 @@ class LLMClient:
 
         return self._client
 
-    def generate(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        provider = self.settings.llm_provider.lower()
+    def _use_mock(self) -> bool:
+        return self.settings.llm_provider.lower() == "mock" or self.settings.llm_deterministic
+
+    def _to_response(self, provider: str, result, started: float) -> LLMResponse:
+        latency_ms = (time.perf_counter() - started) * 1000
+        usage = result.response_metadata.get("token_usage", {})
+        tokens_prompt = int(usage.get("prompt_tokens", 0))
+        tokens_completion = int(usage.get("completion_tokens", 0))
+
+        LLM_LATENCY.labels(provider=provider).observe(latency_ms / 1000.0)
+        LLM_TOKENS_PROMPT.labels(provider=provider).observe(tokens_prompt)
+        LLM_TOKENS_COMPLETION.labels(provider=provider).observe(tokens_completion)
 
-        if provider == "mock" or self.settings.llm_deterministic:
+        return LLMResponse(
+            content=result.content,
+            tokens_prompt=tokens_prompt,
+            tokens_completion=tokens_completion,
+            latency_ms=latency_ms,
+        )
+
+    def generate(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        if self._use_mock():
             return self._mock_response(system_prompt, user_prompt)
 
+        provider = self.settings.llm_provider.lower()
         client = self._ensure_client()
         started = time.perf_counter()
         status = "success"
@@ -106,21 +125,33 @@ class LLMClient:
                     ("user", user_prompt),
                 ]
             )
-            latency_ms = (time.perf_counter() - started) * 1000
-            usage = result.response_metadata.get("token_usage", {})
-            tokens_prompt = int(usage.get("prompt_tokens", 0))
-            tokens_completion = int(usage.get("completion_tokens", 0))
-
-            LLM_LATENCY.labels(provider=provider).observe(latency_ms / 1000.0)
-            LLM_TOKENS_PROMPT.labels(provider=provider).observe(tokens_prompt)
-            LLM_TOKENS_COMPLETION.labels(provider=provider).observe(tokens_completion)
-
-            return LLMResponse(
-                content=result.content,
-                tokens_prompt=tokens_prompt,
-                tokens_completion=tokens_completion,
-                latency_ms=latency_ms,
+            return self._to_response(provider, result, started)
+        except Exception as exc:
+            status = "error"
+            logger.exception("LLM generation failed for provider %s: %s", provider, exc)
+            raise
+        finally:
+            LLM_REQUESTS.labels(provider=provider, status=status).inc()
+
+    async def agenerate(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Non-blocking variant of :meth:`generate` for the asyncio worker."""
+
+        if self._use_mock():
+            return self._mock_response(system_prompt, user_prompt)
+
+        provider = self.settings.llm_provider.lower()
+        client = self._ensure_client()
+        started = time.perf_counter()
+        status = "success"
+
+        try:
+            result = await client.ainvoke(
+                [
+                    ("system", system_prompt),
+                    ("user", user_prompt),
+                ]
             )
+            return self._to_response(provider, result, started)
         except Exception as exc:
             status = "error"
             logger.exception("LLM generation failed for provider %s: %s", provider, exc)
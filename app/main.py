@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from app.api.routes import github, reviews, ui
+from app.api.routes import github, metrics, reviews, ui
 from app.core.config import get_settings
 from app.core.db import Base, engine
 from app.core.logging_config import setup_logging
@@ -17,6 +17,7 @@ def create_app() -> FastAPI:
 
     app.include_router(reviews.router, prefix="/api/v1")
     app.include_router(github.router, prefix="/api/v1")
+    app.include_router(metrics.router, prefix="/api/v1")
     app.include_router(ui.router)
 
     if settings.enable_prometheus_metrics:
@@ -1 +1 @@
-from app.models import review_request, review_result  # noqa: F401
+from app.models import diff_blob, review_comment, review_request, review_result, review_rollup  # noqa: F401
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+
+from app.core.db import Base
+
+
+class DiffBlob(Base):
+    """A compressed diff, stored once per distinct content and keyed by its sha256."""
+
+    __tablename__ = "diff_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    encoding = Column(String, nullable=False, default="zlib")
+    size = Column(Integer, nullable=False)
+    stored_size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.core.db import Base
+
+
+class ReviewCommentRecord(Base):
+    """One finding of a review, stored as a row so it can be filtered and aggregated in SQL."""
+
+    __tablename__ = "review_comments"
+    __table_args__ = (
+        Index("ix_review_comments_review_position", "review_request_id", "position", unique=True),
+        Index("ix_review_comments_repo_category", "repo", "category"),
+        Index("ix_review_comments_repo_severity", "repo", "severity"),
+        Index("ix_review_comments_file_path", "file_path"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    review_request_id = Column(String, ForeignKey("review_requests.id"), nullable=False)
+    # Order of the finding within its review; also the pagination key.
+    position = Column(Integer, nullable=False)
+    # Copied from the review so per-repo analytics need no join.
+    repo = Column(String, nullable=True)
+    agent = Column(String, nullable=True)
+    file_path = Column(String, nullable=False)
+    line_start = Column(Integer, nullable=False)
+    line_end = Column(Integer, nullable=False)
+    category = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    title = Column(Text, nullable=False)
+    body = Column(Text, nullable=False)
+    suggested_fix = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import deferred
 
 from app.core.db import Base
 
@@ -12,12 +13,27 @@ def generate_uuid() -> str:
 
 class ReviewRequest(Base):
     __tablename__ = "review_requests"
+    # Listing pages newest-first by (created_at, id), optionally filtered by one column.
+    __table_args__ = (
+        Index("ix_review_requests_created_id", "created_at", "id"),
+        Index("ix_review_requests_status_created_id", "status", "created_at", "id"),
+        Index("ix_review_requests_repo_created_id", "repo", "created_at", "id"),
+        Index("ix_review_requests_source_created_id", "source", "created_at", "id"),
+        # Lets retention check whether a diff blob is still referenced.
+        Index("ix_review_requests_diff_sha256", "diff_sha256"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     source = Column(String, nullable=False)
     status = Column(String, nullable=False, default="pending")
-    diff_snapshot = Column(Text, nullable=True)
+    # Inline diffs predate the blob store; new diffs live in diff_blobs (see app.services.diff_store).
+    diff_snapshot = deferred(Column(Text, nullable=True))
+    diff_sha256 = Column(String(64), nullable=True)
+    diff_size = Column(Integer, nullable=True)
+    diff_stored_size = Column(Integer, nullable=True)
     repo = Column(String, nullable=True)
     pr_number = Column(String, nullable=True)
+    installation_id = Column(String, nullable=True)
+    head_sha = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,50 @@
+from sqlalchemy import BigInteger, Column, Date, Float, Integer, String
+
+from app.core.db import Base
+
+
+class ReviewDailyRollup(Base):
+    """Per day, repository and pipeline totals of finished reviews, kept up to date by the worker."""
+
+    __tablename__ = "review_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    # "" for reviews without a repository (manual submissions).
+    repo = Column(String, primary_key=True, default="")
+    pipeline = Column(String, primary_key=True)
+    reviews_completed = Column(Integer, nullable=False, default=0)
+    reviews_failed = Column(Integer, nullable=False, default=0)
+    comments_total = Column(Integer, nullable=False, default=0)
+    files_reviewed = Column(Integer, nullable=False, default=0)
+    llm_requests = Column(Integer, nullable=False, default=0)
+    llm_tokens_prompt = Column(BigInteger, nullable=False, default=0)
+    llm_tokens_completion = Column(BigInteger, nullable=False, default=0)
+    review_seconds_total = Column(Float, nullable=False, default=0.0)
+
+
+class CommentDailyRollup(Base):
+    """Per day, repository and pipeline count of findings by severity and category."""
+
+    __tablename__ = "comment_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    repo = Column(String, primary_key=True, default="")
+    pipeline = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class LatencyDailyHistogram(Base):
+    """Per day, repository and pipeline latency histogram; percentiles are read from the buckets."""
+
+    __tablename__ = "latency_daily_histograms"
+
+    day = Column(Date, primary_key=True)
+    repo = Column(String, primary_key=True, default="")
+    pipeline = Column(String, primary_key=True)
+    # "review" (whole job) or "llm" (one LLM call).
+    metric = Column(String, primary_key=True)
+    # Index into app.services.metrics_rollups.LATENCY_BUCKETS.
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
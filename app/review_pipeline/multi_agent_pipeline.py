@@ -18,47 +18,63 @@ class ParsedFile:
 
 
 def _parse_unified_diff(diff: str) -> List[ParsedFile]:
+    """Split a unified diff into per-file sections and parse each one's hunks with :func:`parse_file_patch`."""
+
     files: List[ParsedFile] = []
-    current: ParsedFile | None = None
-    current_line = 0
+    path: str | None = None
+    hunks: List[str] = []
+    in_hunks = False
+
+    def _flush() -> None:
+        if path is not None:
+            parsed = parse_file_patch(path, "\n".join(hunks))
+            if parsed.path != "unknown" or parsed.additions or parsed.deletions:
+                files.append(parsed)
 
     for line in diff.splitlines():
         if line.startswith("diff --git"):
-            if current:
-                files.append(current)
-            current = ParsedFile(path="unknown")
-            current_line = 0
+            _flush()
+            path, hunks, in_hunks = "unknown", [], False
             continue
-
-        if line.startswith("+++"):
-            if current:
-                normalized = line.replace("+++ b/", "", 1).replace("+++ ", "", 1)
-                current.path = normalized
+        if path is None:
+            continue
+        if not in_hunks and line.startswith("--- a/"):
+            path = line[len("--- a/"):]
             continue
+        if not in_hunks and line.startswith("+++") and line != "+++ /dev/null":
+            # A deleted file keeps the path from its "---" line.
+            path = line.replace("+++ b/", "", 1).replace("+++ ", "", 1)
+            continue
+        if line.startswith("@@"):
+            in_hunks = True
+        if in_hunks:
+            hunks.append(line)
+    _flush()
+    return files
+
+
+def parse_file_patch(path: str, patch: str | None) -> ParsedFile:
+    """Build a ParsedFile from a single file's hunks (the `patch` field of the PR files API)."""
 
+    parsed = ParsedFile(path=path)
+    current_line = 0
+    for line in (patch or "").splitlines():
         if line.startswith("@@"):
             match = re.search(r"\+(\d+)", line)
             current_line = int(match.group(1)) if match else 0
             continue
-
-        if line.startswith("+") and not line.startswith("+++"):
-            if current:
-                current.additions.append((current_line or 1, line[1:]))
-                current_line += 1
+        if line.startswith("+"):
+            parsed.additions.append((current_line or 1, line[1:]))
+            current_line += 1
             continue
-
-        if line.startswith("-") and not line.startswith("---"):
-            if current:
-                current.deletions.append((current_line or 1, line[1:]))
+        if line.startswith("-"):
+            parsed.deletions.append((current_line or 1, line[1:]))
+            continue
+        if line.startswith("\\"):
             continue
-
         if current_line:
             current_line += 1
-
-    if current:
-        files.append(current)
-
-    return [file for file in files if file.path != "unknown" or file.additions or file.deletions]
+    return parsed
 
 
 class BaseAgent:
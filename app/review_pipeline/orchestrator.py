@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from collections import Counter
 from dataclasses import dataclass, field
 from typing import List, Protocol, Tuple
 
-from app.llm.client import LLMClient
+from app.llm.client import LLMClient, LLMResponse
 from app.review_pipeline.multi_agent_pipeline import run_multi_agent_review
 from app.review_pipeline.stub_pipeline import run_stubbed_review
 from app.schemas.review_schemas import ReviewComment
@@ -15,18 +16,28 @@ class ReviewOrchestrator(Protocol):
     def run(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
         """Execute the review pipeline and return summary, comments, metadata."""
 
+    async def arun(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
+        """Same as :meth:`run`, without blocking the event loop."""
+
 
 @dataclass
 class StubOrchestrator:
     def run(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
         return run_stubbed_review(diff)
 
+    async def arun(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
+        return self.run(diff)
+
 
 @dataclass
 class HeuristicOrchestrator:
     def run(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
         return run_multi_agent_review(diff)
 
+    async def arun(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
+        # CPU-bound heuristics; keep the loop free for the other in-flight reviews.
+        return await asyncio.to_thread(run_multi_agent_review, diff)
+
 
 @dataclass
 class LLMOrchestrator:
@@ -34,15 +45,29 @@ class LLMOrchestrator:
 
     def run(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
         if not diff:
-            metadata = {
-                "agents_run": ["llm-orchestrator"],
-                "total_comments": 0,
-                "files_reviewed": 0,
-                "severity_breakdown": {},
-                "categories_detected": [],
-            }
-            return ("No diff provided; LLM review skipped.", [], metadata)
+            return self._empty_result()
+        response = self.client.generate(*self._prompts(diff))
+        return self._parse(diff, response)
+
+    async def arun(self, diff: str | None) -> Tuple[str, List[ReviewComment], dict]:
+        if not diff:
+            return self._empty_result()
+        response = await self.client.agenerate(*self._prompts(diff))
+        return self._parse(diff, response)
+
+    @staticmethod
+    def _empty_result() -> Tuple[str, List[ReviewComment], dict]:
+        metadata = {
+            "agents_run": ["llm-orchestrator"],
+            "total_comments": 0,
+            "files_reviewed": 0,
+            "severity_breakdown": {},
+            "categories_detected": [],
+        }
+        return ("No diff provided; LLM review skipped.", [], metadata)
 
+    @staticmethod
+    def _prompts(diff: str) -> Tuple[str, str]:
         system_prompt = (
             "You are the lead engineer coordinating a team of code reviewers. "
             "Return JSON with `summary`, `comments`, and `agents` fields."
@@ -53,8 +78,10 @@ class LLMOrchestrator:
             "category, severity, title, body, suggested_fix, and agent.\n\n"
             f"Diff:\n{diff}\n"
         )
+        return system_prompt, user_prompt
 
-        response = self.client.generate(system_prompt, user_prompt)
+    @staticmethod
+    def _parse(diff: str, response: LLMResponse) -> Tuple[str, List[ReviewComment], dict]:
         comments: List[ReviewComment] = []
         agents: List[str] = []
         summary = "LLM review completed."
@@ -0,0 +1,33 @@
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class DailyMetrics(BaseModel):
+    day: str
+    reviews_completed: int = 0
+    reviews_failed: int = 0
+    comments: int = 0
+    llm_tokens: int = 0
+
+
+class MetricsResponse(BaseModel):
+    """Review and LLM totals over a window of days, read from the daily rollups."""
+
+    since: str
+    until: str
+    reviews_total: int = 0
+    reviews_by_status: Dict[str, int] = Field(default_factory=dict)
+    comments_total: int = 0
+    comments_by_severity: Dict[str, int] = Field(default_factory=dict)
+    comments_by_category: Dict[str, int] = Field(default_factory=dict)
+    llm_requests_total: int = 0
+    llm_errors_total: int = Field(0, description="Failed reviews of the llm pipeline")
+    llm_tokens_prompt: int = 0
+    llm_tokens_completion: int = 0
+    llm_tokens_total: int = 0
+    llm_latency_p50: float = Field(0.0, description="Seconds")
+    llm_latency_p95: float = Field(0.0, description="Seconds")
+    review_duration_p50: float = Field(0.0, description="Seconds")
+    review_duration_p95: float = Field(0.0, description="Seconds")
+    daily: List[DailyMetrics] = Field(default_factory=list)
@@ -37,6 +37,35 @@ class ReviewResponse(BaseModel):
     updated_at: Optional[str] = None
 
 
+class ReviewSummary(BaseModel):
+    """A review as shown in listings: no diff, comments or summary."""
+
+    id: str
+    source: str
+    status: str
+    repo: Optional[str] = None
+    pr_number: Optional[int] = None
+    head_sha: Optional[str] = None
+    diff_size: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class ReviewListResponse(BaseModel):
+    items: List[ReviewSummary] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last")
+
+
+class ReviewCommentPage(BaseModel):
+    items: List[ReviewComment] = Field(default_factory=list)
+    next_cursor: Optional[int] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last")
+
+
+class ReviewImportResponse(BaseModel):
+    imported: int = 0
+    skipped: int = Field(0, description="Records whose review id already exists")
+
+
 class ReviewMetrics(BaseModel):
     total_comments: int
     files_reviewed: int
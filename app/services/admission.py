@@ -0,0 +1,168 @@
+"""Admission control for the submission endpoints.
+
+Before a review is accepted, the depth of its target queue and an estimate of how
+long the workers need to drain it are compared against configured thresholds.
+Manual submissions over the limit get ``503`` with ``Retry-After``. Webhooks
+cannot be retried by GitHub, so they are never rejected: low-priority (draft) PRs
+are shed, and other PRs get a longer debounce window, so successive pushes to
+the same PR coalesce into one review.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client, get_redis_client
+from app.services import fair_scheduler
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "review_admission_queue_depth", "Reviews waiting in a queue, including scheduled and fair-pending", ["queue"]
+)
+ADMISSION_DRAIN_SECONDS = Gauge(
+    "review_admission_drain_seconds", "Estimated time for workers to drain a queue", ["queue"]
+)
+ADMISSION_THROUGHPUT = Gauge(
+    "review_admission_throughput_per_second", "Recent review completions per second", ["queue"]
+)
+ADMISSION_THRESHOLD = Gauge(
+    "review_admission_threshold", "Configured admission control thresholds", ["threshold"]
+)
+ADMISSION_DECISIONS = Counter(
+    "review_admission_decisions_total", "Admission decisions by endpoint", ["endpoint", "decision"]
+)
+
+# Queue load is read at most this often per process and queue.
+_CACHE_SECONDS = 1.0
+_load_cache: Dict[str, Tuple[float, "QueueLoad"]] = {}
+
+
+def _completions_key(queue_name: str) -> str:
+    return f"admission:completed:{queue_name}"
+
+
+@dataclass
+class QueueLoad:
+    queue: str
+    depth: int
+    throughput: float
+    drain_seconds: float
+
+
+@dataclass
+class AdmissionDecision:
+    admitted: bool
+    load: QueueLoad
+    retry_after: int = 0
+
+
+def record_completion(queue_name: Optional[str], review_id: str) -> None:
+    """Count a review that ran to completion towards its queue's recent throughput."""
+
+    if not queue_name:
+        return
+    settings = get_settings()
+    now = time.time()
+    key = _completions_key(queue_name)
+    try:
+        pipe = get_redis_client().pipeline()
+        pipe.zadd(key, {review_id: now})
+        pipe.zremrangebyscore(key, "-inf", now - settings.admission_throughput_window_seconds)
+        pipe.expire(key, settings.admission_throughput_window_seconds * 2)
+        pipe.execute()
+    except RedisError:
+        logger.warning("Failed to record completion of %s for admission control", review_id, exc_info=True)
+
+
+def estimate_drain(depth: int, completions: int, window_seconds: int) -> Tuple[float, float]:
+    """Return (throughput/s, drain seconds) from completions seen in the last window.
+
+    Without completions there is nothing to estimate from, e.g. after an idle
+    period, so the drain time is reported as 0 and only the depth limit applies.
+    """
+
+    throughput = completions / window_seconds if window_seconds > 0 else 0.0
+    if throughput > 0:
+        return throughput, depth / throughput
+    return 0.0, 0.0
+
+
+async def queue_load(queue_name: str) -> QueueLoad:
+    cached = _load_cache.get(queue_name)
+    now = time.monotonic()
+    if cached and now - cached[0] < _CACHE_SECONDS:
+        return cached[1]
+
+    settings = get_settings()
+    redis_client = get_async_redis_client()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.llen(f"rq:queue:{queue_name}")
+        pipe.zcard(f"rq:scheduled:{queue_name}")
+        pipe.zcount(_completions_key(queue_name), time.time() - settings.admission_throughput_window_seconds, "+inf")
+        pipe.smembers(fair_scheduler.tenants_key(queue_name))
+        queued, scheduled, completions, tenants = await pipe.execute()
+    depth = queued + scheduled
+    if tenants:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for tenant in tenants:
+                pipe.zcard(fair_scheduler.pending_key(queue_name, tenant.decode()))
+            depth += sum(await pipe.execute())
+
+    throughput, drain_seconds = estimate_drain(depth, completions, settings.admission_throughput_window_seconds)
+    load = QueueLoad(queue=queue_name, depth=depth, throughput=throughput, drain_seconds=drain_seconds)
+    ADMISSION_QUEUE_DEPTH.labels(queue=queue_name).set(depth)
+    ADMISSION_DRAIN_SECONDS.labels(queue=queue_name).set(drain_seconds)
+    ADMISSION_THROUGHPUT.labels(queue=queue_name).set(throughput)
+    _load_cache[queue_name] = (now, load)
+    return load
+
+
+def evaluate(load: QueueLoad) -> AdmissionDecision:
+    settings = get_settings()
+    ADMISSION_THRESHOLD.labels(threshold="max_queue_depth").set(settings.admission_max_queue_depth)
+    ADMISSION_THRESHOLD.labels(threshold="max_drain_seconds").set(settings.admission_max_drain_seconds)
+    over_depth = load.depth >= settings.admission_max_queue_depth
+    over_drain = load.drain_seconds >= settings.admission_max_drain_seconds
+    if not (over_depth or over_drain):
+        return AdmissionDecision(admitted=True, load=load)
+    # Ask clients to come back once the excess over the drain threshold is worked off.
+    excess = load.drain_seconds - settings.admission_max_drain_seconds
+    retry_after = min(max(math.ceil(excess), settings.admission_min_retry_after_seconds), 3600)
+    return AdmissionDecision(admitted=False, load=load, retry_after=retry_after)
+
+
+async def check_admission(queue_name: str) -> AdmissionDecision:
+    """Decide whether a new review for ``queue_name`` should be accepted right now.
+
+    Fails open: when Redis cannot be read the review is admitted.
+    """
+
+    if not get_settings().admission_control_enabled:
+        return AdmissionDecision(admitted=True, load=QueueLoad(queue_name, 0, 0.0, 0.0))
+    try:
+        load = await queue_load(queue_name)
+    except RedisError:
+        logger.warning("Redis unavailable for admission control; admitting", exc_info=True)
+        return AdmissionDecision(admitted=True, load=QueueLoad(queue_name, 0, 0.0, 0.0))
+    return evaluate(load)
+
+
+def overload_debounce_seconds(decision: AdmissionDecision, base_seconds: int) -> int:
+    """Debounce to use for a webhook review while its queue is over the threshold.
+
+    Waiting roughly as long as the backlog takes to drain costs no latency. It
+    gives later pushes to the same PR time to supersede this review, so a
+    burst of pushes becomes a single review.
+    """
+
+    cap = get_settings().admission_max_coalesce_seconds
+    return max(base_seconds, min(math.ceil(decision.load.drain_seconds), cap))
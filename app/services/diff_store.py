@@ -0,0 +1,175 @@
+"""Content-addressed, compressed storage for review diffs.
+
+Diffs are zlib-compressed into ``diff_blobs``, keyed by the sha256 of the raw
+text, so a re-submitted diff is stored once. ``review_requests`` rows keep only
+the hash and the sizes. Blobs never change once written, so reads go through a
+per-process LRU cache bounded by ``DIFF_CACHE_MAX_BYTES``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
+
+from app.core.config import get_settings
+from app.models.diff_blob import DiffBlob
+from app.models.review_request import ReviewRequest
+
+logger = logging.getLogger(__name__)
+
+ENCODING = "zlib"
+
+
+@dataclass(frozen=True)
+class StoredDiff:
+    sha256: str
+    size: int
+    stored_size: int
+    data: bytes
+
+
+class _DiffCache:
+    """Thread-safe LRU of decoded diffs, bounded by their total size in characters."""
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, sha256: str) -> Optional[str]:
+        with self._lock:
+            text = self._items.get(sha256)
+            if text is not None:
+                self._items.move_to_end(sha256)
+            return text
+
+    def put(self, sha256: str, text: str) -> None:
+        if len(text) > self.max_chars:
+            return
+        with self._lock:
+            if sha256 in self._items:
+                self._items.move_to_end(sha256)
+                return
+            self._items[sha256] = text
+            self._chars += len(text)
+            while self._chars > self.max_chars:
+                _, evicted = self._items.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._chars = 0
+
+
+_cache = _DiffCache(get_settings().diff_cache_max_bytes)
+
+
+def encode_diff(text: str) -> StoredDiff:
+    raw = text.encode("utf-8")
+    data = zlib.compress(raw, get_settings().diff_compression_level)
+    return StoredDiff(sha256=hashlib.sha256(raw).hexdigest(), size=len(raw), stored_size=len(data), data=data)
+
+
+def decode_diff(encoding: str, data: bytes) -> str:
+    if encoding != ENCODING:
+        raise ValueError(f"Unsupported diff encoding {encoding!r}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _insert_blob(dialect_name: str, stored: StoredDiff):
+    values = {
+        "sha256": stored.sha256,
+        "encoding": ENCODING,
+        "size": stored.size,
+        "stored_size": stored.stored_size,
+        "data": stored.data,
+    }
+    if dialect_name == "postgresql":
+        return postgresql.insert(DiffBlob).values(**values).on_conflict_do_nothing(index_elements=["sha256"])
+    if dialect_name == "sqlite":
+        return sqlite.insert(DiffBlob).values(**values).on_conflict_do_nothing(index_elements=["sha256"])
+    return insert(DiffBlob).values(**values).prefix_with("IGNORE", dialect="mysql")
+
+
+def store_diff(db: Session, text: str) -> StoredDiff:
+    """Write ``text`` to the blob table unless it is already there; the caller commits."""
+
+    stored = encode_diff(text)
+    db.execute(_insert_blob(db.get_bind().dialect.name, stored))
+    _cache.put(stored.sha256, text)
+    return stored
+
+
+async def store_diff_async(db: AsyncSession, text: str) -> StoredDiff:
+    stored = encode_diff(text)
+    await db.execute(_insert_blob(db.get_bind().dialect.name, stored))
+    _cache.put(stored.sha256, text)
+    return stored
+
+
+def attach_diff(review: ReviewRequest, stored: StoredDiff) -> None:
+    review.diff_sha256 = stored.sha256
+    review.diff_size = stored.size
+    review.diff_stored_size = stored.stored_size
+    review.diff_snapshot = None
+
+
+def load_diff(db: Session, sha256: str) -> Optional[str]:
+    text = _cache.get(sha256)
+    if text is not None:
+        return text
+    row = db.execute(select(DiffBlob.encoding, DiffBlob.data).where(DiffBlob.sha256 == sha256)).first()
+    if row is None:
+        logger.error("Diff blob %s is missing", sha256)
+        return None
+    text = decode_diff(row.encoding, row.data)
+    _cache.put(sha256, text)
+    return text
+
+
+def has_diff(review: ReviewRequest) -> bool:
+    return bool(review.diff_sha256 or review.diff_snapshot)
+
+
+def review_diff(db: Session, review: ReviewRequest) -> Optional[str]:
+    """The review's diff, from the blob store or, for rows written before it, the inline column."""
+
+    if review.diff_sha256:
+        return load_diff(db, review.diff_sha256)
+    return review.diff_snapshot
+
+
+def offload_inline_diffs(db: Session, batch_size: int = 500) -> int:
+    """Move diffs still stored inline on ``review_requests`` into the blob store.
+
+    Commits once per batch; returns the number of rows migrated.
+    """
+
+    migrated = 0
+    while True:
+        reviews = (
+            db.query(ReviewRequest)
+            .options(undefer(ReviewRequest.diff_snapshot))
+            .filter(ReviewRequest.diff_snapshot.isnot(None), ReviewRequest.diff_sha256.is_(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not reviews:
+            return migrated
+        for review in reviews:
+            attach_diff(review, store_diff(db, review.diff_snapshot))
+        db.commit()
+        migrated += len(reviews)
+        logger.info("Offloaded %d inline diffs so far", migrated)
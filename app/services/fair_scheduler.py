@@ -0,0 +1,96 @@
+"""Per-tenant fair-share admission in front of the RQ review queues.
+
+With ``FAIR_SCHEDULING_ENABLED`` a review is not pushed onto its RQ queue right
+away. It is parked in a per-tenant sub-queue, a sorted set scored by the time the
+review may start, so debounce delays are honoured there as well.
+:mod:`app.workers.fair_dispatcher` moves reviews to RQ in weighted round-robin
+order, keeping the RQ queues shallow and capping how many reviews each tenant has
+in flight.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Tenants without repository information (manual submissions) share one bucket.
+MANUAL_TENANT = "manual"
+
+
+def tenants_key(queue_name: str) -> str:
+    return f"fair:{queue_name}:tenants"
+
+
+def pending_key(queue_name: str, tenant: str) -> str:
+    return f"fair:{queue_name}:pending:{tenant}"
+
+
+def inflight_key(tenant: str) -> str:
+    return f"fair:inflight:{tenant}"
+
+
+def tenant_for(repo: Optional[str], installation_id: Optional[int | str] = None) -> str:
+    """The fairness bucket of a review: its repository or, if configured, its App installation."""
+
+    if get_settings().fair_tenant_key == "installation" and installation_id:
+        return f"installation:{installation_id}"
+    return f"repo:{repo}" if repo else MANUAL_TENANT
+
+
+def parse_weights(raw: Optional[str]) -> Dict[str, int]:
+    """Parse ``"repo:org/big=1,installation:42=3"`` into a tenant -> weight map."""
+
+    weights: Dict[str, int] = {}
+    for item in (raw or "").split(","):
+        tenant, sep, weight = item.strip().rpartition("=")
+        if not sep or not tenant:
+            continue
+        try:
+            weights[tenant] = max(1, int(weight))
+        except ValueError:
+            logger.warning("Ignoring invalid fair scheduling weight %r", item)
+    return weights
+
+
+def is_fair_queue(queue_name: str) -> bool:
+    settings = get_settings()
+    return settings.fair_scheduling_enabled and queue_name in settings.fair_scheduling_queues.split(",")
+
+
+def submit(pipe, queue_name: str, tenant: str, review_id: str, ready_at: float) -> None:
+    """Park a review in its tenant's sub-queue using an existing (sync or async) pipeline."""
+
+    pipe.zadd(pending_key(queue_name, tenant), {review_id: ready_at})
+    pipe.sadd(tenants_key(queue_name), tenant)
+
+
+def submit_review(queue_name: str, tenant: str, review_id: str, delay_seconds: float = 0) -> None:
+    with get_redis_client().pipeline(transaction=True) as pipe:
+        submit(pipe, queue_name, tenant, review_id, time.time() + max(delay_seconds, 0))
+        pipe.execute()
+
+
+async def submit_review_async(queue_name: str, tenant: str, review_id: str, delay_seconds: float = 0) -> None:
+    async with get_async_redis_client().pipeline(transaction=True) as pipe:
+        submit(pipe, queue_name, tenant, review_id, time.time() + max(delay_seconds, 0))
+        await pipe.execute()
+
+
+def release_tenant_slot(review_id: str, tenant: Optional[str]) -> None:
+    """Free the in-flight slot ``review_id`` held for ``tenant``; a no-op when it never had one."""
+
+    if not tenant or not get_settings().fair_scheduling_enabled:
+        return
+    try:
+        get_redis_client().zrem(inflight_key(tenant), review_id)
+    except RedisError:
+        # Slots expire on their own once the job timeout has passed.
+        logger.warning("Failed to release fair scheduling slot for %s", review_id, exc_info=True)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+import jwt
+import redis
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# GitHub rejects App JWTs that live longer than 10 minutes; backdate iat to absorb clock drift.
+_JWT_TTL_SECONDS = 540
+_JWT_BACKDATE_SECONDS = 60
+# Never hand out a token that is about to expire mid-request.
+_MIN_TOKEN_LIFETIME_SECONDS = 60
+_REFRESH_LOCK_SECONDS = 30
+
+
+class GitHubAppAuthError(Exception):
+    """Raised when a GitHub App JWT or installation token cannot be obtained."""
+
+
+def is_app_private_key(value: Optional[str]) -> bool:
+    return bool(value) and "-----BEGIN" in value  # type: ignore[operator]
+
+
+def _parse_expiry(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class GitHubAppAuth:
+    """Mints App JWTs and caches per-installation access tokens in process and in Redis.
+
+    Tokens are served from the in-process cache first, then from Redis (so forked
+    job processes and other workers reuse them), and are only exchanged with GitHub
+    when nothing usable is cached. Once a cached token enters the refresh margin it
+    is still returned, and a background thread fetches its replacement.
+    """
+
+    def __init__(
+        self,
+        app_id: str,
+        private_key: str,
+        base_url: str,
+        redis_client: redis.Redis,
+        *,
+        refresh_margin_seconds: int = 600,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._app_id = app_id
+        self._private_key = private_key
+        self._base_url = base_url
+        self._redis = redis_client
+        self._refresh_margin = refresh_margin_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jwt: Optional[Tuple[str, float]] = None
+        self._tokens: Dict[int, Tuple[str, float]] = {}
+        self._refreshing: set[int] = set()
+
+    def app_jwt(self) -> str:
+        now = self._clock()
+        with self._lock:
+            if self._jwt and self._jwt[1] - now > _MIN_TOKEN_LIFETIME_SECONDS:
+                return self._jwt[0]
+            payload = {
+                "iat": int(now) - _JWT_BACKDATE_SECONDS,
+                "exp": int(now) + _JWT_TTL_SECONDS,
+                "iss": str(self._app_id),
+            }
+            token = jwt.encode(payload, self._private_key, algorithm="RS256")
+            self._jwt = (token, now + _JWT_TTL_SECONDS)
+            return token
+
+    def _app_client(self):
+        from app.services.github_client import GitHubClient
+
+        return GitHubClient(base_url=self._base_url, token=self.app_jwt())
+
+    @staticmethod
+    def _token_key(installation_id: int) -> str:
+        return f"gh:app:installation-token:{installation_id}"
+
+    def _cached(self, installation_id: int) -> Optional[Tuple[str, float]]:
+        cached = self._tokens.get(installation_id)
+        if cached:
+            return cached
+        try:
+            raw = self._redis.get(self._token_key(installation_id))
+        except RedisError:
+            logger.warning("Redis unavailable for GitHub token cache", exc_info=True)
+            return None
+        if not raw:
+            return None
+        data = json.loads(raw)
+        cached = (data["token"], float(data["expires_at"]))
+        self._tokens[installation_id] = cached
+        return cached
+
+    def installation_token(self, installation_id: int) -> str:
+        cached = self._cached(installation_id)
+        now = self._clock()
+        if cached:
+            token, expires_at = cached
+            remaining = expires_at - now
+            if remaining > self._refresh_margin:
+                return token
+            if remaining > _MIN_TOKEN_LIFETIME_SECONDS:
+                self._refresh_in_background(installation_id)
+                return token
+        return self._refresh(installation_id)
+
+    def _refresh(self, installation_id: int) -> str:
+        response = self._app_client().post(f"app/installations/{installation_id}/access_tokens")
+        if response.status_code != 201:
+            raise GitHubAppAuthError(
+                f"Failed to create installation token for {installation_id} "
+                f"(status={response.status_code}): {response.text}"
+            )
+        data = response.json()
+        token = data["token"]
+        expires_at = _parse_expiry(data["expires_at"])
+        self._tokens[installation_id] = (token, expires_at)
+        ttl = int(expires_at - self._clock()) - _MIN_TOKEN_LIFETIME_SECONDS
+        if ttl > 0:
+            try:
+                self._redis.set(
+                    self._token_key(installation_id),
+                    json.dumps({"token": token, "expires_at": expires_at}),
+                    ex=ttl,
+                )
+            except RedisError:
+                logger.warning("Failed to cache installation token for %s", installation_id, exc_info=True)
+        logger.info("Refreshed GitHub installation token for %s", installation_id)
+        return token
+
+    def _refresh_in_background(self, installation_id: int) -> None:
+        with self._lock:
+            if installation_id in self._refreshing:
+                return
+            self._refreshing.add(installation_id)
+
+        def _run() -> None:
+            try:
+                # Only one worker across the fleet needs to refresh a given installation.
+                acquired = self._redis.set(
+                    f"gh:app:installation-token-refresh:{installation_id}",
+                    "1",
+                    nx=True,
+                    ex=_REFRESH_LOCK_SECONDS,
+                )
+                if acquired:
+                    self._refresh(installation_id)
+                else:
+                    self._tokens.pop(installation_id, None)
+            except Exception:
+                logger.exception("Background refresh of installation token %s failed", installation_id)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(installation_id)
+
+        threading.Thread(target=_run, name=f"gh-token-refresh-{installation_id}", daemon=True).start()
+
+    def installation_for_repo(self, repo_full_name: str) -> int:
+        key = f"gh:app:repo-installation:{repo_full_name}"
+        try:
+            cached = self._redis.get(key)
+        except RedisError:
+            cached = None
+        if cached:
+            return int(cached)
+
+        response = self._app_client().get(f"repos/{repo_full_name}/installation")
+        if response.status_code != 200:
+            raise GitHubAppAuthError(
+                f"GitHub App is not installed on {repo_full_name} (status={response.status_code})"
+            )
+        installation_id = int(response.json()["id"])
+        try:
+            self._redis.set(key, installation_id, ex=24 * 3600)
+        except RedisError:
+            logger.warning("Failed to cache installation id for %s", repo_full_name, exc_info=True)
+        return installation_id
+
+
+@lru_cache()
+def get_github_app_auth() -> Optional[GitHubAppAuth]:
+    """Return the shared App authenticator, or None when a PAT is configured instead."""
+
+    settings = get_settings()
+    if not settings.github_app_id or not is_app_private_key(settings.github_private_key):
+        return None
+    return GitHubAppAuth(
+        app_id=settings.github_app_id,
+        private_key=settings.github_private_key,  # type: ignore[arg-type]
+        base_url=settings.github_api_base,
+        redis_client=get_redis_client(),
+        refresh_margin_seconds=settings.github_app_token_refresh_margin_seconds,
+    )
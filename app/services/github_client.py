@@ -1,18 +1,28 @@
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional
+import asyncio
+from typing import Any, Mapping, Optional, Tuple
 
 import httpx
 
 from app.core.config import get_settings
+from app.core.redis_client import get_redis_client
+from app.services.github_auth import get_github_app_auth
+from app.services.github_rate_limiter import GitHubRateLimiter, bucket_for_token, resource_for_path
 
 
 class GitHubClient:
     """Thin wrapper around httpx for calling the GitHub API synchronously."""
 
-    def __init__(self, base_url: str, token: Optional[str]) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        token: Optional[str],
+        rate_limiter: Optional[GitHubRateLimiter] = None,
+    ) -> None:
         self._base_url = base_url.rstrip("/")
         self._token = token
+        self._rate_limiter = rate_limiter
 
     def _build_headers(self, extra: Optional[Mapping[str, str]] = None) -> Mapping[str, str]:
         headers = {
@@ -25,12 +35,27 @@ class GitHubClient:
             headers.update(extra)
         return headers
 
-    def get(self, path: str, *, headers: Optional[Mapping[str, str]] = None) -> httpx.Response:
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> httpx.Response:
         url = f"{self._base_url}/{path.lstrip('/') }"
+        resource = resource_for_path(path)
+        if self._rate_limiter:
+            self._rate_limiter.before_request(resource)
         with httpx.Client(timeout=30.0) as client:
-            resp = client.get(url, headers=self._build_headers(headers))
+            resp = client.request(method, url, json=json, headers=self._build_headers(headers))
+        if self._rate_limiter:
+            self._rate_limiter.after_response(resp, resource)
         return resp
 
+    def get(self, path: str, *, headers: Optional[Mapping[str, str]] = None) -> httpx.Response:
+        return self._request("GET", path, headers=headers)
+
     def post(
         self,
         path: str,
@@ -38,12 +63,120 @@ class GitHubClient:
         json: Optional[Mapping[str, Any]] = None,
         headers: Optional[Mapping[str, str]] = None,
     ) -> httpx.Response:
-        url = f"{self._base_url}/{path.lstrip('/') }"
-        with httpx.Client(timeout=30.0) as client:
-            resp = client.post(url, json=json, headers=self._build_headers(headers))
+        return self._request("POST", path, json=json, headers=headers)
+
+    def patch(
+        self,
+        path: str,
+        *,
+        json: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> httpx.Response:
+        return self._request("PATCH", path, json=json, headers=headers)
+
+
+class AsyncGitHubClient(GitHubClient):
+    """httpx.AsyncClient flavour of :class:`GitHubClient` for the asyncio worker.
+
+    The rate limiter talks to Redis synchronously, so its calls run in a thread;
+    pacing delays are awaited on the event loop rather than slept in that thread.
+    """
+
+    async def _request(  # type: ignore[override]
+        self,
+        method: str,
+        path: str,
+        *,
+        json: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> httpx.Response:
+        url = f"{self._base_url}/{path.lstrip('/')}"
+        resource = resource_for_path(path)
+        if self._rate_limiter:
+            delay = await asyncio.to_thread(self._rate_limiter.reserve, resource)
+            if delay:
+                await asyncio.sleep(delay)
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            resp = await client.request(method, url, json=json, headers=self._build_headers(headers))
+        if self._rate_limiter:
+            await asyncio.to_thread(self._rate_limiter.after_response, resp, resource)
         return resp
 
+    async def get(self, path: str, *, headers: Optional[Mapping[str, str]] = None) -> httpx.Response:  # type: ignore[override]
+        return await self._request("GET", path, headers=headers)
+
+    async def post(  # type: ignore[override]
+        self,
+        path: str,
+        *,
+        json: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> httpx.Response:
+        return await self._request("POST", path, json=json, headers=headers)
 
-def get_github_client() -> GitHubClient:
+    async def patch(  # type: ignore[override]
+        self,
+        path: str,
+        *,
+        json: Optional[Mapping[str, Any]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> httpx.Response:
+        return await self._request("PATCH", path, json=json, headers=headers)
+
+
+def _resolve_credentials(
+    repo: Optional[str],
+    installation_id: Optional[int | str],
+) -> Tuple[Optional[str], Optional[GitHubRateLimiter]]:
     settings = get_settings()
-    return GitHubClient(base_url=settings.github_api_base, token=settings.github_private_key)
+    token = settings.github_private_key
+    bucket = bucket_for_token(token)
+
+    app_auth = get_github_app_auth()
+    if app_auth:
+        # Never send the App private key itself as a bearer token.
+        token = None
+        bucket = bucket_for_token(None)
+    if app_auth and (installation_id or repo):
+        resolved = int(installation_id) if installation_id else app_auth.installation_for_repo(repo)  # type: ignore[arg-type]
+        token = app_auth.installation_token(resolved)
+        bucket = f"installation:{resolved}"
+
+    rate_limiter: Optional[GitHubRateLimiter] = None
+    if settings.github_rate_limit_enabled:
+        rate_limiter = GitHubRateLimiter(
+            get_redis_client(),
+            bucket,
+            reserve=settings.github_rate_limit_reserve,
+            pace_threshold=settings.github_rate_limit_pace_threshold,
+            max_pace_seconds=settings.github_rate_limit_max_pace_seconds,
+        )
+    return token, rate_limiter
+
+
+def get_github_client(
+    repo: Optional[str] = None,
+    installation_id: Optional[int | str] = None,
+) -> GitHubClient:
+    """Build a client authenticated for ``repo``.
+
+    With a GitHub App configured, the client uses a cached installation token
+    (looked up by ``installation_id`` or, failing that, by ``repo``) and rate-limits
+    against that installation's own bucket. Otherwise the configured PAT is used.
+    """
+
+    token, rate_limiter = _resolve_credentials(repo, installation_id)
+    return GitHubClient(base_url=get_settings().github_api_base, token=token, rate_limiter=rate_limiter)
+
+
+async def get_async_github_client(
+    repo: Optional[str] = None,
+    installation_id: Optional[int | str] = None,
+) -> AsyncGitHubClient:
+    """Async counterpart of :func:`get_github_client`.
+
+    Token lookup may hit Redis or exchange an App JWT, so it runs in a thread.
+    """
+
+    token, rate_limiter = await asyncio.to_thread(_resolve_credentials, repo, installation_id)
+    return AsyncGitHubClient(base_url=get_settings().github_api_base, token=token, rate_limiter=rate_limiter)
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
 from collections import defaultdict
-from typing import Any, Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 from app.core.config import get_settings
 from app.schemas.review_schemas import ReviewComment
-from app.services.github_client import get_github_client
+from app.services.github_auth import get_github_app_auth
+from app.services.github_client import GitHubClient, get_github_client
+from app.services.github_rate_limiter import GitHubRateLimitedError
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +21,45 @@ _HUNK_PATTERN = re.compile(
 
 DiffIndex = Dict[str, Set[int]]
 
+# Hidden HTML comments let later runs find what this service already posted. Only
+# comments written by the service itself count: a human may quote or paste them.
+SUMMARY_MARKER = "<!-- ryzl:review-summary -->"
+_FINDING_MARKER = re.compile(r"<!-- ryzl:finding:(?P<fingerprint>[0-9a-f]{16}) -->")
+
+_REVIEW_THREADS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      reviewThreads(first: 100, after: $cursor) {
+        pageInfo { hasNextPage endCursor }
+        nodes { id isResolved comments(first: 1) { nodes { body author { login __typename } } } }
+      }
+    }
+  }
+}
+"""
+
+_RESOLVE_THREAD_MUTATION = """
+mutation($threadId: ID!) {
+  resolveReviewThread(input: {threadId: $threadId}) { thread { id } }
+}
+"""
+
+
+def finding_fingerprint(comment: ReviewComment) -> str:
+    """Identify a finding across runs; line numbers are left out because they shift between pushes."""
+
+    key = "\x1f".join(
+        [
+            comment.agent or "",
+            comment.file_path or "",
+            comment.category or "",
+            comment.title or "",
+            comment.body or "",
+        ]
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
 
 def _format_line_range(comment: ReviewComment) -> str:
     start = max(int(comment.line_number_start or 0), 0)
@@ -86,14 +129,14 @@ def build_github_comment_body(
     safe_summary = (summary or "No summary provided.").strip()
     total = total_comments if total_comments is not None else len(comments)
 
-    lines: List[str] = ["## 🤖 Automated Review Summary", "", safe_summary, ""]
+    lines: List[str] = [SUMMARY_MARKER, "## 🤖 Automated Review Summary", "", safe_summary, ""]
     if inline_posted:
         lines.append(f"_Posted {inline_posted} inline comment(s); remaining findings summarized below._")
         lines.append("")
 
     for metric_line in _format_metrics(metadata, total):
         lines.append(metric_line)
-    if len(lines) > 4:
+    if len(lines) > 5:
         lines.append("")
 
     lines.append("### Key Findings")
@@ -186,6 +229,7 @@ def _format_inline_body(comment: ReviewComment) -> str:
         sections.append(f"Suggested fix: {comment.suggested_fix}")
     if comment.agent:
         sections.append(f"Agent: {comment.agent}")
+    sections.append(f"<!-- ryzl:finding:{finding_fingerprint(comment)} -->")
     return "\n\n".join(sections)
 
 
@@ -229,17 +273,116 @@ def build_inline_review_comments(
     return inline_payloads, remainder
 
 
+@dataclass
+class _PostedState:
+    summary_comment_id: Optional[int] = None
+    summary_body: Optional[str] = None
+    # every finding already posted, resolved or not; never posted again
+    posted_findings: Set[str] = field(default_factory=set)
+    # fingerprint -> review thread node id, for unresolved threads only
+    open_findings: Dict[str, str] = field(default_factory=dict)
+
+
+def _payload_fingerprint(payload: Mapping[str, Any]) -> Optional[str]:
+    match = _FINDING_MARKER.search(payload.get("body") or "")
+    return match.group("fingerprint") if match else None
+
+
+def _own_login(client: GitHubClient) -> Optional[str]:
+    """Login the service posts as when it uses a personal access token; None under App auth."""
+
+    if get_github_app_auth():
+        return None
+    response = client.get("user")
+    if response.status_code != 200:
+        logger.warning("Could not look up the GitHub login of the configured token (status %s)", response.status_code)
+        return None
+    return (response.json() or {}).get("login")
+
+
+def _is_own(login: Optional[str], author_type: Optional[str], own_login: Optional[str]) -> bool:
+    # App comments are authored by a Bot account ("<slug>[bot]" over REST, "<slug>" over GraphQL).
+    if own_login:
+        return (login or "").removesuffix("[bot]") == own_login.removesuffix("[bot]")
+    return author_type == "Bot"
+
+
+def _find_summary_comment(
+    client: GitHubClient, repo: str, pr_number: int, state: _PostedState, own_login: Optional[str]
+) -> None:
+    page = 1
+    while True:
+        response = client.get(f"repos/{repo}/issues/{pr_number}/comments?per_page=100&page={page}")
+        if response.status_code != 200:
+            logger.warning(
+                "Could not list issue comments for %s#%s (status %s)", repo, pr_number, response.status_code
+            )
+            return
+        items = response.json()
+        for item in items:
+            user = item.get("user") or {}
+            if SUMMARY_MARKER in (item.get("body") or "") and _is_own(user.get("login"), user.get("type"), own_login):
+                state.summary_comment_id = int(item["id"])
+                state.summary_body = item.get("body")
+        if len(items) < 100:
+            return
+        page += 1
+
+
+def _find_posted_findings(
+    client: GitHubClient, repo: str, pr_number: int, state: _PostedState, own_login: Optional[str]
+) -> None:
+    owner, _, name = repo.partition("/")
+    cursor: Optional[str] = None
+    while True:
+        response = client.post(
+            "graphql",
+            json={
+                "query": _REVIEW_THREADS_QUERY,
+                "variables": {"owner": owner, "name": name, "number": pr_number, "cursor": cursor},
+            },
+        )
+        if response.status_code != 200:
+            logger.warning(
+                "Could not list review threads for %s#%s (status %s)", repo, pr_number, response.status_code
+            )
+            return
+        pull = ((response.json().get("data") or {}).get("repository") or {}).get("pullRequest") or {}
+        threads = pull.get("reviewThreads") or {}
+        for thread in threads.get("nodes") or []:
+            first = ((thread.get("comments") or {}).get("nodes") or [{}])[0]
+            match = _FINDING_MARKER.search(first.get("body") or "")
+            author = first.get("author") or {}
+            if not match or not _is_own(author.get("login"), author.get("__typename"), own_login):
+                continue
+            state.posted_findings.add(match.group("fingerprint"))
+            if not thread.get("isResolved"):
+                state.open_findings[match.group("fingerprint")] = thread["id"]
+        page_info = threads.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return
+        cursor = page_info.get("endCursor")
+
+
+def _load_posted_state(client: GitHubClient, repo: str, pr_number: int) -> _PostedState:
+    state = _PostedState()
+    own_login = _own_login(client)
+    _find_summary_comment(client, repo, pr_number, state, own_login)
+    _find_posted_findings(client, repo, pr_number, state, own_login)
+    return state
+
+
 def _submit_pull_request_review(
+    client: GitHubClient,
     repo: str,
     pr_number: int,
     *,
-    summary_body: str,
+    body: str,
     inline_comments: Sequence[Mapping[str, Any]],
 ) -> bool:
-    client = get_github_client()
     payload: Dict[str, Any] = {
         "event": "COMMENT",
-        "body": summary_body or "Automated review",
+        "body": body or "Automated review",
         "comments": list(inline_comments),
     }
 
@@ -248,6 +391,8 @@ def _submit_pull_request_review(
             f"repos/{repo}/pulls/{pr_number}/reviews",
             json=payload,
         )
+    except GitHubRateLimitedError:
+        raise
     except Exception:
         logger.exception("Failed to submit inline review to GitHub")
         return False
@@ -271,16 +416,32 @@ def _submit_pull_request_review(
     return True
 
 
-def _post_issue_comment(repo: str, pr_number: int, body: str) -> None:
+def _upsert_summary_comment(
+    client: GitHubClient,
+    repo: str,
+    pr_number: int,
+    body: str,
+    state: _PostedState,
+) -> None:
     if not body:
         return
+    if state.summary_comment_id and (state.summary_body or "").strip() == body.strip():
+        logger.debug("Summary comment for %s#%s is already up to date", repo, pr_number)
+        return
 
-    client = get_github_client()
     try:
-        response = client.post(
-            f"repos/{repo}/issues/{pr_number}/comments",
-            json={"body": body},
-        )
+        if state.summary_comment_id:
+            response = client.patch(
+                f"repos/{repo}/issues/comments/{state.summary_comment_id}",
+                json={"body": body},
+            )
+        else:
+            response = client.post(
+                f"repos/{repo}/issues/{pr_number}/comments",
+                json={"body": body},
+            )
+    except GitHubRateLimitedError:
+        raise
     except Exception:
         logger.exception("Failed to sync review comments to GitHub issue thread")
         return
@@ -294,7 +455,26 @@ def _post_issue_comment(repo: str, pr_number: int, body: str) -> None:
             response.text,
         )
     else:
-        logger.info("Synced review summary comment to GitHub for %s#%s", repo, pr_number)
+        action = "Updated" if state.summary_comment_id else "Posted"
+        logger.info("%s review summary comment on GitHub for %s#%s", action, repo, pr_number)
+
+
+def _resolve_stale_threads(client: GitHubClient, repo: str, pr_number: int, thread_ids: Sequence[str]) -> None:
+    for thread_id in thread_ids:
+        try:
+            response = client.post(
+                "graphql",
+                json={"query": _RESOLVE_THREAD_MUTATION, "variables": {"threadId": thread_id}},
+            )
+        except GitHubRateLimitedError:
+            raise
+        except Exception:
+            logger.exception("Failed to resolve stale review thread %s", thread_id)
+            continue
+        if response.status_code >= 300 or (response.json() or {}).get("errors"):
+            logger.warning("Could not resolve stale review thread %s on %s#%s", thread_id, repo, pr_number)
+    if thread_ids:
+        logger.info("Resolved %d stale review thread(s) on %s#%s", len(thread_ids), repo, pr_number)
 
 
 def sync_review_to_github(
@@ -302,7 +482,16 @@ def sync_review_to_github(
     summary: str | None,
     comments: List[ReviewComment],
     metadata: Mapping[str, Any] | None = None,
+    *,
+    diff: str | None = None,
 ) -> None:
+    """Publish a review to its PR, editing what earlier runs posted instead of adding to it.
+
+    The summary lives in a single issue comment found by ``SUMMARY_MARKER``; inline
+    findings carry a fingerprint marker so only new ones are posted, and threads for
+    findings that disappeared are resolved.
+    """
+
     settings = get_settings()
     if not settings.github_comment_sync_enabled:
         return
@@ -321,37 +510,43 @@ def sync_review_to_github(
         logger.warning("Skipping GitHub sync: invalid PR number %s", pr_number_raw)
         return
 
-    diff_snapshot = getattr(review, "diff_snapshot", None)
+    diff_snapshot = diff if diff is not None else getattr(review, "diff_snapshot", None)
+    installation_id = getattr(review, "installation_id", None)
+    client = get_github_client(repo=repo, installation_id=installation_id)
+    state = _load_posted_state(client, repo, pr_number)
+
     inline_limit = getattr(settings, "github_comment_max_inline", 0) or 0
     inline_payloads, remainder = build_inline_review_comments(
         comments,
         diff_snapshot,
         max_inline=inline_limit,
     )
+    new_inline = [payload for payload in inline_payloads if _payload_fingerprint(payload) not in state.posted_findings]
+
+    inline_ok = True
+    if new_inline:
+        inline_ok = _submit_pull_request_review(
+            client,
+            repo,
+            pr_number,
+            body=f"Automated review: {len(new_inline)} new finding(s). See the summary comment for the full report.",
+            inline_comments=new_inline,
+        )
 
+    if inline_ok:
+        listed, inline_posted = remainder, len(inline_payloads)
+    else:
+        listed, inline_posted = list(comments), 0
     summary_body = build_github_comment_body(
         summary,
-        remainder,
-        max_list_items=inline_limit if inline_limit else len(remainder),
+        listed,
+        max_list_items=inline_limit if inline_limit else len(listed),
         metadata=metadata,
-        inline_posted=len(inline_payloads),
+        inline_posted=inline_posted,
         total_comments=len(comments),
     )
+    _upsert_summary_comment(client, repo, pr_number, summary_body, state)
 
-    if inline_payloads and _submit_pull_request_review(
-        repo,
-        pr_number,
-        summary_body=summary_body,
-        inline_comments=inline_payloads,
-    ):
-        return
-
-    fallback_body = build_github_comment_body(
-        summary,
-        comments,
-        max_list_items=inline_limit if inline_limit else len(comments),
-        metadata=metadata,
-        inline_posted=0,
-        total_comments=len(comments),
-    )
-    _post_issue_comment(repo, pr_number, fallback_body)
+    current = {finding_fingerprint(comment) for comment in comments}
+    stale = [thread_id for fingerprint, thread_id in state.open_findings.items() if fingerprint not in current]
+    _resolve_stale_threads(client, repo, pr_number, stale)
@@ -0,0 +1,63 @@
+"""Idempotency for GitHub webhook deliveries, keyed on the X-GitHub-Delivery header."""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def _delivery_key(delivery_id: str) -> str:
+    return f"gh:delivery:{delivery_id}"
+
+
+async def claim_delivery(delivery_id: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Claim a delivery for processing.
+
+    Returns ``(True, None)`` for the first sighting, or ``(False, review_id)`` for a
+    duplicate, where ``review_id`` is the review the original delivery created (None
+    while it is still being handled or when it was ignored).
+    """
+
+    if not delivery_id:
+        return True, None
+    settings = get_settings()
+    redis_client = get_async_redis_client()
+    key = _delivery_key(delivery_id)
+    try:
+        if await redis_client.set(key, "", nx=True, ex=settings.github_delivery_ttl_seconds):
+            return True, None
+        existing = await redis_client.get(key)
+    except RedisError:
+        logger.warning("Redis unavailable for webhook dedup; processing delivery %s", delivery_id, exc_info=True)
+        return True, None
+    review_id = existing.decode() if isinstance(existing, bytes) else existing
+    return False, review_id or None
+
+
+async def record_delivery(delivery_id: Optional[str], review_id: str) -> None:
+    """Attach the created review to a claimed delivery so duplicates can echo it back."""
+
+    if not delivery_id:
+        return
+    try:
+        await get_async_redis_client().set(_delivery_key(delivery_id), review_id, xx=True, keepttl=True)
+    except RedisError:
+        logger.warning("Failed to record review for delivery %s", delivery_id, exc_info=True)
+
+
+async def release_delivery(delivery_id: Optional[str]) -> None:
+    """Forget a claim whose processing failed so GitHub's redelivery is not dropped."""
+
+    if not delivery_id:
+        return
+    try:
+        await get_async_redis_client().delete(_delivery_key(delivery_id))
+    except RedisError:
+        logger.warning("Failed to release delivery %s", delivery_id, exc_info=True)
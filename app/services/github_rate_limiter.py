@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import time
+from typing import Callable, Optional
+
+import httpx
+import redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# GitHub does not always send Retry-After with a secondary rate limit response;
+# their docs recommend waiting at least a minute in that case.
+SECONDARY_LIMIT_DEFAULT_WAIT = 60.0
+
+
+class GitHubRateLimitedError(Exception):
+    """Raised when a GitHub quota is exhausted and the call should be retried later."""
+
+    def __init__(self, retry_after: float, bucket: str, message: Optional[str] = None) -> None:
+        self.retry_after = max(float(retry_after), 1.0)
+        self.bucket = bucket
+        self.message = message or "GitHub rate limit exhausted"
+        super().__init__(f"{self.message} (bucket={bucket}, retry_after={self.retry_after:.0f}s)")
+
+
+def resource_for_path(path: str) -> str:
+    """Name of the GitHub quota a request to ``path`` spends, as sent in ``X-RateLimit-Resource``."""
+
+    path = path.lstrip("/")
+    if path == "graphql":
+        return "graphql"
+    if path.startswith("search/"):
+        return "search"
+    return "core"
+
+
+def bucket_for_token(token: Optional[str]) -> str:
+    """Return a stable, non-reversible rate-limit bucket name for a token."""
+
+    if not token:
+        return "anonymous"
+    return "token:" + hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+class GitHubRateLimiter:
+    """Tracks the GitHub quota of a single token in Redis so every worker paces against it.
+
+    ``before_request`` refuses to spend the last ``reserve`` requests of a window and
+    spreads the remaining budget over the time left once it drops below
+    ``pace_threshold``. ``after_response`` records the authoritative quota headers and
+    converts primary/secondary rate-limit responses into :class:`GitHubRateLimitedError`.
+
+    GitHub keeps a separate quota per resource (``core`` for REST, ``graphql``,
+    ``search``), so quotas are stored per ``X-RateLimit-Resource``. A secondary rate
+    limit blocks the whole bucket.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        bucket: str,
+        *,
+        reserve: int = 50,
+        pace_threshold: int = 500,
+        max_pace_seconds: float = 5.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._redis = redis_client
+        self.bucket = bucket
+        self._reserve = max(reserve, 0)
+        self._pace_threshold = max(pace_threshold, 0)
+        self._max_pace_seconds = max(max_pace_seconds, 0.0)
+        self._clock = clock
+        self._sleep = sleep
+
+    def _quota_key(self, resource: str) -> str:
+        return f"gh:rl:{self.bucket}:{resource}:quota"
+
+    @property
+    def _blocked_key(self) -> str:
+        return f"gh:rl:{self.bucket}:blocked_until"
+
+    def before_request(self, resource: str = "core") -> None:
+        delay = self.reserve(resource)
+        if delay:
+            self._sleep(delay)
+
+    def reserve(self, resource: str = "core") -> float:
+        """Check the quota and take one request from it; returns how long to wait before sending it.
+
+        :meth:`before_request` sleeps for the returned delay itself; async callers
+        await it instead of blocking a thread.
+        """
+
+        quota_key = self._quota_key(resource)
+        try:
+            blocked_until = self._redis.get(self._blocked_key)
+            quota = self._redis.hgetall(quota_key)
+        except RedisError:
+            logger.warning("Redis unavailable for GitHub rate limiting; allowing request", exc_info=True)
+            return 0.0
+
+        now = self._clock()
+        if blocked_until and float(blocked_until) > now:
+            raise GitHubRateLimitedError(
+                float(blocked_until) - now,
+                self.bucket,
+                "GitHub secondary rate limit in effect",
+            )
+
+        remaining_raw = quota.get(b"remaining")
+        reset_raw = quota.get(b"reset")
+        if remaining_raw is None or reset_raw is None:
+            return 0.0
+        remaining = int(remaining_raw)
+        reset_at = float(reset_raw)
+        if reset_at <= now:
+            return 0.0
+
+        if remaining <= self._reserve:
+            raise GitHubRateLimitedError(reset_at - now, self.bucket)
+
+        delay = 0.0
+        if remaining <= self._pace_threshold and self._max_pace_seconds:
+            delay = min((reset_at - now) / remaining, self._max_pace_seconds)
+            logger.debug(
+                "Pacing GitHub %s request for %s by %.2fs (%d remaining)", resource, self.bucket, delay, remaining
+            )
+
+        try:
+            # Reserve our slot immediately so concurrent workers see it before the
+            # response headers arrive and overwrite the value authoritatively.
+            self._redis.hincrby(quota_key, "remaining", -1)
+        except RedisError:
+            logger.warning("Failed to record GitHub quota usage for %s", self.bucket, exc_info=True)
+        return delay
+
+    def after_response(self, response: httpx.Response, resource: str = "core") -> None:
+        now = self._clock()
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        resource = response.headers.get("X-RateLimit-Resource") or resource
+
+        if remaining is not None and reset is not None:
+            quota_key = self._quota_key(resource)
+            try:
+                pipe = self._redis.pipeline()
+                pipe.hset(quota_key, mapping={"remaining": int(remaining), "reset": int(reset)})
+                pipe.expireat(quota_key, int(reset) + 60)
+                pipe.execute()
+            except (RedisError, ValueError):
+                logger.warning("Failed to store GitHub %s quota headers for %s", resource, self.bucket, exc_info=True)
+
+        wait = self._limited_wait(response, remaining, reset, now)
+        if wait is None:
+            return
+        if remaining == "0":
+            # A spent primary quota is already in its resource's hash; other resources stay usable.
+            raise GitHubRateLimitedError(wait, self.bucket)
+
+        try:
+            self._redis.set(self._blocked_key, now + wait, ex=int(math.ceil(wait)) + 1)
+        except RedisError:
+            logger.warning("Failed to store GitHub rate-limit block for %s", self.bucket, exc_info=True)
+        raise GitHubRateLimitedError(wait, self.bucket)
+
+    @staticmethod
+    def _limited_wait(
+        response: httpx.Response,
+        remaining: Optional[str],
+        reset: Optional[str],
+        now: float,
+    ) -> Optional[float]:
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return SECONDARY_LIMIT_DEFAULT_WAIT
+        if remaining == "0" and reset is not None:
+            try:
+                return max(float(reset) - now, 1.0)
+            except ValueError:
+                return SECONDARY_LIMIT_DEFAULT_WAIT
+        if "rate limit" in (response.text or "").lower():
+            return SECONDARY_LIMIT_DEFAULT_WAIT
+        # A plain 403 is a permissions problem, not a quota problem.
+        return None
@@ -1,8 +1,24 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import asyncio
+import difflib
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
 
-from app.services.github_client import get_github_client
+from app.core.config import get_settings
+from app.services.github_client import AsyncGitHubClient, GitHubClient, get_async_github_client, get_github_client
+
+logger = logging.getLogger(__name__)
+
+# GitHub answers 406 (and occasionally 422) when a PR is too large for the diff
+# media type; the files API still works for those.
+DIFF_TOO_LARGE_STATUSES = {406, 422}
+# The PR files API never returns more than 3000 files.
+MAX_PR_FILES = 3000
 
 
 class GitHubAPIError(Exception):
@@ -14,12 +30,21 @@ class GitHubAPIError(Exception):
         super().__init__(f"{self.message} (status={status_code})")
 
 
-def fetch_pr_diff(repo_full_name: str, pr_number: int) -> str:
+@dataclass
+class PullRequestFile:
+    path: str
+    status: str
+    patch: Optional[str]
+    previous_path: Optional[str] = None
+
+
+def fetch_pr_diff(repo_full_name: str, pr_number: int, installation_id: Optional[str] = None) -> str:
     """Fetch the unified diff for a pull request.
 
     Args:
         repo_full_name: "owner/repo" string identifying the repository.
         pr_number: Pull request number.
+        installation_id: GitHub App installation to authenticate as, if known.
 
     Returns:
         Unified diff text for the PR.
@@ -28,10 +53,293 @@ def fetch_pr_diff(repo_full_name: str, pr_number: int) -> str:
         GitHubAPIError: if GitHub returns any non-200 status code.
     """
 
-    client = get_github_client()
+    client = get_github_client(repo=repo_full_name, installation_id=installation_id)
     path = f"repos/{repo_full_name}/pulls/{pr_number}"
     headers: Dict[str, str] = {"Accept": "application/vnd.github.v3.diff"}
     response = client.get(path, headers=headers)
     if response.status_code != 200:
         raise GitHubAPIError(response.status_code, response.text)
-    return response.text
\ No newline at end of file
+    return response.text
+
+
+def _get_json(client: GitHubClient, path: str):
+    response = client.get(path)
+    if response.status_code != 200:
+        raise GitHubAPIError(response.status_code, response.text)
+    return response.json()
+
+
+def _get_raw_contents(client: GitHubClient, repo_full_name: str, path: str, ref: str) -> Optional[str]:
+    response = client.get(
+        f"repos/{repo_full_name}/contents/{quote(path)}?ref={ref}",
+        headers={"Accept": "application/vnd.github.raw"},
+    )
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise GitHubAPIError(response.status_code, response.text)
+    try:
+        return response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _rebuild_patch(
+    client: GitHubClient,
+    repo_full_name: str,
+    entry: PullRequestFile,
+    *,
+    base_sha: str,
+    head_sha: str,
+    max_chars: int,
+) -> PullRequestFile:
+    """Recreate a truncated patch by diffing the base and head blobs of one file."""
+
+    old_text = ""
+    if entry.status != "added":
+        old_text = _get_raw_contents(client, repo_full_name, entry.previous_path or entry.path, base_sha) or ""
+    new_text = _get_raw_contents(client, repo_full_name, entry.path, head_sha) or ""
+    return _apply_rebuilt_patch(repo_full_name, entry, old_text, new_text, max_chars)
+
+
+def _apply_rebuilt_patch(
+    repo_full_name: str, entry: PullRequestFile, old_text: str, new_text: str, max_chars: int
+) -> PullRequestFile:
+    if len(old_text) + len(new_text) > max_chars:
+        logger.warning("Skipping %s in %s: file too large to rebuild patch", entry.path, repo_full_name)
+        return entry
+
+    hunks = difflib.unified_diff(old_text.splitlines(), new_text.splitlines(), lineterm="", n=3)
+    # Drop the ---/+++ header lines; callers add their own file headers.
+    body = [line for index, line in enumerate(hunks) if index >= 2]
+    entry.patch = "\n".join(body) if body else None
+    return entry
+
+
+def _files_page_path(repo_full_name: str, pr_number: int, per_page: int, page: int) -> str:
+    return f"repos/{repo_full_name}/pulls/{pr_number}/files?per_page={per_page}&page={page}"
+
+
+def _page_entries(items) -> List[PullRequestFile]:
+    return [
+        PullRequestFile(
+            path=item["filename"],
+            status=item.get("status", "modified"),
+            patch=item.get("patch"),
+            previous_path=item.get("previous_filename"),
+        )
+        for item in items
+    ]
+
+
+def _page_plan(pull, per_page_setting: int) -> Tuple[int, int, str, str]:
+    per_page = max(1, min(per_page_setting, 100))
+    changed_files = min(int(pull.get("changed_files") or 0), MAX_PR_FILES)
+    pages = max(1, math.ceil(changed_files / per_page))
+    base_sha = (pull.get("base") or {}).get("sha", "")
+    head_sha = (pull.get("head") or {}).get("sha", "")
+    return per_page, pages, base_sha, head_sha
+
+
+def fetch_pr_file_patches(
+    repo_full_name: str,
+    pr_number: int,
+    installation_id: Optional[str] = None,
+) -> List[PullRequestFile]:
+    """Fetch per-file patches for a pull request through the PR files API.
+
+    Pages are requested concurrently, and files whose patch GitHub truncated are
+    rebuilt from their base/head blobs.
+
+    Args:
+        repo_full_name: "owner/repo" string identifying the repository.
+        pr_number: Pull request number.
+        installation_id: GitHub App installation to authenticate as, if known.
+
+    Returns:
+        One entry per changed file, in GitHub's order.
+
+    Raises:
+        GitHubAPIError: if GitHub returns any non-200 status code.
+    """
+
+    settings = get_settings()
+    client = get_github_client(repo=repo_full_name, installation_id=installation_id)
+    pull = _get_json(client, f"repos/{repo_full_name}/pulls/{pr_number}")
+    per_page, pages, base_sha, head_sha = _page_plan(pull, settings.github_files_per_page)
+
+    def _fetch_page(page: int) -> List[PullRequestFile]:
+        return _page_entries(_get_json(client, _files_page_path(repo_full_name, pr_number, per_page, page)))
+
+    workers = max(1, settings.github_files_concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        entries = [entry for page in pool.map(_fetch_page, range(1, pages + 1)) for entry in page]
+
+        truncated = [entry for entry in entries if entry.patch is None and entry.status != "removed"]
+        if truncated and base_sha and head_sha:
+            logger.info(
+                "Rebuilding %d truncated patch(es) for %s#%s from blobs",
+                len(truncated),
+                repo_full_name,
+                pr_number,
+            )
+            list(
+                pool.map(
+                    lambda entry: _rebuild_patch(
+                        client,
+                        repo_full_name,
+                        entry,
+                        base_sha=base_sha,
+                        head_sha=head_sha,
+                        max_chars=settings.max_diff_chars,
+                    ),
+                    truncated,
+                )
+            )
+
+    return entries
+
+
+def render_unified_diff(entries: List[PullRequestFile]) -> str:
+    """Reassemble per-file patches into unified diff text."""
+
+    sections: List[str] = []
+    for entry in entries:
+        old_path = entry.previous_path or entry.path
+        sections.append(f"diff --git a/{old_path} b/{entry.path}")
+        sections.append("--- /dev/null" if entry.status == "added" else f"--- a/{old_path}")
+        sections.append("+++ /dev/null" if entry.status == "removed" else f"+++ b/{entry.path}")
+        if entry.patch:
+            sections.append(entry.patch)
+    return "\n".join(sections) + ("\n" if sections else "")
+
+
+def fetch_review_diff(repo_full_name: str, pr_number: int, installation_id: Optional[str] = None) -> str:
+    """Fetch the diff to review using the configured `github_diff_strategy`.
+
+    `diff` only uses the diff media type, `files` always goes through the PR files
+    API, and `auto` (the default) falls back to the files API when GitHub refuses
+    to render the diff because the PR is too large.
+    """
+
+    strategy = (get_settings().github_diff_strategy or "auto").strip().lower()
+    if strategy != "files":
+        try:
+            return fetch_pr_diff(repo_full_name, pr_number, installation_id)
+        except GitHubAPIError as exc:
+            if strategy == "diff" or exc.status_code not in DIFF_TOO_LARGE_STATUSES:
+                raise
+            logger.info(
+                "Diff too large for %s#%s (status %s); falling back to the files API",
+                repo_full_name,
+                pr_number,
+                exc.status_code,
+            )
+    return render_unified_diff(fetch_pr_file_patches(repo_full_name, pr_number, installation_id))
+
+
+# -- asyncio variants used by app.workers.async_worker ------------------------------
+
+
+async def _get_json_async(client: AsyncGitHubClient, path: str):
+    response = await client.get(path)
+    if response.status_code != 200:
+        raise GitHubAPIError(response.status_code, response.text)
+    return response.json()
+
+
+async def _get_raw_contents_async(
+    client: AsyncGitHubClient, repo_full_name: str, path: str, ref: str
+) -> Optional[str]:
+    response = await client.get(
+        f"repos/{repo_full_name}/contents/{quote(path)}?ref={ref}",
+        headers={"Accept": "application/vnd.github.raw"},
+    )
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise GitHubAPIError(response.status_code, response.text)
+    try:
+        return response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+async def fetch_pr_diff_async(
+    repo_full_name: str, pr_number: int, installation_id: Optional[str] = None
+) -> str:
+    """Async variant of :func:`fetch_pr_diff`."""
+
+    client = await get_async_github_client(repo=repo_full_name, installation_id=installation_id)
+    response = await client.get(
+        f"repos/{repo_full_name}/pulls/{pr_number}",
+        headers={"Accept": "application/vnd.github.v3.diff"},
+    )
+    if response.status_code != 200:
+        raise GitHubAPIError(response.status_code, response.text)
+    return response.text
+
+
+async def fetch_pr_file_patches_async(
+    repo_full_name: str,
+    pr_number: int,
+    installation_id: Optional[str] = None,
+) -> List[PullRequestFile]:
+    """Async variant of :func:`fetch_pr_file_patches`; concurrency is bounded the same way."""
+
+    settings = get_settings()
+    client = await get_async_github_client(repo=repo_full_name, installation_id=installation_id)
+    pull = await _get_json_async(client, f"repos/{repo_full_name}/pulls/{pr_number}")
+    per_page, pages, base_sha, head_sha = _page_plan(pull, settings.github_files_per_page)
+    limit = asyncio.Semaphore(max(1, settings.github_files_concurrency))
+
+    async def _fetch_page(page: int) -> List[PullRequestFile]:
+        async with limit:
+            items = await _get_json_async(client, _files_page_path(repo_full_name, pr_number, per_page, page))
+        return _page_entries(items)
+
+    async def _rebuild(entry: PullRequestFile) -> PullRequestFile:
+        async with limit:
+            old_text = ""
+            if entry.status != "added":
+                old_text = (
+                    await _get_raw_contents_async(client, repo_full_name, entry.previous_path or entry.path, base_sha)
+                    or ""
+                )
+            new_text = await _get_raw_contents_async(client, repo_full_name, entry.path, head_sha) or ""
+        return _apply_rebuilt_patch(repo_full_name, entry, old_text, new_text, settings.max_diff_chars)
+
+    pages_entries = await asyncio.gather(*(_fetch_page(page) for page in range(1, pages + 1)))
+    entries = [entry for page in pages_entries for entry in page]
+
+    truncated = [entry for entry in entries if entry.patch is None and entry.status != "removed"]
+    if truncated and base_sha and head_sha:
+        logger.info(
+            "Rebuilding %d truncated patch(es) for %s#%s from blobs",
+            len(truncated),
+            repo_full_name,
+            pr_number,
+        )
+        await asyncio.gather(*(_rebuild(entry) for entry in truncated))
+    return entries
+
+
+async def fetch_review_diff_async(
+    repo_full_name: str, pr_number: int, installation_id: Optional[str] = None
+) -> str:
+    """Async variant of :func:`fetch_review_diff`."""
+
+    strategy = (get_settings().github_diff_strategy or "auto").strip().lower()
+    if strategy != "files":
+        try:
+            return await fetch_pr_diff_async(repo_full_name, pr_number, installation_id)
+        except GitHubAPIError as exc:
+            if strategy == "diff" or exc.status_code not in DIFF_TOO_LARGE_STATUSES:
+                raise
+            logger.info(
+                "Diff too large for %s#%s (status %s); falling back to the files API",
+                repo_full_name,
+                pr_number,
+                exc.status_code,
+            )
+    return render_unified_diff(await fetch_pr_file_patches_async(repo_full_name, pr_number, installation_id))
@@ -0,0 +1,287 @@
+"""Daily rollups of review, finding and LLM usage counts behind ``GET /metrics``.
+
+The review worker adds each finished review to the rollup rows of its day,
+repository and pipeline, in the same transaction that stores the result. The
+counts can't drift from the results they describe, and the metrics endpoint
+reads at most a few rows per day of the window, however many reviews there
+are. Latency percentiles come from fixed-bucket histograms, which, unlike
+percentiles, can be summed across days and repositories.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.review_request import ReviewRequest
+from app.models.review_rollup import CommentDailyRollup, LatencyDailyHistogram, ReviewDailyRollup
+from app.schemas.metrics_schemas import DailyMetrics, MetricsResponse
+from app.schemas.review_schemas import ReviewComment
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, math.inf)
+
+_REVIEW_COUNTERS = (
+    "reviews_completed",
+    "reviews_failed",
+    "comments_total",
+    "files_reviewed",
+    "llm_requests",
+    "llm_tokens_prompt",
+    "llm_tokens_completion",
+    "review_seconds_total",
+)
+
+
+def bucket_index(seconds: float) -> int:
+    return bisect.bisect_left(LATENCY_BUCKETS, max(seconds, 0.0))
+
+
+def percentile(buckets: Mapping[int, int], quantile: float) -> float:
+    """Estimate a percentile from bucket counts, interpolating linearly inside the bucket."""
+
+    total = sum(buckets.values())
+    if not total:
+        return 0.0
+    rank = quantile * total
+    seen = 0
+    for index in sorted(buckets):
+        count = buckets[index]
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+            upper = LATENCY_BUCKETS[index]
+            if math.isinf(upper):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return 0.0
+
+
+def _upsert(db: Session, model, keys: Sequence[str], rows: List[Dict[str, Any]]) -> None:
+    """Add each row's counters to the row with the same keys, creating it if needed."""
+
+    if not rows:
+        return
+    counters = [column for column in rows[0] if column not in keys]
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect = postgresql if dialect_name == "postgresql" else sqlite
+        statement = dialect.insert(model)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: getattr(model, column) + getattr(statement.excluded, column) for column in counters},
+        )
+        db.execute(statement, rows)
+        return
+    for row in rows:
+        updated = db.execute(
+            update(model)
+            .where(*(getattr(model, key) == row[key] for key in keys))
+            .values({column: getattr(model, column) + row[column] for column in counters})
+        )
+        if not updated.rowcount:
+            db.execute(insert(model).values(**row))
+
+
+def _review_row(day: date, repo: str, pipeline: str, **counters: Any) -> Dict[str, Any]:
+    row: Dict[str, Any] = {"day": day, "repo": repo, "pipeline": pipeline}
+    row.update({column: counters.get(column, 0) for column in _REVIEW_COUNTERS})
+    return row
+
+
+def _latency_row(day: date, repo: str, pipeline: str, metric: str, seconds: float) -> Dict[str, Any]:
+    return {
+        "day": day,
+        "repo": repo,
+        "pipeline": pipeline,
+        "metric": metric,
+        "bucket": bucket_index(seconds),
+        "count": 1,
+    }
+
+
+def record_completed(
+    db: Session,
+    review: ReviewRequest,
+    pipeline: str,
+    comments: Sequence[ReviewComment],
+    metadata: Mapping[str, Any],
+    duration_seconds: float,
+) -> None:
+    """Add a completed review to today's rollups; the caller commits with the result."""
+
+    day = datetime.utcnow().date()
+    repo = review.repo or ""
+    llm_requests = 1 if metadata.get("latency_ms") is not None else 0
+
+    _upsert(
+        db,
+        ReviewDailyRollup,
+        ("day", "repo", "pipeline"),
+        [
+            _review_row(
+                day,
+                repo,
+                pipeline,
+                reviews_completed=1,
+                comments_total=len(comments),
+                files_reviewed=int(metadata.get("files_reviewed") or 0),
+                llm_requests=llm_requests,
+                llm_tokens_prompt=int(metadata.get("tokens_prompt") or 0),
+                llm_tokens_completion=int(metadata.get("tokens_completion") or 0),
+                review_seconds_total=duration_seconds,
+            )
+        ],
+    )
+
+    findings = Counter((comment.severity, comment.category) for comment in comments)
+    _upsert(
+        db,
+        CommentDailyRollup,
+        ("day", "repo", "pipeline", "severity", "category"),
+        [
+            {"day": day, "repo": repo, "pipeline": pipeline, "severity": severity, "category": category, "count": count}
+            for (severity, category), count in sorted(findings.items())
+        ],
+    )
+
+    latencies = [_latency_row(day, repo, pipeline, "review", duration_seconds)]
+    if llm_requests:
+        latencies.append(_latency_row(day, repo, pipeline, "llm", float(metadata["latency_ms"]) / 1000))
+    _upsert(db, LatencyDailyHistogram, ("day", "repo", "pipeline", "metric", "bucket"), latencies)
+
+
+def record_failed(db: Session, review: ReviewRequest, pipeline: str) -> None:
+    """Add a failed review to today's rollups; the caller commits with the status change."""
+
+    _upsert(
+        db,
+        ReviewDailyRollup,
+        ("day", "repo", "pipeline"),
+        [_review_row(datetime.utcnow().date(), review.repo or "", pipeline, reviews_failed=1)],
+    )
+
+
+def _filtered(query, model, since: date, until: date, repo: Optional[str], pipeline: Optional[str]):
+    query = query.where(model.day >= since, model.day <= until)
+    if repo is not None:
+        query = query.where(model.repo == repo)
+    if pipeline is not None:
+        query = query.where(model.pipeline == pipeline)
+    return query
+
+
+def _in_flight(db: Session, repo: Optional[str]) -> Dict[str, int]:
+    # Pending and running reviews are few and served by the (status, created_at) index.
+    query = (
+        select(ReviewRequest.status, func.count())
+        .where(ReviewRequest.status.in_(("pending", "running")))
+        .group_by(ReviewRequest.status)
+    )
+    if repo is not None:
+        query = query.where(ReviewRequest.repo == (repo or None))
+    counts = {"pending": 0, "running": 0}
+    counts.update({status: count for status, count in db.execute(query)})
+    return counts
+
+
+def get_metrics_summary(
+    db: Session,
+    *,
+    days: int = 30,
+    repo: Optional[str] = None,
+    pipeline: Optional[str] = None,
+    today: Optional[date] = None,
+) -> MetricsResponse:
+    """Totals of the last ``days`` days (including today), read from the rollup tables."""
+
+    until = today or datetime.utcnow().date()
+    since = until - timedelta(days=days - 1)
+
+    daily_rows = db.execute(
+        _filtered(
+            select(
+                ReviewDailyRollup.day,
+                func.sum(ReviewDailyRollup.reviews_completed),
+                func.sum(ReviewDailyRollup.reviews_failed),
+                func.sum(ReviewDailyRollup.comments_total),
+                func.sum(ReviewDailyRollup.llm_requests),
+                func.sum(ReviewDailyRollup.llm_tokens_prompt),
+                func.sum(ReviewDailyRollup.llm_tokens_completion),
+                func.sum(case((ReviewDailyRollup.pipeline == "llm", ReviewDailyRollup.reviews_failed), else_=0)),
+            ),
+            ReviewDailyRollup,
+            since,
+            until,
+            repo,
+            pipeline,
+        )
+        .group_by(ReviewDailyRollup.day)
+        .order_by(ReviewDailyRollup.day)
+    ).all()
+
+    summary = MetricsResponse(since=since.isoformat(), until=until.isoformat())
+    completed = failed = 0
+    for day, day_completed, day_failed, comments, llm_requests, prompt, completion, llm_failed in daily_rows:
+        completed += day_completed or 0
+        failed += day_failed or 0
+        summary.comments_total += comments or 0
+        summary.llm_requests_total += llm_requests or 0
+        summary.llm_tokens_prompt += prompt or 0
+        summary.llm_tokens_completion += completion or 0
+        summary.llm_errors_total += llm_failed or 0
+        summary.daily.append(
+            DailyMetrics(
+                day=day.isoformat(),
+                reviews_completed=day_completed or 0,
+                reviews_failed=day_failed or 0,
+                comments=comments or 0,
+                llm_tokens=(prompt or 0) + (completion or 0),
+            )
+        )
+    summary.llm_tokens_total = summary.llm_tokens_prompt + summary.llm_tokens_completion
+
+    summary.reviews_by_status = {**_in_flight(db, repo), "completed": completed, "failed": failed}
+    summary.reviews_total = sum(summary.reviews_by_status.values())
+
+    severities: Dict[str, int] = defaultdict(int)
+    categories: Dict[str, int] = defaultdict(int)
+    for severity, category, count in db.execute(
+        _filtered(
+            select(CommentDailyRollup.severity, CommentDailyRollup.category, func.sum(CommentDailyRollup.count)),
+            CommentDailyRollup,
+            since,
+            until,
+            repo,
+            pipeline,
+        ).group_by(CommentDailyRollup.severity, CommentDailyRollup.category)
+    ):
+        severities[severity] += count
+        categories[category] += count
+    summary.comments_by_severity = dict(severities)
+    summary.comments_by_category = dict(categories)
+
+    histograms: Dict[str, Dict[int, int]] = defaultdict(dict)
+    for metric, bucket, count in db.execute(
+        _filtered(
+            select(LatencyDailyHistogram.metric, LatencyDailyHistogram.bucket, func.sum(LatencyDailyHistogram.count)),
+            LatencyDailyHistogram,
+            since,
+            until,
+            repo,
+            pipeline,
+        ).group_by(LatencyDailyHistogram.metric, LatencyDailyHistogram.bucket)
+    ):
+        histograms[metric][bucket] = count
+    summary.llm_latency_p50 = percentile(histograms["llm"], 0.5)
+    summary.llm_latency_p95 = percentile(histograms["llm"], 0.95)
+    summary.review_duration_p50 = percentile(histograms["review"], 0.5)
+    summary.review_duration_p95 = percentile(histograms["review"], 0.95)
+    return summary
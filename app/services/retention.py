@@ -0,0 +1,209 @@
+"""Retention for old reviews: drop stale diffs early, archive and delete whole reviews later.
+
+Every step runs in bounded batches, one short transaction each, with a pause
+between batches, so a run never holds locks for long or starves the API and the
+review workers. Deleted reviews are first appended to a gzip JSONL archive in
+the format of :mod:`app.services.review_export`, which is flushed to disk
+before the delete commits; if a run dies between the two, the next run
+archives the batch again (duplicates, never loss).
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session, undefer
+
+from app.core.config import Settings
+from app.models.diff_blob import DiffBlob
+from app.models.review_comment import ReviewCommentRecord
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.diff_store import review_diff
+from app.services.review_cache import invalidate_response
+from app.services.review_export import EXPORT_COLUMNS, FINISHED_STATUSES, review_record
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionReport:
+    diffs_dropped: int = 0
+    reviews_archived: int = 0
+    blobs_deleted: int = 0
+    archive_path: Optional[str] = None
+
+
+class ReviewArchive:
+    """Append-only gzip JSONL file, opened on the first write."""
+
+    def __init__(self, directory: str, now: datetime):
+        self.path = Path(directory) / f"reviews-{now:%Y%m%dT%H%M%S}.jsonl.gz"
+        self._raw = None
+        self._gzip: Optional[gzip.GzipFile] = None
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> None:
+        if self._gzip is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._raw = open(self.path, "ab")
+            self._gzip = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        for record in records:
+            self._gzip.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        # Durable before the caller deletes the rows.
+        self._gzip.flush(zlib.Z_SYNC_FLUSH)
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self) -> None:
+        if self._gzip is not None:
+            self._gzip.close()
+            self._raw.close()
+            self._gzip = self._raw = None
+
+
+def _delete_orphan_blobs(db: Session, candidates: Set[str]) -> int:
+    """Delete those of ``candidates`` that no review references any more; the caller commits."""
+
+    if not candidates:
+        return 0
+    referenced = exists().where(ReviewRequest.diff_sha256 == DiffBlob.sha256)
+    deleted = db.execute(delete(DiffBlob).where(DiffBlob.sha256.in_(candidates), ~referenced))
+    return deleted.rowcount or 0
+
+
+def drop_old_diffs(db: Session, cutoff: datetime, batch_size: int) -> Tuple[int, int]:
+    """Detach the diff of one batch of completed reviews created before ``cutoff``.
+
+    Commits; returns the number of reviews changed and of blobs deleted.
+    """
+
+    rows = db.execute(
+        select(ReviewRequest.id, ReviewRequest.diff_sha256)
+        .where(
+            ReviewRequest.status == "completed",
+            ReviewRequest.created_at < cutoff,
+            (ReviewRequest.diff_sha256.isnot(None)) | (ReviewRequest.diff_snapshot.isnot(None)),
+        )
+        .order_by(ReviewRequest.created_at, ReviewRequest.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0, 0
+    db.execute(
+        update(ReviewRequest)
+        .where(ReviewRequest.id.in_([row.id for row in rows]))
+        .values(diff_sha256=None, diff_snapshot=None)
+        .execution_options(synchronize_session=False)
+    )
+    blobs = _delete_orphan_blobs(db, {row.diff_sha256 for row in rows if row.diff_sha256})
+    db.commit()
+    return len(rows), blobs
+
+
+def _archive_record(db: Session, review: ReviewRequest, result: Optional[ReviewResult]) -> Dict[str, Any]:
+    return review_record(
+        {column: getattr(review, column) for column in EXPORT_COLUMNS},
+        {"summary": result.summary, "raw_response": result.raw_response, "created_at": result.created_at}
+        if result
+        else None,
+        review_diff(db, review),
+    )
+
+
+def archive_old_reviews(
+    db: Session, cutoff: datetime, batch_size: int, archive: Optional[ReviewArchive]
+) -> Tuple[int, int]:
+    """Archive (when ``archive`` is given) and delete one batch of finished reviews created before ``cutoff``.
+
+    Commits; returns the number of reviews and of diff blobs deleted.
+    """
+
+    rows = db.execute(
+        select(ReviewRequest, ReviewResult)
+        .outerjoin(ReviewResult, ReviewResult.review_request_id == ReviewRequest.id)
+        .where(ReviewRequest.status.in_(FINISHED_STATUSES), ReviewRequest.created_at < cutoff)
+        .options(undefer(ReviewRequest.diff_snapshot))
+        .order_by(ReviewRequest.created_at, ReviewRequest.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0, 0
+    if archive is not None:
+        archive.write(_archive_record(db, review, result) for review, result in rows)
+
+    ids: List[str] = [review.id for review, _ in rows]
+    db.execute(delete(ReviewCommentRecord).where(ReviewCommentRecord.review_request_id.in_(ids)))
+    db.execute(delete(ReviewResult).where(ReviewResult.review_request_id.in_(ids)))
+    db.execute(delete(ReviewRequest).where(ReviewRequest.id.in_(ids)).execution_options(synchronize_session=False))
+    blobs = _delete_orphan_blobs(db, {review.diff_sha256 for review, _ in rows if review.diff_sha256})
+    db.commit()
+    db.expunge_all()
+    # GET /reviews/{id} would otherwise keep serving deleted reviews from Redis.
+    for review_id in ids:
+        invalidate_response(review_id)
+    return len(ids), blobs
+
+
+def run_retention(
+    db: Session,
+    config: Settings,
+    *,
+    now: Optional[datetime] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> RetentionReport:
+    """Drop stale diffs, then archive and delete expired reviews, within ``config.retention_max_batches``."""
+
+    now = now or datetime.utcnow()
+    report = RetentionReport()
+    batches = 0
+
+    def _pause() -> None:
+        if config.retention_batch_pause_seconds > 0:
+            sleep(config.retention_batch_pause_seconds)
+
+    if config.retention_diff_days > 0:
+        cutoff = now - timedelta(days=config.retention_diff_days)
+        while batches < config.retention_max_batches:
+            dropped, blobs = drop_old_diffs(db, cutoff, config.retention_batch_size)
+            if not dropped:
+                break
+            batches += 1
+            report.diffs_dropped += dropped
+            report.blobs_deleted += blobs
+            if dropped < config.retention_batch_size:
+                break
+            _pause()
+
+    if config.retention_review_days > 0:
+        cutoff = now - timedelta(days=config.retention_review_days)
+        archive = ReviewArchive(config.retention_archive_dir, now) if config.retention_archive_dir else None
+        try:
+            while batches < config.retention_max_batches:
+                deleted, blobs = archive_old_reviews(db, cutoff, config.retention_batch_size, archive)
+                if not deleted:
+                    break
+                batches += 1
+                report.reviews_archived += deleted
+                report.blobs_deleted += blobs
+                if deleted < config.retention_batch_size:
+                    break
+                _pause()
+        finally:
+            if archive is not None:
+                archive.close()
+                if report.reviews_archived:
+                    report.archive_path = str(archive.path)
+
+    if batches >= config.retention_max_batches:
+        logger.info("Retention stopped after %d batches; the next run continues", batches)
+    return report
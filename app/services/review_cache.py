@@ -0,0 +1,88 @@
+"""Redis cache of serialized ``ReviewResponse`` bodies for finished reviews.
+
+A completed review never changes, so its response body is serialized once and
+stored in Redis with a strong ETag. The worker fills the entry when it stores the
+result. ``GET /reviews/{id}`` fills it on a miss and answers ``If-None-Match``
+polls with ``304``, without touching the database. The entry is dropped when a
+review's status moves on from a cacheable one and when retention deletes the
+review.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.redis_client import get_redis_client
+from app.schemas.review_schemas import ReviewResponse
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a review's response is final.
+CACHEABLE_STATUSES = {"completed", "superseded"}
+
+
+def _key(review_id: str) -> str:
+    return f"review:response:{review_id}"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def serialize_response(response: ReviewResponse) -> CachedResponse:
+    body = response.model_dump_json().encode("utf-8")
+    return CachedResponse(body=body, etag=make_etag(body))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def get_cached_response(review_id: str) -> Optional[CachedResponse]:
+    try:
+        body, etag = get_redis_client().hmget(_key(review_id), "body", "etag")
+    except RedisError:
+        logger.warning("Review response cache unavailable", exc_info=True)
+        return None
+    if body is None or etag is None:
+        return None
+    return CachedResponse(body=body, etag=etag.decode())
+
+
+def cache_response(response: ReviewResponse) -> CachedResponse:
+    """Serialize ``response`` and, if the review is finished, store it; returns the serialized form."""
+
+    cached = serialize_response(response)
+    if response.status not in CACHEABLE_STATUSES:
+        return cached
+    key = _key(response.id)
+    try:
+        pipe = get_redis_client().pipeline()
+        pipe.hset(key, mapping={"body": cached.body, "etag": cached.etag})
+        pipe.expire(key, get_settings().review_cache_ttl_seconds)
+        pipe.execute()
+    except RedisError:
+        logger.warning("Failed to cache response of review %s", response.id, exc_info=True)
+    return cached
+
+
+def invalidate_response(review_id: str) -> None:
+    try:
+        get_redis_client().delete(_key(review_id))
+    except RedisError:
+        logger.warning("Failed to invalidate cached response of review %s", review_id, exc_info=True)
@@ -0,0 +1,73 @@
+"""Per-PR coalescing so only the newest push of a pull request gets reviewed."""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.core.redis_client import get_async_redis_client, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Long enough to outlive any queued/debounced job for the PR.
+_LATEST_TTL_SECONDS = 7 * 24 * 3600
+
+
+def _latest_key(repo: str, pr_number: int | str) -> str:
+    return f"review:latest:{repo}#{pr_number}"
+
+
+def register_latest_review(repo: str, pr_number: int | str, review_id: str) -> Optional[str]:
+    """Mark ``review_id`` as the newest review for the PR and return the one it replaces."""
+
+    try:
+        previous = get_redis_client().set(
+            _latest_key(repo, pr_number),
+            review_id,
+            ex=_LATEST_TTL_SECONDS,
+            get=True,
+        )
+    except RedisError:
+        logger.warning("Redis unavailable for review coalescing; not superseding", exc_info=True)
+        return None
+    if previous is None:
+        return None
+    previous_id = previous.decode() if isinstance(previous, bytes) else str(previous)
+    return previous_id if previous_id != review_id else None
+
+
+async def register_latest_review_async(repo: str, pr_number: int | str, review_id: str) -> Optional[str]:
+    """Async variant of :func:`register_latest_review` for the ingest routes."""
+
+    try:
+        previous = await get_async_redis_client().set(
+            _latest_key(repo, pr_number),
+            review_id,
+            ex=_LATEST_TTL_SECONDS,
+            get=True,
+        )
+    except RedisError:
+        logger.warning("Redis unavailable for review coalescing; not superseding", exc_info=True)
+        return None
+    if previous is None:
+        return None
+    previous_id = previous.decode() if isinstance(previous, bytes) else str(previous)
+    return previous_id if previous_id != review_id else None
+
+
+def is_superseded(review) -> bool:
+    """True when a newer review has been registered for the same PR."""
+
+    if getattr(review, "source", None) != "github" or not review.repo or not review.pr_number:
+        return False
+    try:
+        latest = get_redis_client().get(_latest_key(review.repo, review.pr_number))
+    except RedisError:
+        logger.warning("Redis unavailable for supersede check; continuing review", exc_info=True)
+        return False
+    if latest is None:
+        return False
+    latest_id = latest.decode() if isinstance(latest, bytes) else str(latest)
+    return latest_id != review.id
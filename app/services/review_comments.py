@@ -0,0 +1,139 @@
+"""Findings stored one row per comment in ``review_comments``.
+
+``ReviewResult.raw_response`` keeps the full JSON for the response cache. The
+rows written alongside it let the API page through very large reviews and
+filter them, and let analytics queries group by category, severity or file in
+SQL.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.review_comment import ReviewCommentRecord
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.schemas.review_schemas import ReviewComment
+from app.services.review_service import load_review_payload
+
+logger = logging.getLogger(__name__)
+
+
+def _rows(review: ReviewRequest, comments: Sequence[ReviewComment], created_at: datetime) -> List[Dict[str, Any]]:
+    return [
+        {
+            "review_request_id": review.id,
+            "position": position,
+            "repo": review.repo,
+            "agent": comment.agent,
+            "file_path": comment.file_path,
+            "line_start": comment.line_number_start,
+            "line_end": comment.line_number_end,
+            "category": comment.category,
+            "severity": comment.severity,
+            "title": comment.title,
+            "body": comment.body,
+            "suggested_fix": comment.suggested_fix,
+            "created_at": created_at,
+        }
+        for position, comment in enumerate(comments)
+    ]
+
+
+def insert_review_comments(db: Session, review: ReviewRequest, comments: Sequence[ReviewComment]) -> None:
+    """Store ``comments`` as the findings of ``review``; the caller commits.
+
+    Uses one executemany INSERT, so thousands of findings cost a single round trip.
+    """
+
+    rows = _rows(review, comments, datetime.utcnow())
+    if rows:
+        db.execute(insert(ReviewCommentRecord), rows)
+
+
+def replace_review_comments(db: Session, review: ReviewRequest, comments: Sequence[ReviewComment]) -> None:
+    """Like :func:`insert_review_comments`, dropping findings stored for ``review`` before."""
+
+    db.execute(delete(ReviewCommentRecord).where(ReviewCommentRecord.review_request_id == review.id))
+    insert_review_comments(db, review, comments)
+
+
+def to_schema(row: ReviewCommentRecord) -> ReviewComment:
+    return ReviewComment(
+        agent=row.agent,
+        file_path=row.file_path,
+        line_number_start=row.line_start,
+        line_number_end=row.line_end,
+        category=row.category,
+        severity=row.severity,
+        title=row.title,
+        body=row.body,
+        suggested_fix=row.suggested_fix,
+    )
+
+
+def list_review_comments(
+    db: Session,
+    review_id: str,
+    *,
+    severity: Optional[str] = None,
+    category: Optional[str] = None,
+    file_path: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = 100,
+) -> Tuple[List[ReviewCommentRecord], Optional[int]]:
+    """One page of a review's findings in pipeline order, and the position to continue after."""
+
+    query = select(ReviewCommentRecord).where(ReviewCommentRecord.review_request_id == review_id)
+    if severity:
+        query = query.where(ReviewCommentRecord.severity == severity)
+    if category:
+        query = query.where(ReviewCommentRecord.category == category)
+    if file_path:
+        query = query.where(ReviewCommentRecord.file_path == file_path)
+    if after is not None:
+        query = query.where(ReviewCommentRecord.position > after)
+    query = query.order_by(ReviewCommentRecord.position).limit(limit + 1)
+
+    rows = list(db.execute(query).scalars())
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], rows[limit - 1].position
+
+
+def backfill_review_comments(db: Session, batch_size: int = 200) -> int:
+    """Write ``review_comments`` rows for results stored before the table existed.
+
+    Commits once per batch; returns the number of reviews backfilled.
+    """
+
+    has_rows = select(ReviewCommentRecord.id).where(ReviewCommentRecord.review_request_id == ReviewResult.review_request_id)
+    backfilled = 0
+    last_id = ""
+    while True:
+        batch = db.execute(
+            select(ReviewRequest, ReviewResult.raw_response)
+            .join(ReviewResult, ReviewResult.review_request_id == ReviewRequest.id)
+            .where(ReviewRequest.id > last_id, ReviewResult.raw_response.isnot(None), ~has_rows.exists())
+            .order_by(ReviewRequest.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return backfilled
+        for review, raw_response in batch:
+            try:
+                comments, _ = load_review_payload(raw_response)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                logger.warning("Skipping review %s: unreadable raw_response", review.id)
+                continue
+            replace_review_comments(db, review, comments)
+            backfilled += 1
+        db.commit()
+        last_id = batch[-1][0].id
+        logger.info("Backfilled findings of %d review(s) so far", backfilled)
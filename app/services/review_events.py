@@ -0,0 +1,89 @@
+"""Review progress events over Redis pub/sub, streamed to clients as server-sent events.
+
+The review worker publishes each status transition, and each finding once the
+result is stored, on ``review:events:{id}``. ``GET /reviews/{id}/events``
+relays them, so a dashboard keeps one idle connection open instead of polling.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable
+
+import orjson
+from redis.exceptions import RedisError
+
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "superseded"}
+
+
+def channel(review_id: str) -> str:
+    return f"review:events:{review_id}"
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def _message(event: str, data: Dict[str, Any]) -> bytes:
+    return orjson.dumps({"event": event, "data": data})
+
+
+def publish_status(review_id: str, status: str) -> None:
+    try:
+        get_redis_client().publish(channel(review_id), _message("status", {"id": review_id, "status": status}))
+    except RedisError:
+        logger.warning("Failed to publish status of review %s", review_id, exc_info=True)
+
+
+def publish_findings(review_id: str, findings: Iterable[Dict[str, Any]]) -> None:
+    """Publish one ``finding`` event per comment in a single round trip."""
+
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for finding in findings:
+            pipe.publish(channel(review_id), _message("finding", {"id": review_id, **finding}))
+        pipe.execute()
+    except RedisError:
+        logger.warning("Failed to publish findings of review %s", review_id, exc_info=True)
+
+
+async def stream_events(
+    review_id: str,
+    status: str,
+    pubsub,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    *,
+    heartbeat_seconds: float = 15.0,
+    poll_seconds: float = 1.0,
+) -> AsyncIterator[bytes]:
+    """Relay events of one review until it reaches a terminal status or the client leaves.
+
+    ``pubsub`` must already be subscribed to :func:`channel` before ``status`` is
+    read, so no transition can fall between the two.
+    """
+
+    try:
+        yield sse_event("status", {"id": review_id, "status": status})
+        if status in TERMINAL_STATUSES:
+            return
+        last_sent = time.monotonic()
+        while not await is_disconnected():
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=poll_seconds)
+            if message is None:
+                if time.monotonic() - last_sent >= heartbeat_seconds:
+                    yield b": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                continue
+            payload = orjson.loads(message["data"])
+            yield sse_event(payload["event"], payload["data"])
+            last_sent = time.monotonic()
+            if payload["event"] == "status" and payload["data"].get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.unsubscribe(channel(review_id))
+        await pubsub.aclose()
@@ -0,0 +1,256 @@
+"""NDJSON export and bulk import of review history.
+
+One line per review::
+
+    {"review": {...columns...}, "result": {"summary", "raw_response", "created_at"} | null, "diff": "..." | null}
+
+Retention archives use the same format, so archived reviews can be imported
+again. Export streams plain rows through a server-side cursor (``yield_per``),
+so memory stays flat whatever the table size. Import inserts in batches with
+executemany, skips ids that already exist, and rebuilds diff blobs and
+``review_comments`` rows on the way in.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.diff_blob import DiffBlob
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.diff_store import decode_diff, store_diff
+from app.services.review_comments import insert_review_comments
+from app.services.review_service import load_review_payload
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = (
+    "id",
+    "source",
+    "status",
+    "repo",
+    "pr_number",
+    "installation_id",
+    "head_sha",
+    "diff_sha256",
+    "diff_size",
+    "created_at",
+    "updated_at",
+)
+_DATETIME_COLUMNS = {"created_at", "updated_at"}
+# Only finished reviews are imported: no job would ever pick up a pending or running one.
+FINISHED_STATUSES = ("completed", "failed", "superseded")
+
+
+class InvalidRecordError(ValueError):
+    """Raised for an import line that is not a review record."""
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: int = 0
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _record_error(record: Any) -> Optional[str]:
+    """Why ``record`` can't be imported, or None when it can."""
+
+    if not isinstance(record, dict) or not isinstance(record.get("review"), dict):
+        return "not a review record"
+    review = record["review"]
+    for column in ("id", "source", "status"):
+        if not isinstance(review.get(column), str) or not review[column]:
+            return f"review.{column} is missing"
+    if review["status"] not in FINISHED_STATUSES:
+        return f"review {review['id']} is {review['status']}; only finished reviews can be imported"
+    result = record.get("result")
+    if result is not None and not isinstance(result, dict):
+        return "result is not an object"
+    if record.get("diff") is not None and not isinstance(record["diff"], str):
+        return "diff is not a string"
+    timestamps = [(f"review.{column}", review.get(column)) for column in sorted(_DATETIME_COLUMNS)]
+    if result:
+        timestamps.append(("result.created_at", result.get("created_at")))
+    for field, value in timestamps:
+        try:
+            _parse_datetime(value)
+        except (TypeError, ValueError):
+            return f"{field} is not an ISO timestamp: {value!r}"
+    return None
+
+
+def review_record(
+    review: Mapping[str, Any], result: Optional[Mapping[str, Any]], diff: Optional[str]
+) -> Dict[str, Any]:
+    return {
+        "review": {column: _json_value(review[column]) for column in EXPORT_COLUMNS},
+        "result": (
+            {
+                "summary": result["summary"],
+                "raw_response": result["raw_response"],
+                "created_at": _json_value(result["created_at"]),
+            }
+            if result is not None
+            else None
+        ),
+        "diff": diff,
+    }
+
+
+def iter_review_records(
+    db: Session,
+    *,
+    status: Optional[str] = None,
+    repo: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    include_diff: bool = False,
+    batch_size: int = 500,
+) -> Iterator[Dict[str, Any]]:
+    """Export records oldest first, fetched ``batch_size`` rows at a time from a server-side cursor.
+
+    Selects columns rather than entities, so nothing accumulates in the session.
+    """
+
+    review_table = ReviewRequest.__table__
+    columns = [review_table.c[column] for column in EXPORT_COLUMNS] + [
+        ReviewResult.id.label("result_id"),
+        ReviewResult.summary,
+        ReviewResult.raw_response,
+        ReviewResult.created_at.label("result_created_at"),
+    ]
+    query = select(*columns).outerjoin(ReviewResult, ReviewResult.review_request_id == ReviewRequest.id)
+    if include_diff:
+        query = query.add_columns(
+            review_table.c.diff_snapshot, DiffBlob.encoding.label("diff_encoding"), DiffBlob.data.label("diff_data")
+        ).outerjoin(DiffBlob, DiffBlob.sha256 == ReviewRequest.diff_sha256)
+    if status:
+        query = query.where(ReviewRequest.status == status)
+    if repo:
+        query = query.where(ReviewRequest.repo == repo)
+    if source:
+        query = query.where(ReviewRequest.source == source)
+    if created_after:
+        query = query.where(ReviewRequest.created_at >= created_after)
+    if created_before:
+        query = query.where(ReviewRequest.created_at < created_before)
+    query = query.order_by(ReviewRequest.created_at, ReviewRequest.id).execution_options(yield_per=batch_size)
+
+    for row in db.execute(query).mappings():
+        diff = None
+        if include_diff:
+            diff = decode_diff(row["diff_encoding"], row["diff_data"]) if row["diff_data"] else row["diff_snapshot"]
+        result = (
+            {"summary": row["summary"], "raw_response": row["raw_response"], "created_at": row["result_created_at"]}
+            if row["result_id"] is not None
+            else None
+        )
+        yield review_record(row, result, diff)
+
+
+def parse_records(lines: Iterable[str | bytes], first_line: int = 1) -> Iterator[Dict[str, Any]]:
+    """Parse and validate NDJSON lines, skipping blank ones; ``first_line`` numbers lines in error messages."""
+
+    for number, line in enumerate(lines, start=first_line):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise InvalidRecordError(f"line {number}: {exc.msg}") from exc
+        error = _record_error(record)
+        if error:
+            raise InvalidRecordError(f"line {number}: {error}")
+        yield record
+
+
+def import_review_batch(db: Session, records: List[Dict[str, Any]]) -> ImportReport:
+    """Insert one batch of records in a single transaction; ids that already exist are skipped."""
+
+    ids = [record["review"]["id"] for record in records]
+    existing = set(db.scalars(select(ReviewRequest.id).where(ReviewRequest.id.in_(ids))))
+    report = ImportReport()
+    reviews: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+    findings = []
+    for record in records:
+        data = record["review"]
+        if data["id"] in existing:
+            report.skipped += 1
+            continue
+        existing.add(data["id"])
+        review = {column: data.get(column) for column in EXPORT_COLUMNS}
+        for column in _DATETIME_COLUMNS:
+            review[column] = _parse_datetime(review[column])
+        review["diff_sha256"] = None
+        review["diff_stored_size"] = None
+        if record.get("diff"):
+            stored = store_diff(db, record["diff"])
+            review.update(diff_sha256=stored.sha256, diff_size=stored.size, diff_stored_size=stored.stored_size)
+        reviews.append(review)
+
+        result = record.get("result")
+        if result:
+            results.append(
+                {
+                    "review_request_id": data["id"],
+                    "summary": result.get("summary"),
+                    "raw_response": result.get("raw_response"),
+                    "created_at": _parse_datetime(result.get("created_at")),
+                }
+            )
+            try:
+                comments, _ = load_review_payload(result.get("raw_response"))
+            except (json.JSONDecodeError, TypeError, ValueError):
+                logger.warning("Review %s has an unreadable raw_response; importing it without findings", data["id"])
+                comments = []
+            if comments:
+                findings.append((ReviewRequest(id=data["id"], repo=data.get("repo")), comments))
+
+    if reviews:
+        db.execute(insert(ReviewRequest), reviews)
+    if results:
+        db.execute(insert(ReviewResult), results)
+    for review, comments in findings:
+        insert_review_comments(db, review, comments)
+    db.commit()
+    report.imported = len(reviews)
+    return report
+
+
+def import_review_records(db: Session, records: Iterable[Dict[str, Any]], batch_size: int = 500) -> ImportReport:
+    """Import ``records`` in batches of ``batch_size``, one transaction each."""
+
+    report = ImportReport()
+    batch: List[Dict[str, Any]] = []
+
+    def _flush() -> None:
+        batch_report = import_review_batch(db, batch)
+        report.imported += batch_report.imported
+        report.skipped += batch_report.skipped
+        batch.clear()
+        logger.info("Imported %d review(s) so far, skipped %d existing", report.imported, report.skipped)
+
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+    return report
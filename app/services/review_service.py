@@ -1,9 +1,17 @@
-from typing import Optional, Tuple
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import Row, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.review_request import ReviewRequest
 from app.models.review_result import ReviewResult
+from app.schemas.review_schemas import ReviewComment, ReviewMetrics, ReviewResponse
+from app.services.diff_store import attach_diff, store_diff, store_diff_async
 
 
 def create_review_request(
@@ -13,20 +21,97 @@ def create_review_request(
     diff: Optional[str],
     repo: Optional[str],
     pr_number: Optional[int],
+    installation_id: Optional[int] = None,
+    head_sha: Optional[str] = None,
 ) -> ReviewRequest:
     review = ReviewRequest(
         source=source,
-        diff_snapshot=diff,
         repo=repo,
         pr_number=str(pr_number) if pr_number is not None else None,
+        installation_id=str(installation_id) if installation_id is not None else None,
+        head_sha=head_sha,
         status="pending",
     )
+    if diff:
+        attach_diff(review, store_diff(db, diff))
     db.add(review)
     db.commit()
     db.refresh(review)
     return review
 
 
+async def create_review_request_async(
+    db: AsyncSession,
+    *,
+    source: str,
+    diff: Optional[str],
+    repo: Optional[str],
+    pr_number: Optional[int],
+    installation_id: Optional[int] = None,
+    head_sha: Optional[str] = None,
+) -> ReviewRequest:
+    """Async variant of :func:`create_review_request`.
+
+    Column defaults are generated client-side, so the row is complete after the
+    INSERT and no follow-up SELECT (refresh) is needed.
+    """
+
+    review = ReviewRequest(
+        source=source,
+        repo=repo,
+        pr_number=str(pr_number) if pr_number is not None else None,
+        installation_id=str(installation_id) if installation_id is not None else None,
+        head_sha=head_sha,
+        status="pending",
+    )
+    if diff:
+        attach_diff(review, await store_diff_async(db, diff))
+    db.add(review)
+    await db.commit()
+    return review
+
+
+async def supersede_pending_review_async(db: AsyncSession, review_id: str) -> bool:
+    """Async variant of :func:`supersede_pending_review`."""
+
+    result = await db.execute(
+        update(ReviewRequest)
+        .where(ReviewRequest.id == review_id, ReviewRequest.status == "pending")
+        .values(status="superseded", updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    return bool(result.rowcount)
+
+
+async def fail_unqueued_review_async(db: AsyncSession, review_id: str) -> bool:
+    """Mark a pending review whose job could not be enqueued as failed; nothing would ever run it."""
+
+    await db.rollback()
+    result = await db.execute(
+        update(ReviewRequest)
+        .where(ReviewRequest.id == review_id, ReviewRequest.status == "pending")
+        .values(status="failed", updated_at=datetime.utcnow())
+    )
+    await db.commit()
+    return bool(result.rowcount)
+
+
+def supersede_pending_review(db: Session, review_id: str) -> bool:
+    """Mark a review that has not started yet as superseded; returns False if it already started."""
+
+    updated = (
+        db.query(ReviewRequest)
+        .filter(ReviewRequest.id == review_id, ReviewRequest.status == "pending")
+        .update({"status": "superseded", "updated_at": datetime.utcnow()}, synchronize_session=False)
+    )
+    db.commit()
+    return bool(updated)
+
+
+async def get_review_status_async(db: AsyncSession, review_id: str) -> Optional[str]:
+    return await db.scalar(select(ReviewRequest.status).where(ReviewRequest.id == review_id))
+
+
 def get_review_with_result(db: Session, review_id: str) -> Tuple[Optional[ReviewRequest], Optional[ReviewResult]]:
     review = db.query(ReviewRequest).filter(ReviewRequest.id == review_id).first()
     if not review:
@@ -37,3 +122,118 @@ def get_review_with_result(db: Session, review_id: str) -> Tuple[Optional[Review
         .first()
     )
     return review, result
+
+
+# Columns returned by the review listing; diffs and results are never loaded for it.
+SUMMARY_COLUMNS = (
+    ReviewRequest.id,
+    ReviewRequest.source,
+    ReviewRequest.status,
+    ReviewRequest.repo,
+    ReviewRequest.pr_number,
+    ReviewRequest.head_sha,
+    ReviewRequest.diff_size,
+    ReviewRequest.created_at,
+    ReviewRequest.updated_at,
+)
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, review_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), review_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, review_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(review_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
+
+
+def list_reviews(
+    db: Session,
+    *,
+    status: Optional[str] = None,
+    repo: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 25,
+) -> Tuple[Sequence[Row], Optional[str]]:
+    """One page of reviews, newest first, and the cursor of the next page (None on the last).
+
+    Pages are keyed on ``(created_at, id)`` rather than offsets, so every page costs
+    one index range scan however deep it is.
+    """
+
+    query = select(*SUMMARY_COLUMNS)
+    if status:
+        query = query.where(ReviewRequest.status == status)
+    if repo:
+        query = query.where(ReviewRequest.repo == repo)
+    if source:
+        query = query.where(ReviewRequest.source == source)
+    if created_after:
+        query = query.where(ReviewRequest.created_at >= created_after)
+    if created_before:
+        query = query.where(ReviewRequest.created_at < created_before)
+    if cursor:
+        query = query.where(tuple_(ReviewRequest.created_at, ReviewRequest.id) < tuple_(*decode_cursor(cursor)))
+    query = query.order_by(ReviewRequest.created_at.desc(), ReviewRequest.id.desc()).limit(limit + 1)
+
+    rows = db.execute(query).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.created_at, last.id)
+
+
+def load_review_payload(raw_response: Optional[str]) -> Tuple[List[ReviewComment], Dict[str, Any]]:
+    """Decode the comments and metadata stored in ``ReviewResult.raw_response``."""
+
+    if not raw_response:
+        return [], {}
+    try:
+        parsed = json.loads(raw_response)
+    except json.JSONDecodeError:
+        return [], {}
+    if isinstance(parsed, list):
+        return [ReviewComment(**comment) for comment in parsed], {}
+    if not isinstance(parsed, dict):
+        return [], {}
+    payload = parsed.get("comments", [])
+    metadata = parsed.get("metadata", {})
+    comments = [ReviewComment(**comment) for comment in payload] if isinstance(payload, list) else []
+    return comments, metadata if isinstance(metadata, dict) else {}
+
+
+def build_review_response(review: ReviewRequest, result: Optional[ReviewResult]) -> ReviewResponse:
+    comments, metadata = load_review_payload(result.raw_response if result else None)
+    agents: List[str] = []
+    metrics: Optional[ReviewMetrics] = None
+    if metadata:
+        agents = [str(agent) for agent in metadata.get("agents_run", [])]
+        severity_breakdown = metadata.get("severity_breakdown", {})
+        metrics = ReviewMetrics(
+            total_comments=metadata.get("total_comments", 0),
+            files_reviewed=metadata.get("files_reviewed", 0),
+            severity_breakdown={str(k): int(v) for k, v in severity_breakdown.items()},
+            categories_detected=[str(cat) for cat in metadata.get("categories_detected", [])],
+        )
+    return ReviewResponse(
+        id=review.id,
+        status=review.status,
+        summary=result.summary if result else None,
+        comments=comments,
+        agents=agents,
+        metrics=metrics,
+        created_at=review.created_at.isoformat() if review.created_at else None,
+        updated_at=review.updated_at.isoformat() if review.updated_at else None,
+    )
@@ -0,0 +1,113 @@
+"""Guarded status transitions of a review.
+
+Each transition is one ``UPDATE review_requests ... WHERE id = :id AND status =
+:expected``. Of several workers that pick up the same review, only the one whose
+UPDATE matched owns it; the others see ``False`` and drop the job. The worker
+claims a review in its first transaction and finishes it, result included, in its
+second.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.review_cache import CACHEABLE_STATUSES, invalidate_response
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS = {
+    # "failed" straight from pending when the review's job could not be queued.
+    "pending": {"running", "superseded", "failed"},
+    # "pending" again when the job is deferred after claiming, e.g. on a GitHub rate limit.
+    "running": {"completed", "failed", "superseded", "pending"},
+}
+
+
+class InvalidTransitionError(ValueError):
+    """Raised for a status change the state machine does not allow."""
+
+
+def transition(db: Session, review: ReviewRequest, from_status: str, to_status: str, **values: Any) -> bool:
+    """Move ``review`` from ``from_status`` to ``to_status``; the caller commits.
+
+    Extra column ``values`` are written by the same UPDATE. Returns False, changing
+    nothing, when the review is no longer in ``from_status``.
+    """
+
+    if to_status not in TRANSITIONS.get(from_status, ()):
+        raise InvalidTransitionError(f"{from_status} -> {to_status}")
+    updated = db.execute(
+        update(ReviewRequest)
+        .where(ReviewRequest.id == review.id, ReviewRequest.status == from_status)
+        .values(status=to_status, updated_at=datetime.utcnow(), **values)
+    )
+    if updated.rowcount != 1:
+        logger.info("Review %s is no longer %s; not moving it to %s", review.id, from_status, to_status)
+        return False
+    if from_status in CACHEABLE_STATUSES:
+        # The cached response describes the status being left.
+        invalidate_response(review.id)
+    return True
+
+
+def claim_review(db: Session, review_request_id: str) -> Optional[ReviewRequest]:
+    """Move a pending review to ``running`` and return it; None if it is missing or not pending.
+
+    Uses ``UPDATE ... RETURNING`` where the database supports it, so claiming and
+    loading the review is a single statement.
+    """
+
+    statement = (
+        update(ReviewRequest)
+        .where(ReviewRequest.id == review_request_id, ReviewRequest.status == "pending")
+        .values(status="running", updated_at=datetime.utcnow())
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(statement.returning(ReviewRequest)).scalar_one_or_none()
+    if db.execute(statement).rowcount != 1:
+        return None
+    return db.get(ReviewRequest, review_request_id)
+
+
+def upsert_result(db: Session, review_request_id: str, summary: str, raw_response: str) -> ReviewResult:
+    """Insert or overwrite the review's result row in one statement and return it; the caller commits.
+
+    Like :func:`claim_review`, the stored row comes back through ``RETURNING``
+    where the database supports it.
+    """
+
+    values = {
+        "review_request_id": review_request_id,
+        "summary": summary,
+        "raw_response": raw_response,
+        "created_at": datetime.utcnow(),
+    }
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect = postgresql if dialect_name == "postgresql" else sqlite
+        statement = dialect.insert(ReviewResult).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["review_request_id"],
+            set_={column: statement.excluded[column] for column in ("summary", "raw_response", "created_at")},
+        )
+        if db.get_bind().dialect.insert_returning:
+            return db.scalars(statement.returning(ReviewResult), execution_options={"populate_existing": True}).one()
+        db.execute(statement)
+    else:
+        updated = db.execute(
+            update(ReviewResult).where(ReviewResult.review_request_id == review_request_id).values(**values)
+        )
+        if not updated.rowcount:
+            db.execute(insert(ReviewResult).values(**values))
+    return db.scalars(
+        select(ReviewResult).where(ReviewResult.review_request_id == review_request_id),
+        execution_options={"populate_existing": True},
+    ).one()
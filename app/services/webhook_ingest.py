@@ -0,0 +1,105 @@
+"""Write-behind buffer for GitHub webhook events.
+
+In ``stream`` ingest mode the webhook only appends the validated event to a Redis
+Stream and answers 202; :mod:`app.workers.ingest_worker` persists the buffered
+events in batches and enqueues their review jobs.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client
+
+logger = logging.getLogger(__name__)
+
+INGEST_STREAM = "github:webhook-events"
+INGEST_GROUP = "review-ingest"
+
+
+@dataclass
+class PullRequestEvent:
+    """The handful of webhook fields the review pipeline needs."""
+
+    action: Optional[str]
+    repo_full_name: Optional[str]
+    pr_number: Optional[int]
+    installation_id: Optional[int]
+    head_sha: Optional[str]
+    changed_lines: Optional[int] = None
+    draft: bool = False
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "PullRequestEvent":
+        pull_request = payload.get("pull_request") or {}
+        additions, deletions = pull_request.get("additions"), pull_request.get("deletions")
+        return cls(
+            action=payload.get("action"),
+            repo_full_name=(payload.get("repository") or {}).get("full_name"),
+            pr_number=pull_request.get("number"),
+            installation_id=(payload.get("installation") or {}).get("id"),
+            head_sha=(pull_request.get("head") or {}).get("sha"),
+            changed_lines=additions + deletions if additions is not None and deletions is not None else None,
+            draft=bool(pull_request.get("draft")),
+        )
+
+
+@dataclass
+class BufferedEvent:
+    """A webhook event as stored in the ingest stream, with its pre-assigned review id."""
+
+    review_id: str
+    event: PullRequestEvent
+    received_at: float
+    delivery_id: Optional[str] = None
+
+    def to_fields(self) -> Dict[str, str]:
+        return {
+            "review_id": self.review_id,
+            "action": self.event.action or "",
+            "repo": self.event.repo_full_name or "",
+            "pr_number": str(self.event.pr_number or ""),
+            "installation_id": str(self.event.installation_id or ""),
+            "head_sha": self.event.head_sha or "",
+            "changed_lines": "" if self.event.changed_lines is None else str(self.event.changed_lines),
+            "received_at": repr(self.received_at),
+            "delivery_id": self.delivery_id or "",
+        }
+
+    @classmethod
+    def from_fields(cls, fields: Mapping[Any, Any]) -> "BufferedEvent":
+        data = {
+            (key.decode() if isinstance(key, bytes) else key): (value.decode() if isinstance(value, bytes) else value)
+            for key, value in fields.items()
+        }
+        return cls(
+            review_id=data["review_id"],
+            event=PullRequestEvent(
+                action=data.get("action") or None,
+                repo_full_name=data.get("repo") or None,
+                pr_number=int(data["pr_number"]) if data.get("pr_number") else None,
+                installation_id=int(data["installation_id"]) if data.get("installation_id") else None,
+                head_sha=data.get("head_sha") or None,
+                changed_lines=int(data["changed_lines"]) if data.get("changed_lines") else None,
+            ),
+            received_at=float(data.get("received_at") or time.time()),
+            delivery_id=data.get("delivery_id") or None,
+        )
+
+
+async def buffer_event(event: PullRequestEvent, review_id: str, delivery_id: Optional[str]) -> str:
+    """Append a validated webhook event to the ingest stream and return its entry id."""
+
+    settings = get_settings()
+    buffered = BufferedEvent(review_id=review_id, event=event, received_at=time.time(), delivery_id=delivery_id)
+    entry_id = await get_async_redis_client().xadd(
+        INGEST_STREAM,
+        buffered.to_fields(),
+        maxlen=settings.github_ingest_stream_maxlen,
+        approximate=True,
+    )
+    return entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)
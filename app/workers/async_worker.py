@@ -0,0 +1,239 @@
+"""Asyncio worker that keeps many I/O-bound jobs in flight per process.
+
+It consumes the same RQ queues as ``app.workers.run_worker`` and honours the RQ
+job lifecycle (started/finished/failed registries, retries, results), so both
+kinds of worker can serve a queue side by side. Jobs with a coroutine handler in
+``ASYNC_HANDLERS`` run on the event loop; any other job runs in a thread.
+
+Blocking steps (DB phases, Redis bookkeeping, thread-run jobs) share the loop's
+default executor, which :meth:`AsyncWorker.run` sizes to the concurrency so a
+job's timeout is not spent waiting for a free thread.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from rq import Queue
+from rq.defaults import DEFAULT_RESULT_TTL
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+from rq.registry import StartedJobRegistry
+from rq.scheduler import RQScheduler
+from rq.utils import utcnow
+
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging
+from app.core.metrics import start_metrics_server
+from app.core.redis_client import get_async_redis_client
+from app.workers.maintenance_worker import ensure_retention_scheduled
+from app.workers.queue import MAINTENANCE_QUEUE, WORKER_PROFILES, get_queue, redis_conn
+from app.workers.review_worker import process_review_job_async
+
+logger = logging.getLogger(__name__)
+
+# Extra time a started job may stay registered past its timeout before RQ's
+# registry cleanup treats it as abandoned.
+_STARTED_GRACE_SECONDS = 60
+_NO_TIMEOUT_STARTED_TTL = 24 * 3600
+# Executor threads beyond one per job slot, for the scheduler tick and job fetches.
+_EXTRA_THREADS = 4
+
+ASYNC_HANDLERS: Dict[str, Callable[[Job, Queue], Awaitable[Any]]] = {
+    "app.workers.review_worker.process_review_job": lambda job, queue: process_review_job_async(
+        *job.args, queue=queue, **job.kwargs
+    ),
+}
+
+
+class AsyncWorker:
+    def __init__(
+        self,
+        queues: List[Queue],
+        *,
+        concurrency: int,
+        name: Optional[str] = None,
+        poll_timeout: int = 1,
+    ) -> None:
+        self.queues = queues
+        self.name = name or f"async-{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = max(1, concurrency)
+        self._queues_by_key = {queue.key: queue for queue in queues}
+        self._poll_timeout = poll_timeout
+        self._scheduler = RQScheduler([queue.name for queue in queues], connection=redis_conn)
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    def request_stop(self) -> None:
+        if not self._stopping:
+            logger.info("Async worker %s stopping after %d in-flight job(s)", self.name, len(self._tasks))
+        self._stopping = True
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(self.concurrency + _EXTRA_THREADS, thread_name_prefix=f"{self.name}-io")
+        loop.set_default_executor(executor)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        slots = asyncio.Semaphore(self.concurrency)
+        scheduler = asyncio.create_task(self._run_scheduler())
+        logger.info(
+            "Async worker %s listening on %s with concurrency %d",
+            self.name,
+            ", ".join(queue.name for queue in self.queues),
+            self.concurrency,
+        )
+        try:
+            while not self._stopping:
+                await slots.acquire()
+                popped = None if self._stopping else await self._pop()
+                if popped is None:
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self._execute(*popped, slots))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            scheduler.cancel()
+            await asyncio.to_thread(self._scheduler.release_locks)
+
+    async def _pop(self) -> Optional[Tuple[Job, Queue]]:
+        popped = await get_async_redis_client().blpop(list(self._queues_by_key), timeout=self._poll_timeout)
+        if not popped:
+            return None
+        key, job_id = (part.decode() if isinstance(part, bytes) else part for part in popped)
+        try:
+            job = await asyncio.to_thread(Job.fetch, job_id, connection=redis_conn)
+        except NoSuchJobError:
+            logger.warning("Skipping job %s popped from %s: job no longer exists", job_id, key)
+            return None
+        if job.get_status(refresh=False) != JobStatus.QUEUED:
+            return None
+        return job, self._queues_by_key[key]
+
+    async def _execute(self, job: Job, queue: Queue, slots: asyncio.Semaphore) -> None:
+        try:
+            await asyncio.to_thread(self._start_job, job, queue)
+            handler = ASYNC_HANDLERS.get(job.func_name)
+            thread = None
+            if handler:
+                work = handler(job, queue)
+            else:
+                thread = asyncio.get_running_loop().run_in_executor(None, partial(job.func, *job.args, **job.kwargs))
+                # A timeout can't stop the thread, so it must not cancel the future tracking it.
+                work = asyncio.shield(thread)
+            timeout = job.timeout if job.timeout and job.timeout > 0 else None
+            try:
+                job._result = await asyncio.wait_for(work, timeout)
+            except Exception:
+                logger.exception("Job %s failed", job.id)
+                still_running = thread is not None and not thread.done()
+                await asyncio.to_thread(self._fail_job, job, queue, traceback.format_exc(), retry=not still_running)
+                if still_running:
+                    # A retry would run next to this thread (e.g. publish the same review twice), and
+                    # the slot stays taken until the thread really ends.
+                    logger.warning("Job %s timed out but its thread is still running; not retrying it", job.id)
+                    await asyncio.wait([thread])
+            else:
+                await asyncio.to_thread(self._finish_job, job, queue)
+        except Exception:
+            logger.exception("Async worker lost track of job %s", job.id)
+        finally:
+            slots.release()
+
+    def _start_job(self, job: Job, queue: Queue) -> None:
+        ttl = job.timeout + _STARTED_GRACE_SECONDS if job.timeout and job.timeout > 0 else _NO_TIMEOUT_STARTED_TTL
+        with redis_conn.pipeline() as pipe:
+            job.prepare_for_execution(self.name, pipe)
+            StartedJobRegistry(queue=queue).add(job, ttl, pipeline=pipe)
+            pipe.execute()
+
+    def _finish_job(self, job: Job, queue: Queue) -> None:
+        """Mirror of ``Worker.handle_job_success`` (this codebase does not use job dependencies)."""
+
+        job.ended_at = utcnow()
+        result_ttl = job.get_result_ttl(DEFAULT_RESULT_TTL)
+        with redis_conn.pipeline() as pipe:
+            if result_ttl != 0:
+                job._handle_success(result_ttl, pipeline=pipe)
+            job.cleanup(result_ttl, pipeline=pipe, remove_from_queue=False)
+            StartedJobRegistry(queue=queue).remove(job, pipeline=pipe)
+            pipe.execute()
+
+    def _fail_job(self, job: Job, queue: Queue, exc_string: str, retry: bool = True) -> None:
+        """Mirror of ``Worker.handle_job_failure``, including RQ retries unless ``retry`` is False."""
+
+        job.ended_at = utcnow()
+        retry = retry and bool(job.retries_left and job.retries_left > 0)
+        with redis_conn.pipeline() as pipe:
+            StartedJobRegistry(queue=queue).remove(job, pipeline=pipe)
+            if retry:
+                job.retry(queue, pipe)
+            else:
+                job.set_status(JobStatus.FAILED, pipeline=pipe)
+                job._handle_failure(exc_string, pipeline=pipe)
+            pipe.execute()
+
+    async def _run_scheduler(self) -> None:
+        """Move due scheduled/debounced jobs onto their queues, like ``work(with_scheduler=True)``."""
+
+        while True:
+            try:
+                await asyncio.to_thread(self._scheduler_tick)
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(self._scheduler.interval)
+
+    def _scheduler_tick(self) -> None:
+        if not self._scheduler.acquired_locks or self._scheduler.should_reacquire_locks:
+            self._scheduler.acquire_locks()
+        if self._scheduler.acquired_locks:
+            self._scheduler.enqueue_scheduled_jobs()
+            self._scheduler.heartbeat()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run an asyncio worker for the review service")
+    parser.add_argument("queues", nargs="*", help="Queues to consume, in priority order; overrides --profile")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(WORKER_PROFILES),
+        default="all",
+        help="Named set of queues to consume (default: all review queues)",
+    )
+    parser.add_argument("--concurrency", type=int, help="Jobs run at once by this process")
+    parser.add_argument("--metrics-port", type=int, help="Expose Prometheus metrics on this port")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    if args.metrics_port:
+        # Jobs run in this process, so the in-process registry is already complete.
+        start_metrics_server(args.metrics_port)
+    names = args.queues or WORKER_PROFILES[args.profile]
+    if MAINTENANCE_QUEUE in names:
+        ensure_retention_scheduled()
+    worker = AsyncWorker(
+        [get_queue(name) for name in names],
+        concurrency=args.concurrency or settings.async_worker_concurrency,
+    )
+    asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Dispatcher for fair-share review scheduling (``FAIR_SCHEDULING_ENABLED=true``).
+
+Moves reviews from per-tenant sub-queues onto their RQ queue in weighted
+round-robin order. It only tops a queue up to ``FAIR_DISPATCH_BUFFER`` waiting
+jobs, so the order workers see is decided here rather than by arrival time. It
+also skips tenants that already have ``FAIR_MAX_IN_FLIGHT_PER_TENANT`` reviews
+dispatched. One dispatcher is active at a time; extra replicas stand by on a
+Redis lock.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import time
+from typing import Dict, List, Optional
+
+from prometheus_client import Gauge, Histogram, start_http_server
+from redis.exceptions import WatchError
+from rq import Queue
+
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging
+from app.services import fair_scheduler
+from app.workers.queue import get_queue, redis_conn
+from app.workers.review_worker import process_review_job
+
+logger = logging.getLogger(__name__)
+
+_LOCK_KEY = "fair:dispatcher:lock"
+_LOCK_TTL_SECONDS = 10
+
+FAIR_QUEUE_WAIT = Histogram(
+    "review_fair_queue_wait_seconds",
+    "Time a review waited in its tenant sub-queue after it became ready",
+    ["queue", "tenant"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+FAIR_PENDING = Gauge("review_fair_pending", "Reviews waiting in a tenant sub-queue", ["queue", "tenant"])
+FAIR_INFLIGHT = Gauge("review_fair_inflight", "Dispatched reviews not yet finished", ["tenant"])
+
+# Drop a tenant from the active set only if its sub-queue is still empty, so a
+# review submitted concurrently is never orphaned.
+_FORGET_IDLE_TENANT = """
+if redis.call('zcard', KEYS[1]) == 0 then
+    return redis.call('srem', KEYS[2], ARGV[1])
+end
+return 0
+"""
+
+
+class FairDispatcher:
+    def __init__(
+        self,
+        queues: List[Queue],
+        *,
+        max_in_flight: int,
+        buffer: int,
+        weights: Dict[str, int],
+        slot_ttl_seconds: int,
+        clock=time.time,
+    ) -> None:
+        self.queues = queues
+        self.max_in_flight = max(1, max_in_flight)
+        self.buffer = max(1, buffer)
+        self.weights = weights
+        self.slot_ttl_seconds = slot_ttl_seconds
+        self._clock = clock
+        self._forget_idle = redis_conn.register_script(_FORGET_IDLE_TENANT)
+        # Round-robin position per queue, so every tenant gets its turn first in time.
+        self._cursor: Dict[str, int] = {}
+
+    def _inflight(self, tenant: str, now: float) -> int:
+        key = fair_scheduler.inflight_key(tenant)
+        pipe = redis_conn.pipeline()
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.zcard(key)
+        _, count = pipe.execute()
+        FAIR_INFLIGHT.labels(tenant=tenant).set(count)
+        return count
+
+    def _dispatch_one(self, queue: Queue, tenant: str, now: float) -> bool:
+        key = fair_scheduler.pending_key(queue.name, tenant)
+        ready = redis_conn.zrangebyscore(key, "-inf", now, start=0, num=1, withscores=True)
+        if not ready:
+            return False
+        member, ready_at = ready[0]
+        review_id = member.decode() if isinstance(member, bytes) else member
+        # Taking the review off the sub-queue, holding its slot and enqueueing it is one
+        # MULTI, so a failed enqueue leaves the review parked instead of losing it.
+        with redis_conn.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    if pipe.zscore(key, member) is None:
+                        return False  # another dispatcher instance took it
+                    pipe.multi()
+                    pipe.zrem(key, member)
+                    pipe.zadd(fair_scheduler.inflight_key(tenant), {review_id: now + self.slot_ttl_seconds})
+                    queue.enqueue(
+                        process_review_job,
+                        review_id,
+                        fair_tenant=tenant,
+                        job_id=review_id,
+                        description=f"Process review {review_id}",
+                        pipeline=pipe,
+                    )
+                    pipe.execute()
+                    break
+                except WatchError:
+                    # The sub-queue changed, e.g. a new submission; check again.
+                    continue
+        FAIR_QUEUE_WAIT.labels(queue=queue.name, tenant=tenant).observe(max(now - ready_at, 0.0))
+        return True
+
+    def dispatch_queue(self, queue: Queue) -> int:
+        """Top ``queue`` up to the buffer size; returns how many reviews were dispatched."""
+
+        room = self.buffer - queue.count
+        if room <= 0:
+            return 0
+        tenants = sorted(
+            member.decode() if isinstance(member, bytes) else member
+            for member in redis_conn.smembers(fair_scheduler.tenants_key(queue.name))
+        )
+        if not tenants:
+            return 0
+
+        start = self._cursor.get(queue.name, 0) % len(tenants)
+        order = tenants[start:] + tenants[:start]
+        now = self._clock()
+        dispatched = 0
+        for index, tenant in enumerate(order):
+            if dispatched >= room:
+                self._cursor[queue.name] = start + index
+                return dispatched
+            key = fair_scheduler.pending_key(queue.name, tenant)
+            FAIR_PENDING.labels(queue=queue.name, tenant=tenant).set(redis_conn.zcard(key))
+            quantum = self.weights.get(tenant, 1)
+            for _ in range(quantum):
+                if dispatched >= room or self._inflight(tenant, now) >= self.max_in_flight:
+                    break
+                if not self._dispatch_one(queue, tenant, now):
+                    break
+                dispatched += 1
+            self._forget_idle(keys=[key, fair_scheduler.tenants_key(queue.name)], args=[tenant])
+        self._cursor[queue.name] = start + 1
+        return dispatched
+
+    def tick(self) -> int:
+        return sum(self.dispatch_queue(queue) for queue in self.queues)
+
+
+def _hold_lock(owner: str) -> bool:
+    if redis_conn.set(_LOCK_KEY, owner, nx=True, ex=_LOCK_TTL_SECONDS):
+        return True
+    current = redis_conn.get(_LOCK_KEY)
+    if current and current.decode() == owner:
+        redis_conn.expire(_LOCK_KEY, _LOCK_TTL_SECONDS)
+        return True
+    return False
+
+
+def run(dispatcher: FairDispatcher, interval_seconds: float) -> None:
+    owner = f"{socket.gethostname()}-{os.getpid()}"
+    logger.info("Fair dispatcher %s serving %s", owner, ", ".join(queue.name for queue in dispatcher.queues))
+    while True:
+        if _hold_lock(owner):
+            try:
+                if dispatcher.tick():
+                    continue
+            except Exception:
+                logger.exception("Fair dispatch tick failed")
+        time.sleep(interval_seconds)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Dispatch reviews fairly across tenants")
+    parser.add_argument("--metrics-port", type=int, help="Expose Prometheus metrics on this port")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    dispatcher = FairDispatcher(
+        [get_queue(name) for name in settings.fair_scheduling_queues.split(",")],
+        max_in_flight=settings.fair_max_in_flight_per_tenant,
+        buffer=settings.fair_dispatch_buffer,
+        weights=fair_scheduler.parse_weights(settings.fair_tenant_weights),
+        slot_ttl_seconds=settings.review_large_timeout_seconds + 60,
+    )
+    run(dispatcher, settings.fair_dispatch_interval_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from rq import Retry, get_current_job
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.diff_store import review_diff
+from app.services.github_comment_service import sync_review_to_github
+from app.services.github_rate_limiter import GitHubRateLimitedError
+from app.services.review_service import load_review_payload
+from app.workers.queue import enqueue_deferred, github_sync_queue, redis_conn
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_INFLIGHT_KEY = "github-sync:inflight"
+# How long to wait before retrying when every publish slot is taken.
+_SLOT_RETRY_SECONDS = 5
+
+
+def enqueue_github_sync(review_request_id: str) -> None:
+    """Queue publication of a completed review on the dedicated `github-sync` queue."""
+
+    github_sync_queue.enqueue(
+        publish_review_job,
+        review_request_id,
+        job_id=f"github-sync:{review_request_id}",
+        description=f"Publish review {review_request_id} to GitHub",
+        retry=Retry(max=settings.github_sync_max_retries, interval=[10, 30, 60]),
+    )
+
+
+def _acquire_slot(member: str) -> bool:
+    """Take one of `github_sync_concurrency` fleet-wide publish slots.
+
+    Slots are sorted-set members scored by their expiry, so a crashed publisher
+    frees its slot once the job timeout has passed.
+    """
+
+    now = time.time()
+    pipe = redis_conn.pipeline()
+    pipe.zremrangebyscore(_INFLIGHT_KEY, "-inf", now)
+    pipe.zadd(_INFLIGHT_KEY, {member: now + max(settings.github_sync_timeout_seconds, 1)})
+    pipe.zcard(_INFLIGHT_KEY)
+    _, _, inflight = pipe.execute()
+    if inflight > settings.github_sync_concurrency:
+        redis_conn.zrem(_INFLIGHT_KEY, member)
+        return False
+    return True
+
+
+def _release_slot(member: str) -> None:
+    redis_conn.zrem(_INFLIGHT_KEY, member)
+
+
+def publish_review_job(review_request_id: str) -> None:
+    """Publish an already completed review to its GitHub pull request."""
+
+    job = get_current_job()
+    member = job.id if job else review_request_id
+    if not _acquire_slot(member):
+        enqueue_deferred(
+            github_sync_queue,
+            publish_review_job,
+            review_request_id,
+            _SLOT_RETRY_SECONDS,
+            "Publish review",
+            job=job,
+            reason="No free GitHub publish slot",
+        )
+        return
+
+    db: Session = SessionLocal()
+    try:
+        review = db.query(ReviewRequest).filter(ReviewRequest.id == review_request_id).first()
+        if not review or review.status != "completed":
+            logger.warning("Skipping GitHub sync for review %s; not completed", review_request_id)
+            return
+        result = (
+            db.query(ReviewResult)
+            .filter(ReviewResult.review_request_id == review_request_id)
+            .first()
+        )
+        comments, metadata = load_review_payload(result.raw_response if result else None)
+        started_at = time.perf_counter()
+        try:
+            sync_review_to_github(
+                review, result.summary if result else None, comments, metadata, diff=review_diff(db, review)
+            )
+        except GitHubRateLimitedError as exc:
+            enqueue_deferred(
+                github_sync_queue, publish_review_job, review_request_id, exc.retry_after, "Publish review", job=job
+            )
+            return
+        logger.info("Published review %s to GitHub in %.2fs", review_request_id, time.perf_counter() - started_at)
+    finally:
+        db.close()
+        _release_slot(member)
@@ -0,0 +1,266 @@
+"""Consumer for the write-behind webhook buffer (``GITHUB_INGEST_MODE=stream``).
+
+Reads batches from the ingest stream, inserts their ReviewRequest rows in a single
+transaction, enqueues the review jobs in one Redis pipeline and only then
+acknowledges the entries, so a crash at any point leads to a retry rather than a
+lost review.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from redis.exceptions import ResponseError
+from rq import Queue
+from rq.job import Job, JobStatus
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.core.logging_config import setup_logging
+from app.models.review_request import ReviewRequest
+from app.services import fair_scheduler
+from app.services.review_coalescing import register_latest_review
+from app.services.webhook_ingest import INGEST_GROUP, INGEST_STREAM, BufferedEvent
+from app.workers.queue import redis_conn, select_review_queue
+from app.workers.review_worker import process_review_job
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_consumer_group() -> None:
+    try:
+        redis_conn.xgroup_create(INGEST_STREAM, INGEST_GROUP, id="0", mkstream=True)
+    except ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+def _coalesce(events: Sequence[BufferedEvent]) -> Tuple[List[BufferedEvent], List[BufferedEvent]]:
+    """Split a batch into the newest event per PR and the ones it makes redundant."""
+
+    latest: Dict[Tuple[str, int], BufferedEvent] = {}
+    for buffered in events:
+        latest[(buffered.event.repo_full_name, buffered.event.pr_number)] = buffered  # type: ignore[index]
+    keep = {id(buffered) for buffered in latest.values()}
+    winners = [buffered for buffered in events if id(buffered) in keep]
+    superseded = [buffered for buffered in events if id(buffered) not in keep]
+    return winners, superseded
+
+
+def _cancel_pending_job(review_id: str) -> None:
+    job = Job.fetch(review_id, connection=redis_conn) if Job.exists(review_id, connection=redis_conn) else None
+    if job and job.get_status() in (JobStatus.SCHEDULED, JobStatus.QUEUED):
+        job.cancel()
+
+
+def persist_batch(db: Session, events: Sequence[BufferedEvent]) -> List[BufferedEvent]:
+    """Insert a batch of buffered events in one transaction.
+
+    Only the newest event per PR stays pending; older events in the same batch are
+    stored as superseded, as are pending reviews from earlier batches that the
+    newest one replaces. Rows that already exist (a batch retried after a crash)
+    are skipped. Returns the events whose review job still has to be enqueued.
+    """
+
+    if not events:
+        return []
+    winners, superseded = _coalesce(events)
+    existing = set(
+        db.execute(
+            select(ReviewRequest.id).where(ReviewRequest.id.in_([buffered.review_id for buffered in events]))
+        ).scalars()
+    )
+
+    replaced: List[str] = []
+    for buffered in winners:
+        previous_id = register_latest_review(
+            buffered.event.repo_full_name,  # type: ignore[arg-type]
+            buffered.event.pr_number,  # type: ignore[arg-type]
+            buffered.review_id,
+        )
+        if previous_id:
+            replaced.append(previous_id)
+
+    rows = []
+    superseded_ids = {buffered.review_id for buffered in superseded}
+    for buffered in events:
+        if buffered.review_id in existing:
+            continue
+        received_at = datetime.utcfromtimestamp(buffered.received_at)
+        rows.append(
+            {
+                "id": buffered.review_id,
+                "source": "github",
+                "status": "superseded" if buffered.review_id in superseded_ids else "pending",
+                "diff_snapshot": None,
+                "repo": buffered.event.repo_full_name,
+                "pr_number": str(buffered.event.pr_number),
+                "installation_id": str(buffered.event.installation_id) if buffered.event.installation_id else None,
+                "head_sha": buffered.event.head_sha,
+                "created_at": received_at,
+                "updated_at": received_at,
+            }
+        )
+    if rows:
+        db.execute(insert(ReviewRequest), rows)
+    if replaced:
+        db.execute(
+            update(ReviewRequest)
+            .where(ReviewRequest.id.in_(replaced), ReviewRequest.status == "pending")
+            .values(status="superseded", updated_at=datetime.utcnow())
+        )
+    db.commit()
+
+    for review_id in replaced:
+        try:
+            _cancel_pending_job(review_id)
+        except Exception:
+            logger.warning("Failed to cancel superseded review job %s", review_id, exc_info=True)
+
+    # A retried batch may already have enqueued some of its jobs.
+    return [
+        buffered
+        for buffered in winners
+        if buffered.review_id not in existing or not Job.exists(buffered.review_id, connection=redis_conn)
+    ]
+
+
+def enqueue_batch(events: Sequence[BufferedEvent], debounce_seconds: int) -> None:
+    """Enqueue the review jobs for a persisted batch in a single Redis pipeline.
+
+    Each job goes to the queue `select_review_queue` picks for its PR size, or to
+    its tenant's sub-queue when that queue is under fair scheduling.
+    """
+
+    if not events:
+        return
+    by_queue: Dict[str, List[BufferedEvent]] = defaultdict(list)
+    queues: Dict[str, Queue] = {}
+    for buffered in events:
+        queue = select_review_queue("github", buffered.event.changed_lines)
+        queues[queue.name] = queue
+        by_queue[queue.name].append(buffered)
+
+    with redis_conn.pipeline() as pipe:
+        for name, batch in by_queue.items():
+            queue = queues[name]
+            if fair_scheduler.is_fair_queue(name):
+                for buffered in batch:
+                    tenant = fair_scheduler.tenant_for(buffered.event.repo_full_name, buffered.event.installation_id)
+                    fair_scheduler.submit(
+                        pipe, name, tenant, buffered.review_id, buffered.received_at + max(debounce_seconds, 0)
+                    )
+            elif debounce_seconds > 0:
+                for buffered in batch:
+                    job = queue.create_job(
+                        process_review_job,
+                        args=(buffered.review_id,),
+                        job_id=buffered.review_id,
+                        description=f"Process review {buffered.review_id}",
+                        status=JobStatus.SCHEDULED,
+                    )
+                    run_at = datetime.fromtimestamp(buffered.received_at, tz=timezone.utc) + timedelta(
+                        seconds=debounce_seconds
+                    )
+                    queue.schedule_job(job, run_at, pipeline=pipe)
+            else:
+                queue.enqueue_many(
+                    [
+                        Queue.prepare_data(
+                            process_review_job,
+                            args=(buffered.review_id,),
+                            job_id=buffered.review_id,
+                            description=f"Process review {buffered.review_id}",
+                        )
+                        for buffered in batch
+                    ],
+                    pipeline=pipe,
+                )
+        pipe.execute()
+
+
+def _decode_entries(entries) -> Tuple[List[str], List[BufferedEvent]]:
+    entry_ids: List[str] = []
+    events: List[BufferedEvent] = []
+    for entry_id, fields in entries:
+        entry_ids.append(entry_id.decode() if isinstance(entry_id, bytes) else entry_id)
+        if not fields:
+            # Trimmed from the stream while pending; nothing left to persist.
+            continue
+        try:
+            events.append(BufferedEvent.from_fields(fields))
+        except (KeyError, ValueError):
+            logger.exception("Dropping malformed ingest entry %s", entry_id)
+    return entry_ids, events
+
+
+def process_entries(entries, *, debounce_seconds: Optional[int] = None) -> int:
+    """Persist, enqueue and acknowledge one batch of stream entries; returns the event count."""
+
+    entry_ids, events = _decode_entries(entries)
+    if not entry_ids:
+        return 0
+    if debounce_seconds is None:
+        debounce_seconds = get_settings().github_webhook_debounce_seconds
+
+    db = SessionLocal()
+    try:
+        to_enqueue = persist_batch(db, events)
+    finally:
+        db.close()
+    enqueue_batch(to_enqueue, debounce_seconds)
+    redis_conn.xack(INGEST_STREAM, INGEST_GROUP, *entry_ids)
+    logger.info("Ingested %d webhook event(s), enqueued %d review(s)", len(events), len(to_enqueue))
+    return len(events)
+
+
+def _read_batch(consumer: str, batch_size: int, block_ms: int, claim_idle_ms: int):
+    # Entries left pending by a consumer that died mid-batch are taken over first.
+    _, claimed, *_ = redis_conn.xautoclaim(
+        INGEST_STREAM, INGEST_GROUP, consumer, min_idle_time=claim_idle_ms, start_id="0-0", count=batch_size
+    )
+    if claimed:
+        return claimed
+    response = redis_conn.xreadgroup(INGEST_GROUP, consumer, {INGEST_STREAM: ">"}, count=batch_size, block=block_ms)
+    return response[0][1] if response else []
+
+
+def run(consumer: Optional[str] = None) -> None:
+    settings = get_settings()
+    consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+    ensure_consumer_group()
+    logger.info("Webhook ingest consumer %s reading %s", consumer, INGEST_STREAM)
+    while True:
+        entries = _read_batch(
+            consumer,
+            settings.github_ingest_batch_size,
+            settings.github_ingest_block_ms,
+            settings.github_ingest_claim_idle_seconds * 1000,
+        )
+        if not entries:
+            continue
+        try:
+            process_entries(entries, debounce_seconds=settings.github_webhook_debounce_seconds)
+        except Exception:
+            # Unacknowledged entries are retried once they have been idle long enough.
+            logger.exception("Failed to ingest batch of %d webhook event(s)", len(entries))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Persist buffered GitHub webhook events in batches")
+    parser.add_argument("--consumer", help="Consumer name within the ingest group (default: host-pid)")
+    args = parser.parse_args(argv)
+    setup_logging(get_settings().log_level)
+    run(args.consumer)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Scheduled housekeeping jobs on the ``maintenance`` queue.
+
+Each run of the retention job first marks reviews abandoned by a crashed worker
+as failed, then applies retention. The job re-schedules itself through the RQ scheduler every
+``retention_interval_seconds``. A Redis marker key makes sure at most one run is
+scheduled or running at a time. Workers that consume the maintenance queue
+schedule the first run when they start.
+
+Run once by hand with ``python -m app.workers.maintenance_worker``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import uuid
+from datetime import timedelta
+from typing import List, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.core.db import SessionLocal
+from app.core.logging_config import setup_logging
+from app.services.retention import RetentionReport, run_retention
+from app.workers.review_worker import reap_abandoned_reviews
+from app.workers.queue import maintenance_queue, redis_conn
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_RETENTION_SCHEDULED_KEY = "maintenance:retention:scheduled"
+
+
+def ensure_retention_scheduled(delay_seconds: Optional[int] = None) -> bool:
+    """Schedule the next retention run unless one is already scheduled or running.
+
+    Returns True when this call scheduled it.
+    """
+
+    if settings.retention_review_days <= 0 and settings.retention_diff_days <= 0 and settings.review_lease_seconds <= 0:
+        return False
+    delay = settings.retention_interval_seconds if delay_seconds is None else delay_seconds
+    job_id = f"maintenance:retention:{uuid.uuid4().hex}"
+    # Outlives the wait plus a full run; a run killed by its timeout frees the slot this way.
+    ttl = delay + settings.retention_job_timeout_seconds + 60
+    try:
+        if not redis_conn.set(_RETENTION_SCHEDULED_KEY, job_id, nx=True, ex=ttl):
+            return False
+        maintenance_queue.enqueue_in(
+            timedelta(seconds=delay), retention_job, job_id=job_id, description="Retention: archive old reviews"
+        )
+    except RedisError:
+        logger.warning("Failed to schedule the retention job", exc_info=True)
+        return False
+    logger.info("Scheduled retention run %s in %ss", job_id, delay)
+    return True
+
+
+def reap_abandoned_reviews_once() -> List[str]:
+    db = SessionLocal()
+    try:
+        reaped = reap_abandoned_reviews(db)
+    finally:
+        db.close()
+    if reaped:
+        logger.info("Marked %d abandoned review(s) failed", len(reaped))
+    return reaped
+
+
+def run_retention_once() -> RetentionReport:
+    db = SessionLocal()
+    try:
+        report = run_retention(db, settings)
+    finally:
+        db.close()
+    logger.info(
+        "Retention dropped %d diff(s), archived %d review(s), deleted %d blob(s)%s",
+        report.diffs_dropped,
+        report.reviews_archived,
+        report.blobs_deleted,
+        f" into {report.archive_path}" if report.archive_path else "",
+    )
+    return report
+
+
+def retention_job() -> None:
+    try:
+        reap_abandoned_reviews_once()
+        run_retention_once()
+    finally:
+        try:
+            redis_conn.delete(_RETENTION_SCHEDULED_KEY)
+        except RedisError:
+            logger.warning("Failed to clear the retention schedule marker", exc_info=True)
+        ensure_retention_scheduled()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run housekeeping for the review service")
+    parser.add_argument("--schedule", action="store_true", help="Only schedule the recurring job on the RQ scheduler")
+    args = parser.parse_args(argv)
+
+    setup_logging(settings.log_level)
+    if args.schedule:
+        if not ensure_retention_scheduled(delay_seconds=0):
+            logger.info("Retention is disabled or already scheduled")
+        return
+    reap_abandoned_reviews_once()
+    run_retention_once()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,290 @@
-import redis
-from rq import Queue
+import logging
+import math
+import random
 import sys
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import redis
+from rq import Queue, Retry
+from rq.job import Job, JobStatus
+from rq.registry import CanceledJobRegistry, ScheduledJobRegistry
+from rq.utils import utcnow
 
 from app.core.config import get_settings
+from app.core.redis_client import get_async_redis_client
+from app.services import fair_scheduler
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 redis_conn = redis.from_url(settings.redis_url)
 
-# Disable timeout on Windows (no SIGALRM support)
-timeout = -1 if sys.platform == "win32" else 300
-review_queue = Queue("reviews", connection=redis_conn, default_timeout=timeout)
+
+
+def _timeout(seconds: int) -> int:
+    # Disable timeout on Windows (no SIGALRM support)
+    return -1 if sys.platform == "win32" else seconds
+
+
+# Reviews are routed by estimated size so small diffs never wait behind large
+# ones; dashboard submissions get their own queue with a dedicated worker pool.
+INTERACTIVE_REVIEW_QUEUE = "reviews-interactive"
+SMALL_REVIEW_QUEUE = "reviews-small"
+LARGE_REVIEW_QUEUE = "reviews-large"
+# Pre-routing queue name; kept so jobs enqueued before an upgrade still drain.
+LEGACY_REVIEW_QUEUE = "reviews"
+
+interactive_review_queue = Queue(
+    INTERACTIVE_REVIEW_QUEUE,
+    connection=redis_conn,
+    default_timeout=_timeout(settings.review_interactive_timeout_seconds),
+)
+small_review_queue = Queue(
+    SMALL_REVIEW_QUEUE, connection=redis_conn, default_timeout=_timeout(settings.review_small_timeout_seconds)
+)
+large_review_queue = Queue(
+    LARGE_REVIEW_QUEUE, connection=redis_conn, default_timeout=_timeout(settings.review_large_timeout_seconds)
+)
+review_queue = Queue(LEGACY_REVIEW_QUEUE, connection=redis_conn, default_timeout=_timeout(300))
+
+# Publishing to GitHub runs on its own queue/worker pool so GitHub latency never
+# holds up review analysis.
+github_sync_queue = Queue(
+    "github-sync", connection=redis_conn, default_timeout=_timeout(settings.github_sync_timeout_seconds)
+)
+
+# Housekeeping such as retention; consumed last by the large-review workers.
+MAINTENANCE_QUEUE = "maintenance"
+maintenance_queue = Queue(
+    MAINTENANCE_QUEUE, connection=redis_conn, default_timeout=_timeout(settings.retention_job_timeout_seconds)
+)
+
+REVIEW_QUEUES: Dict[str, Queue] = {
+    queue.name: queue for queue in (interactive_review_queue, small_review_queue, large_review_queue, review_queue)
+}
+
+# Queues consumed by `run_worker --profile`, in priority order.
+WORKER_PROFILES: Dict[str, List[str]] = {
+    "interactive": [INTERACTIVE_REVIEW_QUEUE],
+    "small": [INTERACTIVE_REVIEW_QUEUE, SMALL_REVIEW_QUEUE],
+    "large": [LARGE_REVIEW_QUEUE, LEGACY_REVIEW_QUEUE, MAINTENANCE_QUEUE],
+    "all": [INTERACTIVE_REVIEW_QUEUE, SMALL_REVIEW_QUEUE, LARGE_REVIEW_QUEUE, LEGACY_REVIEW_QUEUE, MAINTENANCE_QUEUE],
+    "github-sync": ["github-sync"],
+}
+
+
+def estimate_changed_lines(diff: Optional[str]) -> Optional[int]:
+    """Count added/removed lines in a unified diff, ignoring file headers."""
+
+    if diff is None:
+        return None
+    return sum(
+        1
+        for line in diff.splitlines()
+        if line[:1] in ("+", "-") and not line.startswith(("+++", "---"))
+    )
+
+
+def select_review_queue(source: str, changed_lines: Optional[int] = None) -> Queue:
+    """Pick the review queue for a job from its source and estimated size.
+
+    Manual (dashboard) submissions up to `review_interactive_max_lines` go to the
+    interactive queue. Everything else is split at `review_small_max_lines`.
+    Reviews whose size is unknown count as large.
+    """
+
+    if changed_lines is not None:
+        if source == "manual" and changed_lines <= settings.review_interactive_max_lines:
+            return interactive_review_queue
+        if changed_lines <= settings.review_small_max_lines:
+            return small_review_queue
+    return large_review_queue
+
+
+def get_queue(name: str) -> Queue:
+    """The configured Queue for ``name`` (with its timeout), or a plain one for unknown names."""
+
+    if name == github_sync_queue.name:
+        return github_sync_queue
+    if name == maintenance_queue.name:
+        return maintenance_queue
+    return REVIEW_QUEUES.get(name) or Queue(name, connection=redis_conn)
+
+
+def queue_for_job(job: Optional[Job], default: Queue) -> Queue:
+    """The review queue a running job came from, so retries stay in the same pool."""
+
+    if job is None:
+        return default
+    return REVIEW_QUEUES.get(job.origin, default)
+
+# Spread deferred jobs out a little so they do not all hit GitHub the second the
+# quota window resets.
+_DEFER_JITTER_SECONDS = 5
+
+
+_DEFERRED_SUFFIX = ":deferred"
+
+
+def deferred_job_id(job_id: str) -> str:
+    """Id for the re-scheduled copy of ``job_id``.
+
+    RQ rewrites a job's hash when it finishes, so the copy cannot reuse the id of
+    the job that is still running. Copies alternate between two stable ids
+    instead, which keeps at most one deferred copy per job.
+    """
+
+    if job_id.endswith(_DEFERRED_SUFFIX):
+        return job_id[: -len(_DEFERRED_SUFFIX)]
+    return job_id + _DEFERRED_SUFFIX
+
+
+def _remaining_retry(job: Job) -> Optional[Retry]:
+    if not job.retries_left:
+        return None
+    return Retry(max=job.retries_left, interval=job.retry_intervals or 0)
+
+
+def enqueue_deferred(
+    queue: Queue,
+    func,
+    review_request_id: str,
+    retry_after: float,
+    what: str,
+    *,
+    job: Optional[Job] = None,
+    reason: str = "GitHub rate limit hit",
+) -> None:
+    """Re-schedule a job instead of failing it, e.g. after a GitHub rate limit.
+
+    With the running ``job``, the copy gets a stable id derived from it and keeps
+    the retries it has left.
+    """
+
+    delay = math.ceil(retry_after) + random.randint(0, _DEFER_JITTER_SECONDS)
+    queue.enqueue_in(
+        timedelta(seconds=delay),
+        func,
+        review_request_id,
+        job_id=deferred_job_id(job.id) if job else None,
+        retry=_remaining_retry(job) if job else None,
+        description=f"{what} {review_request_id} (deferred: {reason})",
+    )
+    logger.warning("%s; deferred %s %s by %ss", reason, what.lower(), review_request_id, delay)
+
+
+async def enqueue_async(
+    queue: Queue,
+    func,
+    *args,
+    job_id: Optional[str] = None,
+    description: Optional[str] = None,
+    delay: Optional[timedelta] = None,
+) -> Job:
+    """Enqueue an RQ job over redis.asyncio so API handlers never block the event loop.
+
+    Writes the same keys as ``Queue.enqueue`` (or ``Queue.enqueue_in`` when ``delay``
+    is given) in a single pipelined round trip; RQ workers and the RQ scheduler
+    pick the job up unchanged.
+    """
+
+    scheduled = delay is not None and delay.total_seconds() > 0
+    job = queue.create_job(
+        func,
+        args=args,
+        job_id=job_id,
+        description=description,
+        status=JobStatus.SCHEDULED if scheduled else JobStatus.QUEUED,
+    )
+    job.origin = queue.name
+    if not scheduled:
+        job.enqueued_at = utcnow()
+
+    async with get_async_redis_client().pipeline(transaction=True) as pipe:
+        pipe.sadd(Queue.redis_queues_keys, queue.key)
+        pipe.hset(job.key, mapping=job.to_dict())
+        if scheduled:
+            run_at = int(time.time() + delay.total_seconds())  # type: ignore[union-attr]
+            pipe.zadd(ScheduledJobRegistry(queue=queue).key, {job.id: run_at})
+        else:
+            pipe.rpush(queue.key, job.id)
+        await pipe.execute()
+    return job
+
+
+async def cancel_pending_job_async(job_id: str) -> bool:
+    """Cancel a job that is still queued or scheduled; running jobs are left alone."""
+
+    redis_client = get_async_redis_client()
+    job_key = Job.key_for(job_id)
+    status, origin = await redis_client.hmget(job_key, "status", "origin")
+    if status not in (JobStatus.QUEUED.encode(), JobStatus.SCHEDULED.encode()) or not origin:
+        return False
+    queue = Queue(origin.decode(), connection=redis_conn)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.lrem(queue.key, 0, job_id)
+        pipe.zrem(ScheduledJobRegistry(queue=queue).key, job_id)
+        pipe.hset(job_key, "status", JobStatus.CANCELED.value)
+        pipe.zadd(CanceledJobRegistry(queue=queue).key, {job_id: time.time()})
+        await pipe.execute()
+    return True
+
+
+def enqueue_review(
+    review_request_id: str,
+    func,
+    *,
+    source: str,
+    changed_lines: Optional[int] = None,
+    repo: Optional[str] = None,
+    installation_id: Optional[int | str] = None,
+) -> Optional[Job]:
+    """Enqueue a review job on the queue matching its source and size.
+
+    Queues under fair scheduling get the review parked in its tenant's sub-queue
+    instead; the fair dispatcher creates the job later, and None is returned.
+    """
+
+    queue = select_review_queue(source, changed_lines)
+    if fair_scheduler.is_fair_queue(queue.name):
+        fair_scheduler.submit_review(queue.name, fair_scheduler.tenant_for(repo, installation_id), review_request_id)
+        return None
+    return queue.enqueue(
+        func,
+        review_request_id,
+        job_id=review_request_id,
+        description=f"Process review {review_request_id}",
+    )
+
+
+async def enqueue_review_async(
+    review_request_id: str,
+    func,
+    *,
+    source: str,
+    changed_lines: Optional[int] = None,
+    repo: Optional[str] = None,
+    installation_id: Optional[int | str] = None,
+    delay: Optional[timedelta] = None,
+) -> Optional[Job]:
+    """Async variant of :func:`enqueue_review` for the ingest routes."""
+
+    queue = select_review_queue(source, changed_lines)
+    if fair_scheduler.is_fair_queue(queue.name):
+        await fair_scheduler.submit_review_async(
+            queue.name,
+            fair_scheduler.tenant_for(repo, installation_id),
+            review_request_id,
+            delay.total_seconds() if delay else 0,
+        )
+        return None
+    return await enqueue_async(
+        queue,
+        func,
+        review_request_id,
+        job_id=review_request_id,
+        description=f"Process review {review_request_id}",
+        delay=delay,
+    )
@@ -0,0 +1,173 @@
+"""Prometheus exporter for the RQ queues, workers and job lifecycle.
+
+Runs as a sidecar next to the workers. Worker replicas can be autoscaled on
+queue depth, oldest-job age and busy workers instead of guesswork. Every poll it
+reads the RQ registries of each review queue and of ``github-sync``. Jobs that
+finished or failed since the previous poll are fetched once and observed into the
+wait-time and run-time histograms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from collections import Counter as TallyCounter
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from rq import Queue, Worker
+from rq.job import Job
+from rq.registry import (
+    DeferredJobRegistry,
+    FailedJobRegistry,
+    FinishedJobRegistry,
+    ScheduledJobRegistry,
+    StartedJobRegistry,
+)
+
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging
+from app.workers.queue import REVIEW_QUEUES, github_sync_queue, redis_conn
+
+logger = logging.getLogger(__name__)
+
+_DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+QUEUE_JOBS = Gauge("rq_queue_jobs", "Jobs in an RQ queue or one of its registries", ["queue", "state"])
+QUEUE_OLDEST_JOB_AGE = Gauge(
+    "rq_queue_oldest_job_age_seconds", "Time the job at the head of the queue has been waiting", ["queue"]
+)
+WORKERS = Gauge("rq_workers", "Registered RQ workers listening on a queue, by state", ["queue", "state"])
+JOB_WAIT = Histogram(
+    "rq_job_wait_seconds", "Time from enqueue until a worker started the job", ["queue"], buckets=_DURATION_BUCKETS
+)
+JOB_RUN = Histogram(
+    "rq_job_run_seconds", "Time a job ran before it finished or failed", ["queue", "status"], buckets=_DURATION_BUCKETS
+)
+JOBS_COMPLETED = Counter("rq_jobs_completed_total", "Jobs that left the started registry", ["queue", "status"])
+
+# Registries whose size is exported as ``rq_queue_jobs{state=...}``.
+_REGISTRIES = {
+    "started": StartedJobRegistry,
+    "scheduled": ScheduledJobRegistry,
+    "deferred": DeferredJobRegistry,
+    "finished": FinishedJobRegistry,
+    "failed": FailedJobRegistry,
+}
+# Registries read for newly completed jobs. Their scores are "completed at +
+# TTL", and each queue uses one TTL, so new entries always score higher than
+# the last one seen.
+_COMPLETED = {"finished": FinishedJobRegistry, "failed": FailedJobRegistry}
+
+
+def _seconds_between(start, end) -> Optional[float]:
+    if not start or not end:
+        return None
+    return max((end - start).total_seconds(), 0.0)
+
+
+class QueueMetricsExporter:
+    def __init__(self, queues: List[Queue], *, connection=redis_conn, clock=time.time) -> None:
+        self.queues = queues
+        self.connection = connection
+        self._clock = clock
+        # Highest registry score seen per (queue, status); None until the first poll.
+        self._watermarks: Dict[Tuple[str, str], Optional[float]] = {}
+
+    def poll(self) -> None:
+        for queue in self.queues:
+            self._collect_depths(queue)
+            for status, registry_cls in _COMPLETED.items():
+                self._observe_completed(queue, status, registry_cls(queue=queue).key)
+        self._collect_workers()
+
+    def _collect_depths(self, queue: Queue) -> None:
+        with self.connection.pipeline(transaction=False) as pipe:
+            pipe.llen(queue.key)
+            pipe.lindex(queue.key, 0)
+            for registry_cls in _REGISTRIES.values():
+                pipe.zcard(registry_cls(queue=queue).key)
+            queued, head, *registry_sizes = pipe.execute()
+
+        QUEUE_JOBS.labels(queue=queue.name, state="queued").set(queued)
+        for state, size in zip(_REGISTRIES, registry_sizes):
+            QUEUE_JOBS.labels(queue=queue.name, state=state).set(size)
+
+        age = 0.0
+        if head:
+            job_id = head.decode() if isinstance(head, bytes) else head
+            jobs = Job.fetch_many([job_id], connection=self.connection)
+            if jobs and jobs[0] and jobs[0].enqueued_at:
+                age = max(self._clock() - jobs[0].enqueued_at.timestamp(), 0.0)
+        QUEUE_OLDEST_JOB_AGE.labels(queue=queue.name).set(age)
+
+    def _observe_completed(self, queue: Queue, status: str, key: str) -> None:
+        marker = (queue.name, status)
+        watermark = self._watermarks.get(marker)
+        if watermark is None:
+            # Start from "now" rather than replaying the whole registry on restart.
+            newest = self.connection.zrevrange(key, 0, 0, withscores=True)
+            self._watermarks[marker] = newest[0][1] if newest else 0.0
+            return
+
+        entries = self.connection.zrangebyscore(key, f"({watermark}", "+inf", withscores=True)
+        if not entries:
+            return
+        self._watermarks[marker] = entries[-1][1]
+        job_ids = [member.decode() if isinstance(member, bytes) else member for member, _ in entries]
+        for job in Job.fetch_many(job_ids, connection=self.connection):
+            if job is None:
+                continue
+            JOBS_COMPLETED.labels(queue=queue.name, status=status).inc()
+            wait = _seconds_between(job.enqueued_at, job.started_at)
+            if wait is not None:
+                JOB_WAIT.labels(queue=queue.name).observe(wait)
+            run = _seconds_between(job.started_at, job.ended_at)
+            if run is not None:
+                JOB_RUN.labels(queue=queue.name, status=status).observe(run)
+
+    def _collect_workers(self) -> None:
+        # app.workers.async_worker does not register as an RQ worker; its jobs
+        # still show up in rq_queue_jobs{state="started"}.
+        names = {queue.name for queue in self.queues}
+        counts: TallyCounter = TallyCounter()
+        for worker in Worker.all(connection=self.connection):
+            state = worker.get_state()
+            for name in worker.queue_names():
+                if name in names:
+                    counts[(name, state)] += 1
+        for name in names:
+            for state in ("busy", "idle", "suspended"):
+                WORKERS.labels(queue=name, state=state).set(counts.get((name, state), 0))
+
+
+def default_queues() -> List[Queue]:
+    return [*REVIEW_QUEUES.values(), github_sync_queue]
+
+
+def run(exporter: QueueMetricsExporter, interval_seconds: float) -> None:
+    logger.info(
+        "Exporting RQ metrics for %s every %ss", ", ".join(queue.name for queue in exporter.queues), interval_seconds
+    )
+    while True:
+        try:
+            exporter.poll()
+        except Exception:
+            logger.exception("Queue metrics poll failed")
+        time.sleep(interval_seconds)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export RQ queue and worker metrics to Prometheus")
+    parser.add_argument("--port", type=int, default=9102, help="Port for the /metrics endpoint (default: 9102)")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    start_http_server(args.port)
+    run(QueueMetricsExporter(default_queues()), settings.queue_metrics_interval_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,129 +1,324 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
+from rq import Queue, get_current_job
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.core.db import SessionLocal
 from app.models.review_request import ReviewRequest
-from app.models.review_result import ReviewResult
 from app.review_pipeline.orchestrator import get_orchestrator
-from app.services.github_comment_service import sync_review_to_github
-from app.services.github_service import GitHubAPIError, fetch_pr_diff
+from app.schemas.review_schemas import ReviewComment
+from app.services.admission import record_completion
+from app.services.diff_store import has_diff, review_diff, store_diff
+from app.services.fair_scheduler import release_tenant_slot, tenant_for
+from app.services.github_rate_limiter import GitHubRateLimitedError
+from app.services.github_service import GitHubAPIError, fetch_review_diff, fetch_review_diff_async
+from app.services.metrics_rollups import record_completed, record_failed
+from app.services.review_cache import cache_response
+from app.services.review_coalescing import is_superseded
+from app.services.review_comments import insert_review_comments
+from app.services.review_events import publish_findings, publish_status
+from app.services.review_service import build_review_response
+from app.services.review_state import claim_review, transition, upsert_result
+from app.workers.github_sync_worker import enqueue_github_sync
+from app.workers.queue import enqueue_deferred, large_review_queue, queue_for_job
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-def _get_review(db: Session, review_request_id: str) -> ReviewRequest | None:
-    return db.query(ReviewRequest).filter(ReviewRequest.id == review_request_id).first()
+def _stop_if_superseded(db: Session, review: ReviewRequest) -> bool:
+    """Cooperative cancellation point: abandon reviews of commits that a newer push replaced.
 
+    Commits the move to ``superseded``, together with anything else pending in the transaction.
+    """
 
-def _get_or_create_result(db: Session, review_request_id: str) -> ReviewResult:
-    existing = (
-        db.query(ReviewResult)
-        .filter(ReviewResult.review_request_id == review_request_id)
-        .first()
+    if not is_superseded(review):
+        return False
+    logger.info("Review %s superseded by a newer push to %s#%s; stopping", review.id, review.repo, review.pr_number)
+    if transition(db, review, "running", "superseded"):
+        db.commit()
+        publish_status(review.id, "superseded")
+    else:
+        db.rollback()
+    return True
+
+
+def _mark_failed(db: Session, review: ReviewRequest) -> bool:
+    # Drop whatever the failed step left in the transaction before recording the failure.
+    db.rollback()
+    if transition(db, review, "running", "failed"):
+        record_failed(db, review, settings.pipeline_mode)
+        db.commit()
+        publish_status(review.id, "failed")
+        return True
+    db.rollback()
+    return False
+
+
+def _mark_failed_after_cancel(review: ReviewRequest) -> None:
+    # The cancelled job's DB phase may still be running in its thread, so use a session of our own.
+    db = SessionLocal()
+    try:
+        _mark_failed(db, review)
+    finally:
+        db.close()
+
+
+def reap_abandoned_reviews(db: Session, now: Optional[datetime] = None, limit: int = 500) -> List[str]:
+    """Mark reviews left ``running`` by a crashed worker as failed; returns their ids.
+
+    No live job holds a review longer than its queue timeout, so a review still
+    ``running`` after ``review_lease_seconds`` has nobody left to finish it.
+    """
+
+    if settings.review_lease_seconds <= 0:
+        return []
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settings.review_lease_seconds)
+    stale = db.scalars(
+        select(ReviewRequest)
+        .where(ReviewRequest.status == "running", ReviewRequest.updated_at < cutoff)
+        .order_by(ReviewRequest.updated_at)
+        .limit(limit)
+    ).all()
+    reaped = []
+    for review in stale:
+        running_since = review.updated_at
+        if not _mark_failed(db, review):
+            continue
+        logger.warning("Review %s had been running since %s; marked it failed", review.id, running_since)
+        release_tenant_slot(review.id, tenant_for(review.repo, review.installation_id))
+        reaped.append(review.id)
+    return reaped
+
+
+# The job is split into DB phases (below) and the two I/O-bound steps, fetching the
+# diff and running the orchestrator. process_review_job runs them in order on an
+# RQ worker; process_review_job_async awaits the I/O steps so one asyncio worker
+# can keep many reviews in flight. A job that runs to completion uses two
+# transactions: _claim and _finish.
+
+
+def _claim(db: Session, review_request_id: str) -> Optional[Tuple[ReviewRequest, Optional[int], Optional[str]]]:
+    """Claim the review and read its stored diff in one transaction.
+
+    Returns None when the job has nothing (more) to do, otherwise the review, the
+    PR number whose diff still has to be fetched (None when the diff is stored)
+    and the stored diff.
+    """
+
+    review = claim_review(db, review_request_id)
+    if review is None:
+        db.rollback()
+        logger.info("Review request %s is missing or no longer pending; skipping", review_request_id)
+        return None
+    if _stop_if_superseded(db, review):
+        return None
+
+    diff_text = review_diff(db, review) if has_diff(review) else None
+    db.commit()
+    publish_status(review.id, "running")
+
+    if review.source != "github" or diff_text is not None:
+        return review, None, diff_text
+
+    if not review.repo or not review.pr_number:
+        logger.error("Review %s missing repo/pr info for GitHub source", review_request_id)
+        _mark_failed(db, review)
+        return None
+    try:
+        pr_number = int(review.pr_number)
+    except (TypeError, ValueError):
+        logger.error("Invalid PR number %s for review %s", review.pr_number, review_request_id)
+        _mark_failed(db, review)
+        return None
+    return review, pr_number, None
+
+
+def _fail_fetch(db: Session, review: ReviewRequest, pr_number: int, exc: GitHubAPIError) -> None:
+    logger.error("Unable to fetch GitHub diff for %s#%s: %s", review.repo, pr_number, exc, exc_info=exc)
+    _mark_failed(db, review)
+
+
+def _finish(
+    db: Session,
+    review: ReviewRequest,
+    summary: str,
+    comments: List[ReviewComment],
+    metadata: dict,
+    started_at: float,
+    fetched_diff: Optional[str] = None,
+) -> bool:
+    """Store the fetched diff, the result, its findings and rollups, and complete the review in one transaction.
+
+    Returns False when the review was superseded or taken over instead.
+    """
+
+    if _stop_if_superseded(db, review):
+        return False
+
+    diff_values = {}
+    if fetched_diff is not None:
+        stored = store_diff(db, fetched_diff)
+        diff_values = {
+            "diff_sha256": stored.sha256,
+            "diff_size": stored.size,
+            "diff_stored_size": stored.stored_size,
+            "diff_snapshot": None,
+        }
+    if not transition(db, review, "running", "completed", **diff_values):
+        db.rollback()
+        return False
+
+    serialized_comments = json.dumps(
+        {
+            "comments": [comment.dict() for comment in comments],
+            "metadata": metadata,
+        }
     )
-    if existing:
-        return existing
+    result = upsert_result(db, review.id, summary, serialized_comments)
+    insert_review_comments(db, review, comments)
+    duration = time.perf_counter() - started_at
+    record_completed(db, review, settings.pipeline_mode, comments, metadata, duration)
+    db.commit()
+
+    cache_response(build_review_response(review, result))
+    if settings.review_events_findings_enabled:
+        publish_findings(review.id, (comment.dict() for comment in comments))
+    publish_status(review.id, "completed")
+
+    if settings.github_comment_sync_enabled and review.source == "github":
+        # Publishing runs on the github-sync queue so GitHub latency stays off this worker.
+        try:
+            enqueue_github_sync(review.id)
+        except Exception:
+            logger.exception("Failed to queue GitHub sync for review %s", review.id)
 
-    result = ReviewResult(review_request_id=review_request_id)
-    db.add(result)
-    return result
+    logger.info(
+        "Processed review %s in %.2fs with %d comment(s)",
+        review.id,
+        duration,
+        len(comments),
+    )
+    logger.debug("Pipeline metadata for %s: %s", review.id, metadata)
+    return True
+
+
+def _defer(db: Session, review: ReviewRequest, queue: Queue, retry_after: float) -> None:
+    # Hand the review back as pending and retry once the quota window resets.
+    if transition(db, review, "running", "pending"):
+        db.commit()
+        publish_status(review.id, "pending")
+        enqueue_deferred(queue, process_review_job, review.id, retry_after, "Process review")
+    else:
+        db.rollback()
 
 
-def process_review_job(review_request_id: str) -> None:
-    db: Session = SessionLocal()
+def _slot_tenant(fair_tenant: Optional[str], review: Optional[ReviewRequest]) -> Optional[str]:
+    # Jobs from the fair dispatcher name their tenant; older jobs fall back to the review's.
+    if fair_tenant or review is None:
+        return fair_tenant
+    return tenant_for(review.repo, review.installation_id)
+
+
+def process_review_job(review_request_id: str, fair_tenant: Optional[str] = None) -> None:
+    """Run one review. ``fair_tenant`` is set by the fair dispatcher, whose slot the job frees when it ends."""
+
+    # Attributes stay loaded across commits; nothing else writes the claimed row.
+    db: Session = SessionLocal(expire_on_commit=False)
     review: ReviewRequest | None = None
     started_at = time.perf_counter()
     try:
-        review = _get_review(db, review_request_id)
-        if not review:
-            logger.warning("Review request %s no longer exists", review_request_id)
+        claimed = _claim(db, review_request_id)
+        if not claimed:
             return
+        review, pr_number, diff_text = claimed
 
-        if review.source == "github" and not review.diff_snapshot:
-            if not review.repo or not review.pr_number:
-                logger.error(
-                    "Review %s missing repo/pr info for GitHub source", review_request_id
-                )
-                review.status = "failed"
-                review.updated_at = datetime.utcnow()
-                db.commit()
-                return
-
+        fetched_diff = None
+        if pr_number is not None:
             try:
-                pr_number = int(review.pr_number)
-            except (TypeError, ValueError):
-                logger.error(
-                    "Invalid PR number %s for review %s", review.pr_number, review_request_id
-                )
-                review.status = "failed"
-                review.updated_at = datetime.utcnow()
-                db.commit()
+                fetched_diff = fetch_review_diff(review.repo, pr_number, review.installation_id)  # type: ignore[arg-type]
+            except GitHubRateLimitedError as exc:
+                _defer(db, review, queue_for_job(get_current_job(), large_review_queue), exc.retry_after)
                 return
-
-            try:
-                diff_text = fetch_pr_diff(review.repo, pr_number)
             except GitHubAPIError as exc:
-                logger.exception(
-                    "Unable to fetch GitHub diff for %s#%s: %s",
-                    review.repo,
-                    pr_number,
-                    exc,
-                )
-                review.status = "failed"
-                review.updated_at = datetime.utcnow()
-                db.commit()
+                _fail_fetch(db, review, pr_number, exc)
                 return
+            diff_text = fetched_diff
 
-            review.diff_snapshot = diff_text
-            db.commit()
+        orchestrator = get_orchestrator(settings.pipeline_mode)
+        summary, comments, metadata = orchestrator.run(diff_text)
+        if _finish(db, review, summary, comments, metadata, started_at, fetched_diff):
+            job = get_current_job()
+            record_completion(job.origin if job else None, review.id)
 
-        review.status = "running"
-        review.updated_at = datetime.utcnow()
-        db.commit()
+    except Exception:
+        logger.exception("Failed to process review %s", review_request_id)
+        if review:
+            _mark_failed(db, review)
+        raise
+    finally:
+        # Also when nothing was claimed, e.g. for a superseded review.
+        release_tenant_slot(review_request_id, _slot_tenant(fair_tenant, review))
+        db.close()
 
-        orchestrator = get_orchestrator(settings.pipeline_mode)
-        summary, comments, metadata = orchestrator.run(review.diff_snapshot)
-
-        serialized_comments = json.dumps(
-            {
-                "comments": [comment.dict() for comment in comments],
-                "metadata": metadata,
-            }
-        )
-
-        result = _get_or_create_result(db, review_request_id)
-        result.summary = summary
-        result.raw_response = serialized_comments
-        result.created_at = datetime.utcnow()
-        review.status = "completed"
-        review.updated_at = datetime.utcnow()
-        db.commit()
 
-        sync_review_to_github(review, summary, comments, metadata)
+async def process_review_job_async(
+    review_request_id: str, fair_tenant: Optional[str] = None, *, queue: Optional[Queue] = None
+) -> None:
+    """Coroutine version of :func:`process_review_job` for ``app.workers.async_worker``.
+
+    DB phases run in a worker thread on the job's own session; the GitHub fetch and
+    the orchestrator are awaited so they never hold a thread while waiting.
+    """
+
+    db: Session = SessionLocal(expire_on_commit=False)
+    review: ReviewRequest | None = None
+    started_at = time.perf_counter()
+    try:
+        claimed = await asyncio.to_thread(_claim, db, review_request_id)
+        if not claimed:
+            return
+        review, pr_number, diff_text = claimed
+
+        fetched_diff = None
+        if pr_number is not None:
+            try:
+                fetched_diff = await fetch_review_diff_async(
+                    review.repo, pr_number, review.installation_id  # type: ignore[arg-type]
+                )
+            except GitHubRateLimitedError as exc:
+                await asyncio.to_thread(_defer, db, review, queue or large_review_queue, exc.retry_after)
+                return
+            except GitHubAPIError as exc:
+                await asyncio.to_thread(_fail_fetch, db, review, pr_number, exc)
+                return
+            diff_text = fetched_diff
 
-        duration = time.perf_counter() - started_at
-        logger.info(
-            "Processed review %s in %.2fs with %d comment(s)",
-            review_request_id,
-            duration,
-            len(comments),
-        )
-        logger.debug("Pipeline metadata for %s: %s", review_request_id, metadata)
+        orchestrator = get_orchestrator(settings.pipeline_mode)
+        summary, comments, metadata = await orchestrator.arun(diff_text)
+        if await asyncio.to_thread(_finish, db, review, summary, comments, metadata, started_at, fetched_diff):
+            await asyncio.to_thread(record_completion, queue.name if queue else None, review.id)
 
+    except asyncio.CancelledError:
+        # Raised by the async worker's job timeout; a BaseException, so not caught below.
+        logger.error("Review %s was cancelled; marking it failed", review_request_id)
+        if review:
+            await asyncio.shield(asyncio.to_thread(_mark_failed_after_cancel, review))
+        raise
     except Exception:
         logger.exception("Failed to process review %s", review_request_id)
         if review:
-            review.status = "failed"
-            review.updated_at = datetime.utcnow()
-            db.commit()
+            await asyncio.to_thread(_mark_failed, db, review)
         raise
     finally:
-        db.close()
+        await asyncio.to_thread(release_tenant_slot, review_request_id, _slot_tenant(fair_tenant, review))
+        await asyncio.to_thread(db.close)
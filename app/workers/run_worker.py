@@ -1,8 +1,18 @@
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
 from rq import SimpleWorker, Worker
 from rq.timeouts import TimerDeathPenalty
-import sys
 
-from app.workers.queue import redis_conn
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging
+from app.core.metrics import compact_process_files, multiprocess_dir, reset_multiprocess_dir, start_metrics_server
+from app.workers.maintenance_worker import ensure_retention_scheduled
+from app.workers.queue import MAINTENANCE_QUEUE, WORKER_PROFILES, redis_conn
+
+logger = logging.getLogger(__name__)
 
 
 class WindowsWorker(SimpleWorker):
@@ -11,9 +21,57 @@ class WindowsWorker(SimpleWorker):
     death_penalty_class = TimerDeathPenalty
 
 
-def main() -> None:
-    worker_class = WindowsWorker if sys.platform == "win32" else Worker
-    worker = worker_class(["reviews"], connection=redis_conn)
+class MetricsWorker(Worker):
+    """Forking worker that folds each job process's metric files into its own once the job ends."""
+
+    def execute_job(self, job, queue):
+        try:
+            super().execute_job(job, queue)
+        finally:
+            if self.horse_pid:
+                try:
+                    compact_process_files(self.horse_pid)
+                except OSError:
+                    logger.warning("Failed to compact metrics of job process %s", self.horse_pid, exc_info=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run an RQ worker for the review service")
+    parser.add_argument(
+        "queues",
+        nargs="*",
+        help="Queues to consume, in priority order; overrides --profile",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(WORKER_PROFILES),
+        default="all",
+        help="Named set of queues to consume (default: all review queues)",
+    )
+    parser.add_argument("--metrics-port", type=int, help="Expose Prometheus metrics on this port")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    setup_logging(settings.log_level)
+    queues = args.queues or WORKER_PROFILES[args.profile]
+    if sys.platform == "win32":
+        worker_class = WindowsWorker
+    elif multiprocess_dir():
+        worker_class = MetricsWorker
+    else:
+        worker_class = Worker
+
+    if args.metrics_port:
+        if worker_class is Worker:
+            logger.warning(
+                "PROMETHEUS_MULTIPROC_DIR is not set; metrics recorded inside jobs are lost when each job process exits"
+            )
+        reset_multiprocess_dir()
+        start_metrics_server(args.metrics_port)
+
+    if MAINTENANCE_QUEUE in queues:
+        ensure_retention_scheduled()
+    worker = worker_class(queues, connection=redis_conn)
     worker.work(with_scheduler=True)
 
 
@@ -0,0 +1,21 @@
+"""Write review_comments rows for results stored before findings were normalized."""
+import logging
+import sys
+
+from app import models  # noqa: F401
+from app.core.db import Base, SessionLocal, engine
+from app.core.logging_config import setup_logging
+from app.services.review_comments import backfill_review_comments
+
+setup_logging("INFO")
+Base.metadata.create_all(bind=engine)
+
+batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+db = SessionLocal()
+try:
+    backfilled = backfill_review_comments(db, batch_size=batch_size)
+finally:
+    db.close()
+
+logging.getLogger(__name__).info("Backfilled findings of %d review(s)", backfilled)
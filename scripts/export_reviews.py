@@ -0,0 +1,27 @@
+"""Write every review, with its result and diff, as NDJSON; gzipped when the path ends in .gz."""
+import gzip
+import logging
+import sys
+
+import orjson
+
+from app import models  # noqa: F401
+from app.core.db import SessionLocal
+from app.core.logging_config import setup_logging
+from app.services.review_export import iter_review_records
+
+setup_logging("INFO")
+
+path = sys.argv[1] if len(sys.argv) > 1 else "reviews.ndjson.gz"
+
+db = SessionLocal()
+exported = 0
+try:
+    with (gzip.open if path.endswith(".gz") else open)(path, "wb") as out:
+        for record in iter_review_records(db, include_diff=True):
+            out.write(orjson.dumps(record) + b"\n")
+            exported += 1
+finally:
+    db.close()
+
+logging.getLogger(__name__).info("Exported %d review(s) to %s", exported, path)
@@ -0,0 +1,24 @@
+"""Load an export or retention archive (NDJSON, optionally gzipped) into DATABASE_URL in batches."""
+import gzip
+import logging
+import sys
+
+from app import models  # noqa: F401
+from app.core.db import Base, SessionLocal, engine
+from app.core.logging_config import setup_logging
+from app.services.review_export import import_review_records, parse_records
+
+setup_logging("INFO")
+Base.metadata.create_all(bind=engine)
+
+path = sys.argv[1]
+batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+db = SessionLocal()
+try:
+    with (gzip.open if path.endswith(".gz") else open)(path, "rb") as lines:
+        report = import_review_records(db, parse_records(lines), batch_size=batch_size)
+finally:
+    db.close()
+
+logging.getLogger(__name__).info("Imported %d review(s), skipped %d existing", report.imported, report.skipped)
@@ -0,0 +1,21 @@
+"""Move diffs stored inline on review_requests into the compressed blob store."""
+import logging
+import sys
+
+from app import models  # noqa: F401
+from app.core.db import Base, SessionLocal, engine
+from app.core.logging_config import setup_logging
+from app.services.diff_store import offload_inline_diffs
+
+setup_logging("INFO")
+Base.metadata.create_all(bind=engine)
+
+batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+db = SessionLocal()
+try:
+    migrated = offload_inline_diffs(db, batch_size=batch_size)
+finally:
+    db.close()
+
+logging.getLogger(__name__).info("Offloaded %d diff(s)", migrated)
@@ -0,0 +1,13 @@
+"""Add the tables, columns and indexes of the current models to an existing database."""
+import logging
+
+from app import models  # noqa: F401
+from app.core.db import Base, engine
+from app.core.logging_config import setup_logging
+from app.core.schema import upgrade_schema
+
+setup_logging("INFO")
+
+applied = upgrade_schema(engine, Base.metadata)
+
+logging.getLogger(__name__).info("Applied %d schema change(s)", len(applied))
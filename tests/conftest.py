@@ -0,0 +1,251 @@
+"""Fixtures shared by the test modules: an in-memory database and in-memory Redis fakes."""
+
+from functools import partial
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (register tables)
+from app.core.db import Base
+
+
+@pytest.fixture()
+def engine():
+    """In-memory SQLite with every table; StaticPool lets all sessions share its one connection."""
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture()
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _encode(value: Any) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+def _score_bound(bound: Any) -> Tuple[float, bool]:
+    # ZRANGEBYSCORE bounds: numbers, "-inf"/"+inf", or "(<score>" for an exclusive bound.
+    if isinstance(bound, str) and bound.startswith("("):
+        return float(bound[1:]), True
+    return float(bound), False
+
+
+class FakeRedis:
+    """The subset of redis-py the app uses, in memory.
+
+    Strings and hash fields come back as bytes like from the real client; set and
+    sorted-set members are kept as given.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, bytes] = {}
+        self.hashes: Dict[str, Dict[bytes, bytes]] = {}
+        self.zsets: Dict[str, Dict[Any, float]] = {}
+        self.sets: Dict[str, set] = {}
+        self.lists: Dict[str, List[Any]] = {}
+        self.ttls: Dict[str, float] = {}
+
+    # strings and keys
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False, xx=False, keepttl=False, get=False):
+        previous = self.values.get(key)
+        if (nx and previous is not None) or (xx and previous is None):
+            return previous if get else None
+        self.values[key] = _encode(value)
+        if ex is not None:
+            self.ttls[key] = ex
+        return previous if get else True
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            for store in (self.values, self.hashes, self.zsets, self.sets, self.lists):
+                if key in store:
+                    del store[key]
+                    removed += 1
+            self.ttls.pop(key, None)
+        return removed
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def expireat(self, key, when):
+        self.ttls[key] = when
+        return True
+
+    # hashes
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hmget(self, key, *fields):
+        stored = self.hashes.get(key, {})
+        return [stored.get(_encode(field)) for field in fields]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        bucket = self.hashes.setdefault(key, {})
+        for name, item in items.items():
+            bucket[_encode(name)] = _encode(item)
+        return len(items)
+
+    def hincrby(self, key, field, amount=1):
+        bucket = self.hashes.setdefault(key, {})
+        current = int(bucket.get(_encode(field), b"0")) + amount
+        bucket[_encode(field)] = _encode(current)
+        return current
+
+    # sorted sets
+    def zadd(self, key, mapping):
+        zset = self.zsets.setdefault(key, {})
+        added = sum(member not in zset for member in mapping)
+        zset.update({member: float(score) for member, score in mapping.items()})
+        return added
+
+    def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        return sum(zset.pop(member, None) is not None for member in members)
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def _by_score(self, key, low, high) -> List[Tuple[Any, float]]:
+        (floor, floor_open), (ceiling, ceiling_open) = _score_bound(low), _score_bound(high)
+        return sorted(
+            (
+                (member, score)
+                for member, score in self.zsets.get(key, {}).items()
+                if (score > floor if floor_open else score >= floor)
+                and (score < ceiling if ceiling_open else score <= ceiling)
+            ),
+            key=lambda item: (item[1], item[0]),
+        )
+
+    def zrangebyscore(self, key, low, high, start=None, num=None, withscores=False):
+        entries = self._by_score(key, low, high)
+        if start is not None:
+            entries = entries[start : start + num if num is not None else None]
+        return entries if withscores else [member for member, _ in entries]
+
+    def zremrangebyscore(self, key, low, high):
+        entries = self._by_score(key, low, high)
+        for member, _ in entries:
+            del self.zsets[key][member]
+        return len(entries)
+
+    def zrevrange(self, key, start, end, withscores=False):
+        entries = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+        entries = entries[start : end + 1 if end != -1 else None]
+        return entries if withscores else [member for member, _ in entries]
+
+    # sets
+    def sadd(self, key, *members):
+        bucket = self.sets.setdefault(key, set())
+        added = len(set(members) - bucket)
+        bucket.update(members)
+        return added
+
+    def srem(self, key, *members):
+        bucket = self.sets.get(key, set())
+        removed = len(bucket & set(members))
+        bucket.difference_update(members)
+        return removed
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    # lists
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lindex(self, key, index):
+        items = self.lists.get(key, [])
+        return items[index] if -len(items) <= index < len(items) else None
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands until ``execute``, like MULTI/EXEC; after ``watch`` and before ``multi`` reads run at once."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: List[Any] = []
+        self.watching = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, *keys):
+        self.watching = True
+
+    def multi(self):
+        self.watching = False
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        if self.watching:
+            return command
+
+        def _queue(*args, **kwargs):
+            self.commands.append(partial(command, *args, **kwargs))
+            return self
+
+        return _queue
+
+    def execute(self):
+        results = [command() for command in self.commands]
+        self.commands = []
+        return results
+
+
+class AsyncFakeRedis:
+    """``redis.asyncio`` flavour of :class:`FakeRedis`: the same commands and data, awaited."""
+
+    def __init__(self) -> None:
+        self.redis = FakeRedis()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.redis, name)
+        if not callable(attribute):
+            return attribute
+
+        async def _call(*args, **kwargs):
+            return attribute(*args, **kwargs)
+
+        return _call
+
+
+@pytest.fixture()
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture()
+def async_fake_redis():
+    return AsyncFakeRedis()
@@ -0,0 +1,116 @@
+import asyncio
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.config import get_settings
+from app.services import admission
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeAsyncRedis") -> None:
+        self.redis = redis
+        self.commands: list = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args))
+
+    async def execute(self):
+        return [self.redis.reply(name, args) for name, args in self.commands]
+
+
+class FakeAsyncRedis:
+    def __init__(self, *, queued=0, scheduled=0, completions=0, pending=None) -> None:
+        self.queued = queued
+        self.scheduled = scheduled
+        self.completions = completions
+        self.pending = pending or {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def reply(self, name, args):
+        if name == "llen":
+            return self.queued
+        if name == "zcount":
+            return self.completions
+        if name == "smembers":
+            return {tenant.encode() for tenant in self.pending}
+        if args[0].startswith("rq:scheduled:"):
+            return self.scheduled
+        return self.pending[args[0].rsplit(":pending:", 1)[1]]
+
+
+def _install(monkeypatch, fake) -> None:
+    admission._load_cache.clear()
+    monkeypatch.setattr(admission, "get_async_redis_client", lambda: fake)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "admission_control_enabled", True)
+    monkeypatch.setattr(settings, "admission_max_queue_depth", 100)
+    monkeypatch.setattr(settings, "admission_max_drain_seconds", 60)
+    monkeypatch.setattr(settings, "admission_throughput_window_seconds", 100)
+    monkeypatch.setattr(settings, "admission_min_retry_after_seconds", 5)
+
+
+def test_admits_when_queue_drains_quickly(monkeypatch):
+    _install(monkeypatch, FakeAsyncRedis(queued=10, completions=100))
+
+    decision = asyncio.run(admission.check_admission("reviews-small"))
+
+    assert decision.admitted
+    assert decision.load.throughput == 1.0
+    assert decision.load.drain_seconds == 10.0
+
+
+def test_depth_counts_scheduled_and_fair_pending_reviews(monkeypatch):
+    _install(monkeypatch, FakeAsyncRedis(queued=40, scheduled=30, completions=1000, pending={"repo:a/b": 20, "manual": 15}))
+
+    decision = asyncio.run(admission.check_admission("reviews-small"))
+
+    assert decision.load.depth == 105
+    assert not decision.admitted
+    assert decision.retry_after == 5
+
+
+def test_rejects_on_drain_time_with_retry_after_for_the_excess(monkeypatch):
+    # 90 waiting at 0.5/s takes 180s to drain; 120s over the threshold.
+    _install(monkeypatch, FakeAsyncRedis(queued=90, completions=50))
+
+    decision = asyncio.run(admission.check_admission("reviews-large"))
+
+    assert not decision.admitted
+    assert decision.retry_after == 120
+
+
+def test_burst_after_idle_period_is_admitted(monkeypatch):
+    _install(monkeypatch, FakeAsyncRedis(queued=30, completions=0))
+
+    decision = asyncio.run(admission.check_admission("reviews-small"))
+
+    assert decision.admitted
+    assert (decision.load.throughput, decision.load.drain_seconds) == (0.0, 0.0)
+
+
+def test_fails_open_when_redis_is_down(monkeypatch):
+    class DownRedis:
+        def pipeline(self, transaction=True):
+            raise RedisConnectionError("down")
+
+    _install(monkeypatch, DownRedis())
+
+    assert asyncio.run(admission.check_admission("reviews-small")).admitted
+
+
+def test_overload_debounce_is_capped(monkeypatch):
+    monkeypatch.setattr(get_settings(), "admission_max_coalesce_seconds", 120)
+    load = admission.QueueLoad("reviews-small", depth=500, throughput=1.0, drain_seconds=500.0)
+    decision = admission.AdmissionDecision(admitted=False, load=load, retry_after=440)
+
+    assert admission.overload_debounce_seconds(decision, 10) == 120
+    load.drain_seconds = 45.0
+    assert admission.overload_debounce_seconds(decision, 10) == 45
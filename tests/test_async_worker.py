@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.workers import async_worker
+
+
+def _worker(monkeypatch, calls):
+    worker = async_worker.AsyncWorker([], concurrency=2, name="test")
+    monkeypatch.setattr(worker, "_start_job", lambda job, queue: calls.append("start"))
+    monkeypatch.setattr(worker, "_finish_job", lambda job, queue: calls.append(("finish", job._result)))
+    monkeypatch.setattr(
+        worker,
+        "_fail_job",
+        lambda job, queue, exc, retry=True: calls.append(("fail" if retry else "fail-no-retry", exc.splitlines()[-1])),
+    )
+    return worker
+
+
+def _job(func_name, timeout=5):
+    return SimpleNamespace(id="j1", func_name=func_name, args=("r1",), kwargs={}, timeout=timeout, _result=None)
+
+
+def _run(worker, job):
+    async def _go():
+        slots = asyncio.Semaphore(1)
+        await slots.acquire()
+        await worker._execute(job, None, slots)
+        return slots.locked()
+
+    return asyncio.run(_go())
+
+
+def test_async_handler_result_is_recorded_and_slot_released(monkeypatch):
+    calls: list = []
+    worker = _worker(monkeypatch, calls)
+
+    async def handler(job, queue):
+        await asyncio.sleep(0)
+        return "done"
+
+    monkeypatch.setitem(async_worker.ASYNC_HANDLERS, "tests.handler", handler)
+
+    assert _run(worker, _job("tests.handler")) is False
+    assert calls == ["start", ("finish", "done")]
+
+
+def test_failing_or_slow_jobs_go_through_failure_handling(monkeypatch):
+    calls: list = []
+    worker = _worker(monkeypatch, calls)
+
+    async def boom(job, queue):
+        raise ValueError("bad diff")
+
+    async def slow(job, queue):
+        await asyncio.sleep(5)
+
+    monkeypatch.setitem(async_worker.ASYNC_HANDLERS, "tests.boom", boom)
+    monkeypatch.setitem(async_worker.ASYNC_HANDLERS, "tests.slow", slow)
+
+    _run(worker, _job("tests.boom"))
+    _run(worker, _job("tests.slow", timeout=0.01))
+
+    assert calls[1] == ("fail", "ValueError: bad diff")
+    assert calls[3][0] == "fail" and "TimeoutError" in calls[3][1]
+
+
+def test_jobs_without_async_handler_run_in_a_thread(monkeypatch):
+    calls: list = []
+    worker = _worker(monkeypatch, calls)
+    job = _job("tests.sync")
+    job.func = lambda review_id: f"sync {review_id}"
+
+    _run(worker, job)
+
+    assert calls == ["start", ("finish", "sync r1")]
+
+
+def test_timed_out_thread_job_is_not_retried_while_it_still_runs(monkeypatch):
+    calls: list = []
+    worker = _worker(monkeypatch, calls)
+    release = threading.Event()
+    job = _job("tests.sync", timeout=0.05)
+
+    def publish(review_id):
+        release.wait(5)
+        calls.append("thread done")
+
+    job.func = publish
+    monkeypatch.setattr(worker, "_start_job", lambda job, queue: threading.Timer(0.2, release.set).start())
+
+    assert _run(worker, job) is False
+    assert calls[0][0] == "fail-no-retry" and "TimeoutError" in calls[0][1]
+    # The slot is only freed once the thread is done.
+    assert calls[1] == "thread done"
@@ -0,0 +1,39 @@
+from sqlalchemy import create_engine, text
+from prometheus_client import REGISTRY
+
+from app.core.config import Settings
+from app.core.db import configure_engine, engine_options
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels)
+
+
+def test_sqlite_file_profile_enables_wal_and_pool_metrics(tmp_path):
+    settings = Settings(sqlite_busy_timeout_ms=2500)
+    url = f"sqlite:///{tmp_path / 'reviews.db'}"
+    engine = configure_engine(
+        create_engine(url, pool_logging_name="profile-test", **engine_options(url, settings)), settings
+    )
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+        assert _sample("db_pool_connections", engine="profile-test", state="checked_out") == 1
+
+    assert _sample("db_pool_connections", engine="profile-test", state="checked_out") == 0
+    assert _sample("db_pool_connections", engine="profile-test", state="idle") == 1
+    assert _sample("db_pool_checkout_wait_seconds_count", engine="profile-test") == 1
+
+
+def test_postgres_profile_sizes_pool_and_sets_statement_timeout():
+    settings = Settings(db_pool_size=4, db_max_overflow=2, db_statement_timeout_ms=5000)
+
+    sync = engine_options("postgresql://app@db/reviews", settings)
+    async_ = engine_options("postgresql+asyncpg://app@db/reviews", settings, is_async=True)
+
+    assert (sync["pool_size"], sync["max_overflow"], sync["pool_pre_ping"]) == (4, 2, True)
+    assert sync["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert async_["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+    assert "poolclass" not in engine_options("sqlite://", settings)
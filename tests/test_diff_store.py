@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from app.models.diff_blob import DiffBlob
+from app.models.review_request import ReviewRequest
+from app.services import diff_store
+from app.services.review_service import create_review_request
+
+DIFF = "diff --git a/app.py b/app.py\n@@ -1,3 +1,3 @@\n-print('old')\n+print('new')\n" + " context line\n" * 200
+
+
+@pytest.fixture(autouse=True)
+def _empty_diff_cache():
+    diff_store._cache.clear()
+
+
+def test_identical_diffs_share_one_compressed_blob(db):
+    first = create_review_request(db, source="manual", diff=DIFF, repo=None, pr_number=None)
+    second = create_review_request(db, source="manual", diff=DIFF, repo=None, pr_number=None)
+
+    assert db.scalar(select(func.count()).select_from(DiffBlob)) == 1
+    assert first.diff_sha256 == second.diff_sha256
+    assert first.diff_snapshot is None
+    assert first.diff_size == len(DIFF.encode())
+    assert first.diff_stored_size < first.diff_size / 5
+
+
+def test_review_diff_reads_blobs_and_legacy_inline_rows(db):
+    review = create_review_request(db, source="manual", diff=DIFF, repo=None, pr_number=None)
+    legacy = ReviewRequest(source="manual", status="pending", diff_snapshot="inline diff")
+    db.add(legacy)
+    db.commit()
+    diff_store._cache.clear()
+
+    assert diff_store.review_diff(db, review) == DIFF
+    assert diff_store.review_diff(db, legacy) == "inline diff"
+
+
+def test_offload_inline_diffs_moves_legacy_rows(db):
+    db.add_all([ReviewRequest(source="manual", status="completed", diff_snapshot=DIFF) for _ in range(3)])
+    db.commit()
+    review_selects = []
+    event.listen(
+        db.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: review_selects.append(statement)
+        if statement.startswith("SELECT") and "FROM review_requests" in statement
+        else None,
+    )
+
+    assert diff_store.offload_inline_diffs(db, batch_size=2) == 3
+    # One query per batch (2, 1, then none left); diff_snapshot comes with it, not row by row.
+    assert len(review_selects) == 3
+    rows = db.query(ReviewRequest).all()
+    assert all(row.diff_snapshot is None and row.diff_sha256 for row in rows)
+    assert db.scalar(select(func.count()).select_from(DiffBlob)) == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = diff_store._DiffCache(max_chars=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.get("a")
+    cache.put("c", "cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import fair_scheduler
+from app.workers import fair_dispatcher
+
+
+class FakeQueue:
+    def __init__(self, name="reviews-small") -> None:
+        self.name = name
+        self.jobs: list[str] = []
+        self.kwargs: list[dict] = []
+
+    @property
+    def count(self):
+        return len(self.jobs)
+
+    def enqueue(self, func, review_id, pipeline=None, **kwargs):
+        def _push():
+            self.jobs.append(review_id)
+            self.kwargs.append(kwargs)
+
+        if pipeline is None:
+            _push()
+        else:
+            pipeline.commands.append(_push)
+
+
+@pytest.fixture()
+def fake_redis(fake_redis, monkeypatch):
+    def _forget_idle_tenant(keys, args):
+        # Stands in for the dispatcher's Lua script.
+        if not fake_redis.zcard(keys[0]):
+            fake_redis.srem(keys[1], args[0])
+
+    monkeypatch.setattr(fake_redis, "register_script", lambda script: _forget_idle_tenant, raising=False)
+    monkeypatch.setattr(fair_dispatcher, "redis_conn", fake_redis)
+    return fake_redis
+
+
+def _dispatcher(queue, **overrides):
+    options = dict(max_in_flight=10, buffer=10, weights={}, slot_ttl_seconds=600, clock=lambda: 1000.0)
+    options.update(overrides)
+    return fair_dispatcher.FairDispatcher([queue], **options)
+
+
+def _submit(fake, queue, tenant, review_id, ready_at=0.0):
+    fair_scheduler.submit(fake, queue.name, tenant, review_id, ready_at)
+
+
+def test_busy_tenant_does_not_starve_others(fake_redis):
+    queue = FakeQueue()
+    for index in range(5):
+        _submit(fake_redis, queue, "repo:big", f"big-{index}", ready_at=index)
+    _submit(fake_redis, queue, "repo:small", "small-0", ready_at=10)
+
+    _dispatcher(queue, buffer=2).tick()
+
+    assert queue.jobs == ["big-0", "small-0"]
+
+
+def test_weights_and_max_in_flight_per_tenant(fake_redis):
+    queue = FakeQueue()
+    for index in range(4):
+        _submit(fake_redis, queue, "repo:a", f"a-{index}", ready_at=index)
+        _submit(fake_redis, queue, "repo:b", f"b-{index}", ready_at=index)
+
+    _dispatcher(queue, weights={"repo:a": 3}, max_in_flight=2).tick()
+
+    # repo:a may take 3 per round but is capped at 2 in flight; repo:b gets 1 per round.
+    assert queue.jobs == ["a-0", "a-1", "b-0"]
+    assert fake_redis.zcard(fair_scheduler.inflight_key("repo:a")) == 2
+
+
+def test_debounced_reviews_wait_until_ready_and_idle_tenants_are_forgotten(fake_redis):
+    queue = FakeQueue()
+    _submit(fake_redis, queue, "repo:a", "later", ready_at=2000.0)
+    _submit(fake_redis, queue, "repo:b", "now", ready_at=900.0)
+
+    _dispatcher(queue).tick()
+
+    assert queue.jobs == ["now"]
+    assert fake_redis.smembers(fair_scheduler.tenants_key(queue.name)) == {"repo:a"}
+
+
+def test_dispatch_names_the_tenant_and_keeps_the_review_when_enqueue_fails(fake_redis, monkeypatch):
+    queue = FakeQueue()
+    _submit(fake_redis, queue, "repo:a", "r1")
+    pending = fair_scheduler.pending_key(queue.name, "repo:a")
+
+    healthy_pipeline = fake_redis.pipeline
+
+    def _lost_connection():
+        raise ConnectionError("redis went away")
+
+    def _failing_pipeline(transaction=True):
+        pipe = healthy_pipeline(transaction)
+        pipe.execute = _lost_connection
+        return pipe
+
+    monkeypatch.setattr(fake_redis, "pipeline", _failing_pipeline)
+    with pytest.raises(ConnectionError):
+        _dispatcher(queue).tick()
+
+    assert queue.jobs == []
+    assert fake_redis.zcard(pending) == 1
+    assert fake_redis.zcard(fair_scheduler.inflight_key("repo:a")) == 0
+
+    monkeypatch.setattr(fake_redis, "pipeline", healthy_pipeline)
+    _dispatcher(queue).tick()
+
+    assert queue.jobs == ["r1"]
+    assert queue.kwargs[0]["fair_tenant"] == "repo:a"
+    assert fake_redis.zcard(pending) == 0
+
+
+def test_tenant_for_and_weight_parsing(monkeypatch):
+    settings = SimpleNamespace(fair_tenant_key="installation")
+    monkeypatch.setattr(fair_scheduler, "get_settings", lambda: settings)
+
+    assert fair_scheduler.tenant_for("o/r", 42) == "installation:42"
+    assert fair_scheduler.tenant_for("o/r", None) == "repo:o/r"
+    assert fair_scheduler.tenant_for(None) == fair_scheduler.MANUAL_TENANT
+    assert fair_scheduler.parse_weights("repo:o/r=3, installation:42=2,bad") == {"repo:o/r": 3, "installation:42": 2}
@@ -0,0 +1,98 @@
+import json
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.services.github_auth import GitHubAppAuth, GitHubAppAuthError, is_app_private_key
+
+
+@pytest.fixture(scope="module")
+def private_key_pem() -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+class FakeAppClient:
+    def __init__(self, expires_at: str = "2030-01-01T01:00:00Z") -> None:
+        self.calls = 0
+        self.expires_at = expires_at
+
+    def post(self, path, *, json=None, headers=None):
+        self.calls += 1
+        return httpx.Response(201, json={"token": f"ghs_{self.calls}", "expires_at": self.expires_at})
+
+
+def _auth(pem, redis_client, clock, client=None):
+    auth = GitHubAppAuth("123", pem, "https://api.github.com", redis_client, refresh_margin_seconds=600, clock=clock)
+    if client is not None:
+        auth._app_client = lambda: client  # type: ignore[method-assign]
+    return auth
+
+
+def test_is_app_private_key_distinguishes_pat(private_key_pem):
+    assert is_app_private_key(private_key_pem)
+    assert not is_app_private_key("ghp_personal_token")
+    assert not is_app_private_key(None)
+
+
+def test_app_jwt_is_signed_for_app_and_reused(private_key_pem, fake_redis):
+    now = [1_700_000_000.0]
+    auth = _auth(private_key_pem, fake_redis, lambda: now[0])
+
+    token = auth.app_jwt()
+    claims = jwt.decode(token, options={"verify_signature": False})
+
+    assert claims["iss"] == "123"
+    assert claims["exp"] - claims["iat"] <= 600
+    now[0] += 60
+    assert auth.app_jwt() == token
+
+
+def test_installation_token_is_cached_in_process_and_redis(private_key_pem, fake_redis):
+    expiry = 1_893_459_600.0  # 2030-01-01T01:00:00Z
+    client = FakeAppClient()
+    auth = _auth(private_key_pem, fake_redis, lambda: expiry - 3600, client)
+
+    assert auth.installation_token(42) == "ghs_1"
+    assert auth.installation_token(42) == "ghs_1"
+    assert client.calls == 1
+    cached = json.loads(fake_redis.values["gh:app:installation-token:42"])
+    assert cached["token"] == "ghs_1"
+
+    # A fresh process (e.g. a forked job) reuses the Redis copy without calling GitHub.
+    other_client = FakeAppClient()
+    other = _auth(private_key_pem, fake_redis, lambda: expiry - 3600, other_client)
+    assert other.installation_token(42) == "ghs_1"
+    assert other_client.calls == 0
+
+
+def test_token_inside_refresh_margin_is_served_while_refreshing(private_key_pem, fake_redis, monkeypatch):
+    expiry = 1_893_459_600.0
+    client = FakeAppClient()
+    auth = _auth(private_key_pem, fake_redis, lambda: expiry - 3600, client)
+    auth.installation_token(7)
+
+    started = []
+    monkeypatch.setattr(auth, "_refresh_in_background", lambda installation_id: started.append(installation_id))
+    auth._clock = lambda: expiry - 300
+
+    assert auth.installation_token(7) == "ghs_1"
+    assert started == [7]
+    assert client.calls == 1
+
+
+def test_failed_exchange_raises(private_key_pem, fake_redis):
+    class Rejecting:
+        def post(self, path, *, json=None, headers=None):
+            return httpx.Response(401, text="bad credentials")
+
+    auth = _auth(private_key_pem, fake_redis, lambda: 1_700_000_000.0, Rejecting())
+    with pytest.raises(GitHubAppAuthError):
+        auth.installation_token(1)
@@ -45,21 +45,65 @@ class DummyReview:
 
 
 class DummyResponse:
-    def __init__(self, status_code: int = 201, text: str = "created") -> None:
+    def __init__(self, status_code: int = 201, text: str = "created", payload=None) -> None:
         self.status_code = status_code
         self.text = text
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+BOT = {"login": "ryzl-bot", "type": "User"}
+HUMAN = {"login": "octocat", "type": "User"}
 
 
 class DummyClient:
-    def __init__(self, statuses: dict[str, int] | None = None) -> None:
+    def __init__(
+        self,
+        statuses: dict[str, int] | None = None,
+        issue_comments: list[dict] | None = None,
+        threads: list[dict] | None = None,
+    ) -> None:
         self.calls: list[tuple[str, dict | None]] = []
+        self.reads: list[str] = []
         self.statuses = statuses or {}
+        self.issue_comments = issue_comments or []
+        self.threads = threads or []
+
+    def get(self, path: str, *, headers=None):
+        self.reads.append(path)
+        if path == "user":
+            return DummyResponse(status_code=200, text="ok", payload={"login": BOT["login"]})
+        return DummyResponse(status_code=200, text="ok", payload=self.issue_comments)
 
     def post(self, path: str, *, json: dict | None = None, headers=None):
+        if path == "graphql" and "reviewThreads" in json["query"]:
+            self.reads.append(path)
+            payload = {
+                "data": {
+                    "repository": {
+                        "pullRequest": {
+                            "reviewThreads": {"pageInfo": {"hasNextPage": False}, "nodes": self.threads}
+                        }
+                    }
+                }
+            }
+            return DummyResponse(status_code=200, text="ok", payload=payload)
         self.calls.append((path, json))
         status = self.statuses.get(path, 201)
         text = "ok" if status < 300 else "error"
-        return DummyResponse(status_code=status, text=text)
+        return DummyResponse(status_code=status, text=text, payload={})
+
+    def patch(self, path: str, *, json: dict | None = None, headers=None):
+        self.calls.append((path, json))
+        return DummyResponse(status_code=200, text="ok", payload={})
+
+
+def _thread(comment: ReviewComment, thread_id: str, resolved: bool = False, author: dict = BOT) -> dict:
+    body = svc._format_inline_body(comment)
+    first = {"body": body, "author": {"login": author["login"], "__typename": author["type"]}}
+    return {"id": thread_id, "isResolved": resolved, "comments": {"nodes": [first]}}
 
 
 def test_build_body_limits_comment_count():
@@ -98,7 +142,7 @@ def test_sync_review_posts_inline_review(monkeypatch):
 
     client = DummyClient()
     monkeypatch.setattr(svc, "get_settings", lambda: settings)
-    monkeypatch.setattr(svc, "get_github_client", lambda: client)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
 
     svc.sync_review_to_github(review, "Automated summary", comments, {"total_comments": 1})
 
@@ -106,7 +150,10 @@ def test_sync_review_posts_inline_review(monkeypatch):
     path, payload = client.calls[0]
     assert path == "repos/owner/repo/pulls/5/reviews"
     assert payload["comments"][0]["path"] == "app/example.py"
-    assert "Automated summary" in payload["body"]
+    summary_path, summary_payload = client.calls[1]
+    assert summary_path == "repos/owner/repo/issues/5/comments"
+    assert "Automated summary" in summary_payload["body"]
+    assert svc.SUMMARY_MARKER in summary_payload["body"]
 
 
 def test_sync_review_falls_back_to_issue_comment_when_no_inline(monkeypatch):
@@ -116,7 +163,7 @@ def test_sync_review_falls_back_to_issue_comment_when_no_inline(monkeypatch):
 
     client = DummyClient()
     monkeypatch.setattr(svc, "get_settings", lambda: settings)
-    monkeypatch.setattr(svc, "get_github_client", lambda: client)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
 
     svc.sync_review_to_github(review, "Summary", comments)
 
@@ -134,13 +181,119 @@ def test_sync_review_falls_back_when_review_api_fails(monkeypatch):
     review_path = "repos/owner/repo/pulls/5/reviews"
     client = DummyClient(statuses={review_path: 500})
     monkeypatch.setattr(svc, "get_settings", lambda: settings)
-    monkeypatch.setattr(svc, "get_github_client", lambda: client)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
 
     svc.sync_review_to_github(review, "Summary", comments)
 
     assert len(client.calls) == 2
     assert client.calls[0][0] == review_path
     assert client.calls[1][0] == "repos/owner/repo/issues/5/comments"
+    assert "Inline but fails" in client.calls[1][1]["body"]
+
+
+def test_sync_review_edits_existing_summary_and_skips_posted_findings(monkeypatch):
+    review = DummyReview()
+    comment = _make_comment("Already posted")
+    settings = SimpleNamespace(github_comment_sync_enabled=True, github_comment_max_inline=5)
+
+    client = DummyClient(
+        issue_comments=[
+            {"id": 1, "body": "unrelated human comment", "user": HUMAN},
+            {"id": 99, "body": f"{svc.SUMMARY_MARKER}\nold summary", "user": BOT},
+        ],
+        threads=[_thread(comment, "thread-1")],
+    )
+    monkeypatch.setattr(svc, "get_settings", lambda: settings)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
+
+    svc.sync_review_to_github(review, "New summary", [comment])
+
+    assert [path for path, _ in client.calls] == ["repos/owner/repo/issues/comments/99"]
+    assert "New summary" in client.calls[0][1]["body"]
+
+
+def test_sync_review_resolves_stale_findings_and_skips_unchanged_summary(monkeypatch):
+    review = DummyReview()
+    stale = _make_comment("Fixed since last push")
+    settings = SimpleNamespace(github_comment_sync_enabled=True, github_comment_max_inline=5)
+    summary_body = svc.build_github_comment_body(
+        "Summary", [], max_list_items=5, metadata=None, inline_posted=0, total_comments=0
+    )
+
+    client = DummyClient(
+        issue_comments=[{"id": 7, "body": summary_body, "user": BOT}],
+        threads=[_thread(stale, "thread-stale"), _thread(_make_comment("Resolved"), "thread-done", resolved=True)],
+    )
+    monkeypatch.setattr(svc, "get_settings", lambda: settings)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
+
+    svc.sync_review_to_github(review, "Summary", [])
+
+    assert len(client.calls) == 1
+    path, payload = client.calls[0]
+    assert path == "graphql"
+    assert payload["variables"] == {"threadId": "thread-stale"}
+
+
+def test_sync_review_does_not_repost_findings_resolved_by_a_human(monkeypatch):
+    review = DummyReview()
+    comment = _make_comment("Resolved by reviewer")
+    settings = SimpleNamespace(github_comment_sync_enabled=True, github_comment_max_inline=5)
+
+    client = DummyClient(threads=[_thread(comment, "thread-resolved", resolved=True)])
+    monkeypatch.setattr(svc, "get_settings", lambda: settings)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
+
+    svc.sync_review_to_github(review, "Summary", [comment])
+
+    assert [path for path, _ in client.calls] == ["repos/owner/repo/issues/5/comments"]
+
+
+def test_sync_review_ignores_markers_pasted_by_other_users(monkeypatch):
+    review = DummyReview()
+    comment = _make_comment("Quoted by a human")
+    settings = SimpleNamespace(github_comment_sync_enabled=True, github_comment_max_inline=5)
+    summary_body = svc.build_github_comment_body(
+        "Summary", [], max_list_items=5, metadata=None, inline_posted=0, total_comments=0
+    )
+
+    client = DummyClient(
+        issue_comments=[{"id": 7, "body": f"> {summary_body}", "user": HUMAN}],
+        threads=[_thread(comment, "thread-human", author=HUMAN)],
+    )
+    monkeypatch.setattr(svc, "get_settings", lambda: settings)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
+
+    svc.sync_review_to_github(review, "Summary", [comment])
+
+    # The finding is posted and the summary gets a comment of its own instead of editing the human's.
+    assert [path for path, _ in client.calls] == [
+        "repos/owner/repo/pulls/5/reviews",
+        "repos/owner/repo/issues/5/comments",
+    ]
+
+
+def test_app_comments_are_recognised_by_their_bot_author(monkeypatch):
+    client = DummyClient(
+        issue_comments=[
+            {"id": 3, "body": svc.SUMMARY_MARKER, "user": HUMAN},
+            {"id": 4, "body": svc.SUMMARY_MARKER, "user": {"login": "ryzl[bot]", "type": "Bot"}},
+        ],
+        threads=[_thread(_make_comment("Posted by the App"), "thread-app", author={"login": "ryzl", "type": "Bot"})],
+    )
+    monkeypatch.setattr(svc, "get_github_app_auth", lambda: object())
+
+    state = svc._load_posted_state(client, "owner/repo", 5)
+
+    assert state.summary_comment_id == 4
+    assert state.open_findings == {svc.finding_fingerprint(_make_comment("Posted by the App")): "thread-app"}
+    assert "user" not in client.reads
+
+
+def test_finding_fingerprint_ignores_line_numbers():
+    moved = _make_comment("Same").model_copy(update={"line_number_start": 40, "line_number_end": 41})
+    assert svc.finding_fingerprint(moved) == svc.finding_fingerprint(_make_comment("Same"))
+    assert svc.finding_fingerprint(_make_comment("Other")) != svc.finding_fingerprint(_make_comment("Same"))
 
 
 def test_sync_review_skips_when_disabled(monkeypatch):
@@ -148,7 +301,7 @@ def test_sync_review_skips_when_disabled(monkeypatch):
     comments = [_make_comment("Disabled path")]
     settings = SimpleNamespace(github_comment_sync_enabled=False, github_comment_max_inline=5)
 
-    def _unexpected_call():
+    def _unexpected_call(**_):
         raise AssertionError("GitHub client should not be created when sync is disabled")
 
     monkeypatch.setattr(svc, "get_settings", lambda: settings)
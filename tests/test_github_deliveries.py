@@ -0,0 +1,39 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import github_deliveries as deliveries
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(async_fake_redis, monkeypatch):
+    monkeypatch.setattr(deliveries, "get_async_redis_client", lambda: async_fake_redis)
+    monkeypatch.setattr(deliveries, "get_settings", lambda: SimpleNamespace(github_delivery_ttl_seconds=60))
+    return async_fake_redis
+
+
+def test_duplicate_delivery_returns_original_review():
+    assert asyncio.run(deliveries.claim_delivery("abc")) == (True, None)
+    asyncio.run(deliveries.record_delivery("abc", "review-1"))
+
+    assert asyncio.run(deliveries.claim_delivery("abc")) == (False, "review-1")
+
+
+def test_duplicate_while_original_in_flight_has_no_review_yet():
+    asyncio.run(deliveries.claim_delivery("abc"))
+
+    assert asyncio.run(deliveries.claim_delivery("abc")) == (False, None)
+
+
+def test_released_delivery_can_be_processed_again():
+    asyncio.run(deliveries.claim_delivery("abc"))
+    asyncio.run(deliveries.release_delivery("abc"))
+
+    assert asyncio.run(deliveries.claim_delivery("abc")) == (True, None)
+
+
+def test_missing_delivery_header_is_never_deduplicated(fake_redis):
+    assert asyncio.run(deliveries.claim_delivery(None)) == (True, None)
+    assert asyncio.run(deliveries.claim_delivery(None)) == (True, None)
+    assert fake_redis.values == {}
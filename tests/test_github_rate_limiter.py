@@ -0,0 +1,93 @@
+import httpx
+import pytest
+
+from app.services.github_rate_limiter import (
+    GitHubRateLimitedError,
+    GitHubRateLimiter,
+    bucket_for_token,
+)
+
+
+def _response(status: int, headers: dict[str, str], text: str = "") -> httpx.Response:
+    return httpx.Response(status, headers=headers, text=text)
+
+
+def _limiter(redis_client, now=1000.0, sleeps=None, **kwargs):
+    return GitHubRateLimiter(
+        redis_client,
+        "token:test",
+        clock=lambda: now,
+        sleep=(sleeps.append if sleeps is not None else lambda _: None),
+        **kwargs,
+    )
+
+
+def test_bucket_for_token_does_not_leak_token():
+    bucket = bucket_for_token("ghp_secret")
+    assert "ghp_secret" not in bucket
+    assert bucket == bucket_for_token("ghp_secret")
+    assert bucket_for_token(None) == "anonymous"
+
+
+def test_allows_requests_without_known_quota(fake_redis):
+    _limiter(fake_redis).before_request()
+
+
+def test_defers_when_quota_below_reserve(fake_redis):
+    limiter = _limiter(fake_redis, reserve=10)
+    limiter.after_response(_response(200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "1300"}))
+
+    with pytest.raises(GitHubRateLimitedError) as exc_info:
+        limiter.before_request()
+    assert exc_info.value.retry_after == pytest.approx(300.0)
+
+
+def test_paces_and_reserves_slot_when_quota_is_low(fake_redis):
+    sleeps: list[float] = []
+    limiter = _limiter(fake_redis, sleeps=sleeps, reserve=0, pace_threshold=100, max_pace_seconds=5.0)
+    limiter.after_response(_response(200, {"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": "1200"}))
+
+    limiter.before_request()
+
+    assert sleeps == [pytest.approx(2.0)]
+    assert fake_redis.hashes["gh:rl:token:test:core:quota"][b"remaining"] == b"99"
+    # Async callers get the delay to await instead of a blocking sleep.
+    assert limiter.reserve() == pytest.approx(2.0 * 100 / 99)
+    assert sleeps == [pytest.approx(2.0)]
+
+
+def test_graphql_quota_does_not_overwrite_core_quota(fake_redis):
+    limiter = _limiter(fake_redis, reserve=10)
+    limiter.after_response(_response(200, {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "1300"}))
+
+    with pytest.raises(GitHubRateLimitedError):
+        limiter.after_response(
+            _response(
+                403,
+                {"X-RateLimit-Resource": "graphql", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1600"},
+            ),
+            "graphql",
+        )
+
+    limiter.before_request()
+    with pytest.raises(GitHubRateLimitedError) as exc_info:
+        limiter.before_request("graphql")
+    assert exc_info.value.retry_after == pytest.approx(600.0)
+    assert fake_redis.hashes["gh:rl:token:test:core:quota"][b"remaining"] == b"3999"
+
+
+def test_secondary_rate_limit_blocks_other_callers(fake_redis):
+    limiter = _limiter(fake_redis)
+
+    with pytest.raises(GitHubRateLimitedError) as exc_info:
+        limiter.after_response(_response(403, {"Retry-After": "30"}, "secondary rate limit"))
+    assert exc_info.value.retry_after == 30.0
+
+    with pytest.raises(GitHubRateLimitedError):
+        _limiter(fake_redis, now=1010.0).before_request()
+    _limiter(fake_redis, now=1031.0).before_request()
+
+
+def test_plain_forbidden_is_not_treated_as_rate_limit(fake_redis):
+    limiter = _limiter(fake_redis)
+    limiter.after_response(_response(403, {}, "Resource not accessible by integration"))
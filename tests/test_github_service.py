@@ -0,0 +1,142 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.review_pipeline.multi_agent_pipeline import _parse_unified_diff
+from app.services import github_service as svc
+
+SETTINGS = SimpleNamespace(
+    github_files_per_page=2,
+    github_files_concurrency=4,
+    github_diff_strategy="auto",
+    max_diff_chars=10_000,
+)
+
+
+class FakeGitHub:
+    def __init__(self, routes: dict[str, httpx.Response]) -> None:
+        self.routes = routes
+        self.paths: list[str] = []
+
+    def get(self, path: str, *, headers=None) -> httpx.Response:
+        self.paths.append(path)
+        return self.routes.get(path, httpx.Response(404, text="missing"))
+
+
+def _pull(changed_files: int) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={"changed_files": changed_files, "base": {"sha": "base"}, "head": {"sha": "head"}},
+    )
+
+
+def _install(monkeypatch, client: FakeGitHub, **overrides) -> None:
+    settings = SimpleNamespace(**{**vars(SETTINGS), **overrides})
+    monkeypatch.setattr(svc, "get_settings", lambda: settings)
+    monkeypatch.setattr(svc, "get_github_client", lambda **_: client)
+
+
+def test_files_api_pages_render_a_diff_the_pipeline_parses(monkeypatch):
+    client = FakeGitHub(
+        {
+            "repos/o/r/pulls/7": _pull(3),
+            "repos/o/r/pulls/7/files?per_page=2&page=1": httpx.Response(
+                200,
+                json=[
+                    {"filename": "a.py", "status": "modified", "patch": "@@ -1,1 +1,2 @@\n keep\n+added"},
+                    {"filename": "b.py", "status": "removed", "patch": "@@ -1,1 +0,0 @@\n-gone"},
+                ],
+            ),
+            "repos/o/r/pulls/7/files?per_page=2&page=2": httpx.Response(
+                200,
+                json=[{"filename": "c.py", "status": "added", "patch": "@@ -0,0 +1,1 @@\n+new"}],
+            ),
+        }
+    )
+    _install(monkeypatch, client)
+
+    files = _parse_unified_diff(svc.render_unified_diff(svc.fetch_pr_file_patches("o/r", 7)))
+
+    assert [f.path for f in files] == ["a.py", "b.py", "c.py"]
+    assert files[0].additions == [(2, "added")]
+    assert files[1].deletions == [(1, "gone")]
+    assert files[2].additions == [(1, "new")]
+
+
+def test_truncated_patch_is_rebuilt_from_blobs(monkeypatch):
+    client = FakeGitHub(
+        {
+            "repos/o/r/pulls/7": _pull(1),
+            "repos/o/r/pulls/7/files?per_page=2&page=1": httpx.Response(
+                200, json=[{"filename": "big.py", "status": "modified"}]
+            ),
+            "repos/o/r/contents/big.py?ref=base": httpx.Response(200, content=b"one\ntwo\n"),
+            "repos/o/r/contents/big.py?ref=head": httpx.Response(200, content=b"one\nTWO\nthree\n"),
+        }
+    )
+    _install(monkeypatch, client)
+
+    (entry,) = svc.fetch_pr_file_patches("o/r", 7)
+
+    assert "+TWO" in entry.patch and "-two" in entry.patch
+    diff = svc.render_unified_diff([entry])
+    assert diff.startswith("diff --git a/big.py b/big.py\n--- a/big.py\n+++ b/big.py\n@@")
+
+
+def test_fetch_review_diff_falls_back_when_diff_too_large(monkeypatch):
+    client = FakeGitHub(
+        {
+            "repos/o/r/pulls/7/files?per_page=2&page=1": httpx.Response(
+                200, json=[{"filename": "a.py", "status": "added", "patch": "@@ -0,0 +1 @@\n+x"}]
+            ),
+        }
+    )
+    responses = iter([httpx.Response(406, text="too large"), _pull(1)])
+
+    def _get(path, *, headers=None):
+        client.paths.append(path)
+        if path == "repos/o/r/pulls/7":
+            return next(responses)
+        return client.routes.get(path, httpx.Response(404))
+
+    client.get = _get
+    _install(monkeypatch, client)
+
+    diff = svc.fetch_review_diff("o/r", 7)
+
+    assert "+++ b/a.py" in diff and "--- /dev/null" in diff
+
+
+def test_fetch_review_diff_diff_strategy_does_not_fall_back(monkeypatch):
+    client = FakeGitHub({"repos/o/r/pulls/7": httpx.Response(406, text="too large")})
+    _install(monkeypatch, client, github_diff_strategy="diff")
+
+    with pytest.raises(svc.GitHubAPIError):
+        svc.fetch_review_diff("o/r", 7)
+
+
+def test_fetch_review_diff_async_falls_back_to_files_api(monkeypatch):
+    routes = {
+        "repos/o/r/pulls/7/files?per_page=2&page=1": httpx.Response(
+            200, json=[{"filename": "a.py", "status": "added", "patch": "@@ -0,0 +1 @@\n+x"}]
+        ),
+    }
+    responses = iter([httpx.Response(406, text="too large"), _pull(1)])
+
+    class FakeAsyncGitHub:
+        async def get(self, path, *, headers=None):
+            if path == "repos/o/r/pulls/7":
+                return next(responses)
+            return routes.get(path, httpx.Response(404))
+
+    async def _client(**_):
+        return FakeAsyncGitHub()
+
+    _install(monkeypatch, FakeGitHub({}))
+    monkeypatch.setattr(svc, "get_async_github_client", _client)
+
+    diff = asyncio.run(svc.fetch_review_diff_async("o/r", 7))
+
+    assert "+++ b/a.py" in diff and "--- /dev/null" in diff
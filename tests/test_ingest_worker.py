@@ -0,0 +1,67 @@
+import pytest
+
+from app.models.review_request import ReviewRequest
+from app.services.webhook_ingest import BufferedEvent, PullRequestEvent
+from app.workers import ingest_worker
+
+
+@pytest.fixture()
+def latest(monkeypatch):
+    registered: dict = {}
+
+    def _register(repo, pr_number, review_id):
+        previous = registered.get((repo, pr_number))
+        registered[(repo, pr_number)] = review_id
+        return previous
+
+    monkeypatch.setattr(ingest_worker, "register_latest_review", _register)
+    monkeypatch.setattr(ingest_worker, "_cancel_pending_job", lambda review_id: None)
+    monkeypatch.setattr(ingest_worker.Job, "exists", classmethod(lambda cls, job_id, connection=None: False))
+    return registered
+
+
+def _event(review_id: str, pr_number: int, received_at: float = 1_700_000_000.0) -> BufferedEvent:
+    return BufferedEvent(
+        review_id=review_id,
+        event=PullRequestEvent("synchronize", "o/r", pr_number, 42, f"sha-{review_id}"),
+        received_at=received_at,
+        delivery_id=f"d-{review_id}",
+    )
+
+
+def test_buffered_event_round_trips_through_stream_fields():
+    original = _event("r1", 7)
+    encoded = {key.encode(): value.encode() for key, value in original.to_fields().items()}
+
+    assert BufferedEvent.from_fields(encoded) == original
+
+
+def test_persist_batch_inserts_all_rows_and_coalesces_per_pr(db, latest):
+    batch = [_event("r1", 1), _event("r2", 2), _event("r3", 1)]
+
+    to_enqueue = ingest_worker.persist_batch(db, batch)
+
+    assert [buffered.review_id for buffered in to_enqueue] == ["r2", "r3"]
+    statuses = {row.id: row.status for row in db.query(ReviewRequest)}
+    assert statuses == {"r1": "superseded", "r2": "pending", "r3": "pending"}
+    assert db.get(ReviewRequest, "r3").installation_id == "42"
+
+
+def test_persist_batch_supersedes_pending_review_from_earlier_batch(db, latest):
+    ingest_worker.persist_batch(db, [_event("r1", 1)])
+
+    ingest_worker.persist_batch(db, [_event("r2", 1)])
+
+    assert db.get(ReviewRequest, "r1").status == "superseded"
+    assert db.get(ReviewRequest, "r2").status == "pending"
+
+
+def test_retried_batch_does_not_duplicate_rows(db, latest):
+    batch = [_event("r1", 1)]
+    ingest_worker.persist_batch(db, batch)
+
+    to_enqueue = ingest_worker.persist_batch(db, batch)
+
+    assert db.query(ReviewRequest).count() == 1
+    # The job was never written (Job.exists is False), so the retry enqueues it.
+    assert [buffered.review_id for buffered in to_enqueue] == ["r1"]
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+from app.core.metrics import compact_process_files
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# prometheus_client picks its storage backend at import time, so multiprocess
+# mode has to be exercised in a fresh interpreter.
+SCRIPT = textwrap.dedent(
+    """
+    import glob, os
+    from prometheus_client import Counter, Histogram
+    from app.core.metrics import compact_process_files, metrics_registry
+
+    jobs = Counter("test_jobs", "Jobs", ["queue"])
+    latency = Histogram("test_latency_seconds", "Latency", buckets=(1, 10))
+
+    for _ in range(3):
+        pid = os.fork()
+        if pid == 0:
+            jobs.labels(queue="reviews-small").inc()
+            latency.observe(5)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        compact_process_files(pid)
+
+    registry = metrics_registry()
+    print(registry.get_sample_value("test_jobs_total", {"queue": "reviews-small"}))
+    print(registry.get_sample_value("test_latency_seconds_bucket", {"le": "10.0"}))
+    print(len(glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "counter_*.db"))))
+    """
+)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_forked_job_metrics_survive_and_are_compacted(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    total, bucket, counter_files = result.stdout.split()
+    assert float(total) == 3
+    assert float(bucket) == 3
+    # Only the parent's archive remains; the per-job files were folded into it.
+    assert int(counter_files) == 1
+
+
+def test_compaction_round_trips_through_prometheus_mmap_files(tmp_path, monkeypatch):
+    # Pins the private mmap_dict API that compact_process_files relies on.
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    key = mmap_key("test_jobs", "test_jobs_total", ["queue"], ["reviews-small"], "Jobs")
+    for pid, value in ((101, 2.0), (102, 3.5)):
+        job_file = MmapedDict(str(tmp_path / f"counter_{pid}.db"))
+        job_file.write_value(key, value, 1700000000.0 + pid)
+        job_file.close()
+        compact_process_files(pid, archive_id=1)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["counter_archive-1.db"]
+    values = list(MmapedDict.read_all_values_from_file(str(tmp_path / "counter_archive-1.db")))
+    assert [(stored_key, value, timestamp) for stored_key, value, timestamp, _ in values] == [
+        (key, 5.5, 1700000102.0)
+    ]
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.review_request import ReviewRequest
+from app.models.review_rollup import CommentDailyRollup, ReviewDailyRollup
+from app.schemas.review_schemas import ReviewComment
+from app.services.metrics_rollups import get_metrics_summary, percentile, record_completed, record_failed
+
+
+def _comment(severity: str, category: str) -> ReviewComment:
+    return ReviewComment(
+        file_path="app.py",
+        line_number_start=1,
+        line_number_end=1,
+        category=category,
+        severity=severity,
+        title="t",
+        body="b",
+    )
+
+
+LLM_METADATA = {"files_reviewed": 2, "tokens_prompt": 100, "tokens_completion": 20, "latency_ms": 1500}
+
+
+def test_rollups_accumulate_into_one_row_per_key(db):
+    api = ReviewRequest(id="a", source="github", status="completed", repo="org/api")
+    comments = [_comment("high", "security"), _comment("high", "security"), _comment("low", "style")]
+    for _ in range(3):
+        record_completed(db, api, "llm", comments, LLM_METADATA, 2.0)
+    record_failed(db, api, "llm")
+    db.commit()
+
+    row = db.scalar(select(ReviewDailyRollup))
+    assert db.scalar(select(func.count()).select_from(ReviewDailyRollup)) == 1
+    assert (row.reviews_completed, row.reviews_failed, row.comments_total) == (3, 1, 9)
+    assert (row.llm_tokens_prompt, row.llm_tokens_completion, row.llm_requests) == (300, 60, 3)
+    assert db.scalar(select(func.count()).select_from(CommentDailyRollup)) == 2
+
+
+def test_summary_reads_rollups_and_live_queue(db):
+    db.add(ReviewRequest(id="p", source="manual", status="pending"))
+    api = ReviewRequest(id="a", source="github", status="completed", repo="org/api")
+    web = ReviewRequest(id="w", source="github", status="completed", repo="org/web")
+    record_completed(db, api, "llm", [_comment("high", "security")], LLM_METADATA, 2.0)
+    record_completed(db, web, "multi-agent", [_comment("low", "style")] * 2, {"files_reviewed": 1}, 0.2)
+    record_failed(db, web, "llm")
+    db.commit()
+
+    summary = get_metrics_summary(db)
+    assert summary.reviews_by_status == {"pending": 1, "running": 0, "completed": 2, "failed": 1}
+    assert summary.reviews_total == 4
+    assert summary.comments_by_severity == {"high": 1, "low": 2}
+    assert summary.llm_tokens_total == 120
+    assert summary.llm_errors_total == 1
+    assert 1.0 < summary.llm_latency_p50 <= 2.5
+    assert [day.day for day in summary.daily] == [datetime.utcnow().date().isoformat()]
+
+    only_web = get_metrics_summary(db, repo="org/web")
+    assert only_web.comments_total == 2
+    assert only_web.reviews_by_status["pending"] == 0
+
+
+def test_percentile_interpolates_within_bucket():
+    # 10 samples in (1, 2.5], 10 in (2.5, 5].
+    assert percentile({4: 10, 5: 10}, 0.5) == pytest.approx(2.5)
+    assert percentile({4: 10, 5: 10}, 0.75) == pytest.approx(3.75)
+    assert percentile({}, 0.95) == 0.0
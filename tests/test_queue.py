@@ -0,0 +1,134 @@
+import asyncio
+from datetime import timedelta
+
+from rq import Queue
+from rq.job import Job
+
+from app.core.db import async_database_url
+from app.workers import queue as queue_module
+
+
+def _job(review_id: str) -> str:
+    return review_id
+
+
+class FakePipeline:
+    def __init__(self, calls: list) -> None:
+        self.calls = calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return []
+
+
+class FakeAsyncRedis:
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.calls)
+
+
+def _install(monkeypatch) -> FakeAsyncRedis:
+    fake = FakeAsyncRedis()
+    monkeypatch.setattr(queue_module, "get_async_redis_client", lambda: fake)
+    return fake
+
+
+def test_async_database_url_picks_async_drivers():
+    assert async_database_url("sqlite:///./reviews.db") == "sqlite+aiosqlite:///./reviews.db"
+    assert async_database_url("postgresql://u:p@db/ryzl") == "postgresql+asyncpg://u:p@db/ryzl"
+    assert async_database_url("postgresql+psycopg2://u:p@db/ryzl") == "postgresql+asyncpg://u:p@db/ryzl"
+
+
+def test_enqueue_async_writes_a_job_rq_can_restore(monkeypatch):
+    fake = _install(monkeypatch)
+    queue = Queue("reviews", connection=queue_module.redis_conn)
+
+    job = asyncio.run(queue_module.enqueue_async(queue, _job, "r1", job_id="r1", description="Process review r1"))
+
+    names = [name for name, _, _ in fake.calls]
+    assert names == ["sadd", "hset", "rpush"]
+    assert fake.calls[2][1] == (queue.key, "r1")
+
+    mapping = fake.calls[1][2]["mapping"]
+    restored = Job("r1", connection=queue_module.redis_conn)
+    restored.restore({key.encode(): value if isinstance(value, bytes) else str(value).encode() for key, value in mapping.items()})
+    assert restored.origin == "reviews"
+    assert restored.args == ("r1",)
+    assert restored.func_name == job.func_name
+
+
+def test_enqueue_async_with_delay_goes_to_scheduled_registry(monkeypatch):
+    fake = _install(monkeypatch)
+    queue = Queue("reviews", connection=queue_module.redis_conn)
+
+    asyncio.run(queue_module.enqueue_async(queue, _job, "r2", job_id="r2", delay=timedelta(seconds=10)))
+
+    name, args, _ = fake.calls[-1]
+    assert name == "zadd"
+    assert args[0] == "rq:scheduled:reviews"
+    assert list(args[1]) == ["r2"]
+
+
+def test_estimate_changed_lines_ignores_file_headers():
+    diff = "diff --git a/x b/x\n--- a/x\n+++ b/x\n@@ -1,2 +1,2 @@\n-old\n+new\n keep\n"
+
+    assert queue_module.estimate_changed_lines(diff) == 2
+    assert queue_module.estimate_changed_lines(None) is None
+
+
+def test_select_review_queue_routes_by_source_and_size(monkeypatch):
+    monkeypatch.setattr(queue_module.settings, "review_interactive_max_lines", 10)
+    monkeypatch.setattr(queue_module.settings, "review_small_max_lines", 100)
+
+    assert queue_module.select_review_queue("manual", 5).name == "reviews-interactive"
+    assert queue_module.select_review_queue("manual", 50).name == "reviews-small"
+    assert queue_module.select_review_queue("github", 5).name == "reviews-small"
+    assert queue_module.select_review_queue("github", 500).name == "reviews-large"
+    assert queue_module.select_review_queue("github", None).name == "reviews-large"
+
+
+def test_cancel_pending_job_uses_the_jobs_own_queue(monkeypatch):
+    calls: list = []
+
+    class FakeCancelRedis(FakeAsyncRedis):
+        async def hmget(self, key, *fields):
+            return [b"queued", b"reviews-small"]
+
+    fake = FakeCancelRedis()
+    fake.calls = calls
+    monkeypatch.setattr(queue_module, "get_async_redis_client", lambda: fake)
+
+    assert asyncio.run(queue_module.cancel_pending_job_async("r1"))
+    assert calls[0] == ("lrem", ("rq:queue:reviews-small", 0, "r1"), {})
+
+
+def test_enqueue_deferred_keeps_a_stable_id_and_remaining_retries(monkeypatch):
+    calls: list = []
+
+    class FakeQueue:
+        def enqueue_in(self, delay, func, *args, **kwargs):
+            calls.append((delay, args, kwargs))
+
+    monkeypatch.setattr(queue_module.random, "randint", lambda low, high: 0)
+    job = Job.create(_job, args=("r1",), id="github-sync:r1", connection=queue_module.redis_conn)
+    job.retries_left, job.retry_intervals = 2, [10, 30]
+
+    queue_module.enqueue_deferred(FakeQueue(), _job, "r1", 5, "Publish review", job=job, reason="No free slot")
+
+    delay, args, kwargs = calls[0]
+    assert delay == timedelta(seconds=5)
+    assert args == ("r1",)
+    assert kwargs["job_id"] == "github-sync:r1:deferred"
+    assert (kwargs["retry"].max, kwargs["retry"].intervals) == (2, [10, 30])
+    assert "No free slot" in kwargs["description"]
+    assert queue_module.deferred_job_id("github-sync:r1:deferred") == "github-sync:r1"
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from rq import Queue
+
+from app.workers import queue_metrics
+from app.workers.queue_metrics import JOB_RUN, JOB_WAIT, QUEUE_JOBS, QUEUE_OLDEST_JOB_AGE, WORKERS, QueueMetricsExporter
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _job(job_id, enqueued, started=None, ended=None):
+    return SimpleNamespace(id=job_id, enqueued_at=enqueued, started_at=started, ended_at=ended)
+
+
+def _sample(histogram, **labels):
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+def test_poll_exports_depths_head_age_and_new_completions(fake_redis, monkeypatch):
+    queue = Queue("metrics-test", connection=fake_redis)
+    finished_key = f"rq:finished:{queue.name}"
+    fake_redis.lists[queue.key] = [b"head", b"next"]
+    fake_redis.zsets[f"rq:wip:{queue.name}"] = {b"running": 1.0}
+    fake_redis.zsets[finished_key] = {b"old": 100.0}
+
+    jobs = {
+        "head": _job("head", NOW - timedelta(seconds=42)),
+        "new": _job("new", NOW - timedelta(seconds=30), NOW - timedelta(seconds=20), NOW - timedelta(seconds=5)),
+    }
+    monkeypatch.setattr(queue_metrics.Job, "fetch_many", lambda ids, connection: [jobs.get(i) for i in ids])
+    workers = [
+        SimpleNamespace(get_state=lambda: "busy", queue_names=lambda: [queue.name]),
+        SimpleNamespace(get_state=lambda: "idle", queue_names=lambda: [queue.name, "other"]),
+    ]
+    monkeypatch.setattr(queue_metrics.Worker, "all", lambda connection: workers)
+
+    exporter = QueueMetricsExporter([queue], connection=fake_redis, clock=NOW.timestamp)
+    exporter.poll()
+
+    assert QUEUE_JOBS.labels(queue=queue.name, state="queued")._value.get() == 2
+    assert QUEUE_JOBS.labels(queue=queue.name, state="started")._value.get() == 1
+    assert QUEUE_OLDEST_JOB_AGE.labels(queue=queue.name)._value.get() == 42
+    assert WORKERS.labels(queue=queue.name, state="busy")._value.get() == 1
+    assert WORKERS.labels(queue=queue.name, state="idle")._value.get() == 1
+    # Jobs already in the registry at start-up are not replayed.
+    assert _sample(JOB_WAIT, queue=queue.name) == 0
+
+    fake_redis.zsets[finished_key][b"new"] = 200.0
+    exporter.poll()
+    exporter.poll()
+
+    assert _sample(JOB_WAIT, queue=queue.name) == 1
+    assert _sample(JOB_RUN, queue=queue.name, status="finished") == 1
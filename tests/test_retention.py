@@ -0,0 +1,96 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.core.config import Settings
+from app.models.diff_blob import DiffBlob
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.diff_store import attach_diff, store_diff
+from app.services.retention import run_retention
+from app.workers import maintenance_worker
+
+NOW = datetime(2026, 6, 1)
+
+
+def _review(db, review_id, status, age_days, diff):
+    review = ReviewRequest(id=review_id, source="manual", status=status, created_at=NOW - timedelta(days=age_days))
+    attach_diff(review, store_diff(db, diff))
+    db.add(review)
+    if status == "completed":
+        db.add(ReviewResult(review_request_id=review_id, summary=f"summary {review_id}", raw_response="{}"))
+    return review
+
+
+def test_retention_drops_diffs_then_archives_old_reviews(db, tmp_path):
+    _review(db, "old-done", "completed", 400, "diff old")
+    _review(db, "old-failed", "failed", 300, "diff failed")
+    _review(db, "stale-1", "completed", 30, "diff shared")
+    _review(db, "stale-2", "completed", 31, "diff stale")
+    _review(db, "fresh", "completed", 1, "diff shared")
+    _review(db, "old-pending", "pending", 400, "diff pending")
+    db.commit()
+    config = Settings(
+        retention_review_days=180,
+        retention_diff_days=14,
+        retention_archive_dir=str(tmp_path),
+        retention_batch_size=1,
+        retention_batch_pause_seconds=0.25,
+    )
+    pauses = []
+
+    report = run_retention(db, config, now=NOW, sleep=pauses.append)
+
+    assert (report.diffs_dropped, report.reviews_archived) == (3, 2)
+    assert pauses and set(pauses) == {0.25}
+    remaining = {review.id: review for review in db.scalars(select(ReviewRequest))}
+    assert set(remaining) == {"stale-1", "stale-2", "fresh", "old-pending"}
+    assert remaining["stale-1"].diff_sha256 is None and remaining["fresh"].diff_sha256 is not None
+    # The shared blob survives for "fresh"; the blobs of old and stale reviews are gone.
+    assert db.scalar(select(func.count()).select_from(DiffBlob)) == 2
+    assert db.scalar(select(func.count()).select_from(ReviewResult)) == 3
+
+    with gzip.open(report.archive_path, "rt") as archive:
+        records = [json.loads(line) for line in archive]
+    assert [record["review"]["id"] for record in records] == ["old-done", "old-failed"]
+    assert records[0]["result"]["summary"] == "summary old-done"
+    assert records[1]["diff"] == "diff failed"
+
+
+def test_max_batches_bounds_a_run(db):
+    for index in range(5):
+        _review(db, f"r{index}", "completed", 400, f"diff {index}")
+    db.commit()
+    config = Settings(
+        retention_review_days=180, retention_diff_days=0, retention_archive_dir="", retention_batch_size=1,
+        retention_max_batches=3, retention_batch_pause_seconds=0,
+    )
+
+    assert run_retention(db, config, now=NOW).reviews_archived == 3
+    assert run_retention(db, config, now=NOW).reviews_archived == 2
+
+
+class FakeQueue:
+    def __init__(self):
+        self.scheduled = []
+
+    def enqueue_in(self, delay, func, **kwargs):
+        self.scheduled.append((delay, func, kwargs["job_id"]))
+
+
+def test_only_one_retention_run_is_scheduled_at_a_time(fake_redis, monkeypatch):
+    queue = FakeQueue()
+    monkeypatch.setattr(maintenance_worker, "redis_conn", fake_redis)
+    monkeypatch.setattr(maintenance_worker, "maintenance_queue", queue)
+    monkeypatch.setattr(maintenance_worker, "run_retention_once", lambda: None)
+    monkeypatch.setattr(maintenance_worker, "reap_abandoned_reviews_once", lambda: [])
+
+    assert maintenance_worker.ensure_retention_scheduled() is True
+    assert maintenance_worker.ensure_retention_scheduled() is False
+    maintenance_worker.retention_job()
+
+    assert len(queue.scheduled) == 2
+    assert queue.scheduled[0][1] is maintenance_worker.retention_job
+    assert queue.scheduled[0][2] != queue.scheduled[1][2]
@@ -0,0 +1,91 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes.reviews import get_review
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services import review_cache, review_state
+from app.services.retention import archive_old_reviews
+
+
+@pytest.fixture()
+def fake_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(review_cache, "get_redis_client", lambda: fake_redis)
+    return fake_redis
+
+
+def _add_review(engine, status: str) -> str:
+    db = sessionmaker(bind=engine)()
+    review = ReviewRequest(source="manual", status=status)
+    db.add(review)
+    db.flush()
+    if status == "completed":
+        payload = {"comments": [], "metadata": {"agents_run": ["security"], "total_comments": 0}}
+        db.add(ReviewResult(review_request_id=review.id, summary="Looks good", raw_response=json.dumps(payload)))
+    db.commit()
+    review_id = review.id
+    db.close()
+    return review_id
+
+
+def test_completed_review_is_served_from_cache_with_etag(fake_redis, engine):
+    review_id = _add_review(engine, "completed")
+    db = sessionmaker(bind=engine)()
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    first = get_review(review_id, None, db)
+    assert first.status_code == 200
+    assert json.loads(first.body)["agents"] == ["security"]
+    assert len(queries) == 2
+
+    etag = first.headers["ETag"]
+    again = get_review(review_id, None, db)
+    not_modified = get_review(review_id, f'W/{etag}, "other"', db)
+
+    assert again.body == first.body
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert len(queries) == 2
+
+
+def test_unfinished_review_is_not_cached(fake_redis, engine):
+    review_id = _add_review(engine, "running")
+    db = sessionmaker(bind=engine)()
+
+    response = get_review(review_id, None, db)
+
+    assert json.loads(response.body)["status"] == "running"
+    assert get_review(review_id, response.headers["ETag"], db).status_code == 304
+    assert fake_redis.hashes == {}
+
+
+def test_invalidate_drops_entry(fake_redis):
+    fake_redis.hset("review:response:r1", mapping={"body": "{}", "etag": '"x"'})
+
+    review_cache.invalidate_response("r1")
+
+    assert review_cache.get_cached_response("r1") is None
+
+
+def test_leaving_a_cached_status_drops_entry(fake_redis, engine, monkeypatch):
+    review_id = _add_review(engine, "completed")
+    db = sessionmaker(bind=engine)()
+    get_review(review_id, None, db)
+    monkeypatch.setitem(review_state.TRANSITIONS, "completed", {"pending"})
+
+    assert review_state.transition(db, db.get(ReviewRequest, review_id), "completed", "pending")
+    assert review_cache.get_cached_response(review_id) is None
+
+
+def test_retention_drops_entries_of_deleted_reviews(fake_redis, engine):
+    review_id = _add_review(engine, "completed")
+    db = sessionmaker(bind=engine)()
+    get_review(review_id, None, db)
+
+    assert archive_old_reviews(db, datetime(2100, 1, 1), batch_size=10, archive=None)[0] == 1
+    assert review_cache.get_cached_response(review_id) is None
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+import app.models  # noqa: F401  (register tables)
+from app.api.routes import github as github_routes
+from app.core.db import Base
+from app.models.review_request import ReviewRequest
+from app.services import review_coalescing as coalescing
+from app.services.admission import AdmissionDecision
+
+
+@pytest.fixture()
+def fake_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(coalescing, "get_redis_client", lambda: fake_redis)
+    return fake_redis
+
+
+def _review(review_id: str, source: str = "github"):
+    return SimpleNamespace(id=review_id, source=source, repo="owner/repo", pr_number="5")
+
+
+def test_newer_push_supersedes_older_review(fake_redis):
+    assert coalescing.register_latest_review("owner/repo", 5, "first") is None
+    assert coalescing.register_latest_review("owner/repo", 5, "second") == "first"
+
+    assert coalescing.is_superseded(_review("first"))
+    assert not coalescing.is_superseded(_review("second"))
+
+
+def test_other_pull_requests_and_manual_reviews_are_independent(fake_redis):
+    coalescing.register_latest_review("owner/repo", 6, "other-pr")
+
+    assert not coalescing.is_superseded(_review("first"))
+    assert not coalescing.is_superseded(_review("manual", source="manual"))
+
+
+def _webhook_request(body: bytes) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "path": "/github/webhook", "headers": []}, receive)
+
+
+def test_review_is_failed_when_its_job_cannot_be_queued(monkeypatch):
+    body = json.dumps(
+        {
+            "action": "synchronize",
+            "repository": {"full_name": "owner/repo"},
+            "pull_request": {"number": 5, "head": {"sha": "abc"}, "additions": 1, "deletions": 1},
+        }
+    ).encode()
+    signature = "sha256=" + hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+    settings = SimpleNamespace(
+        github_webhook_secret="secret", github_ingest_mode="direct", github_webhook_debounce_seconds=0
+    )
+    released = []
+
+    async def _noop(*args, **kwargs):
+        return None
+
+    async def _claim(delivery_id):
+        return True, None
+
+    async def _release(delivery_id):
+        released.append(delivery_id)
+
+    async def _admit(queue_name):
+        return AdmissionDecision(admitted=True, load=None)
+
+    async def _enqueue(*args, **kwargs):
+        raise RedisError("connection refused")
+
+    monkeypatch.setattr(github_routes, "get_settings", lambda: settings)
+    monkeypatch.setattr(github_routes, "claim_delivery", _claim)
+    monkeypatch.setattr(github_routes, "release_delivery", _release)
+    monkeypatch.setattr(github_routes, "check_admission", _admit)
+    monkeypatch.setattr(github_routes, "register_latest_review_async", _noop)
+    monkeypatch.setattr(github_routes, "enqueue_review_async", _enqueue)
+
+    async def _go():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            with pytest.raises(RedisError):
+                await github_routes.github_webhook(_webhook_request(body), "pull_request", signature, "d1", db)
+        async with sessions() as db:
+            statuses = (await db.scalars(select(ReviewRequest.status))).all()
+        await engine.dispose()
+        return statuses
+
+    assert asyncio.run(_go()) == ["failed"]
+    assert released == ["d1"]
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.review_comment import ReviewCommentRecord
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.schemas.review_schemas import ReviewComment
+from app.services.review_comments import backfill_review_comments, list_review_comments, replace_review_comments
+
+
+def _comment(index: int) -> ReviewComment:
+    return ReviewComment(
+        agent="security" if index % 2 else "style",
+        file_path=f"src/file_{index % 3}.py",
+        line_number_start=index,
+        line_number_end=index + 1,
+        category="security" if index % 2 else "style",
+        severity="high" if index % 4 == 1 else "low",
+        title=f"Finding {index}",
+        body="body",
+    )
+
+
+@pytest.fixture()
+def db(db):
+    db.add(ReviewRequest(id="r1", source="github", status="completed", repo="org/api"))
+    db.commit()
+    return db
+
+
+def test_pages_cover_every_finding_in_order(db):
+    review = db.get(ReviewRequest, "r1")
+    replace_review_comments(db, review, [_comment(index) for index in range(25)])
+    db.commit()
+
+    titles, cursor = [], None
+    while True:
+        rows, cursor = list_review_comments(db, "r1", after=cursor, limit=10)
+        titles.extend(row.title for row in rows)
+        if cursor is None:
+            break
+
+    assert titles == [f"Finding {index}" for index in range(25)]
+
+
+def test_filters_and_rerun_replaces_rows(db):
+    review = db.get(ReviewRequest, "r1")
+    replace_review_comments(db, review, [_comment(index) for index in range(8)])
+    replace_review_comments(db, review, [_comment(index) for index in range(12)])
+    db.commit()
+
+    rows, cursor = list_review_comments(db, "r1", severity="high", category="security")
+
+    assert [row.line_start for row in rows] == [1, 5, 9]
+    assert cursor is None
+    assert db.scalar(select(func.count()).select_from(ReviewCommentRecord)) == 12
+    assert {row.repo for row in rows} == {"org/api"}
+
+
+def test_backfill_reads_stored_results_once(db):
+    payload = {"comments": [_comment(index).model_dump() for index in range(3)], "metadata": {}}
+    db.add(ReviewResult(review_request_id="r1", summary="s", raw_response=json.dumps(payload)))
+    db.commit()
+
+    assert backfill_review_comments(db, batch_size=1) == 1
+    assert backfill_review_comments(db) == 0
+    assert db.scalar(select(func.count()).select_from(ReviewCommentRecord)) == 3
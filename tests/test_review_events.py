@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.api.routes import reviews as review_routes
+from app.services import review_events
+from app.services.review_events import stream_events
+
+
+class FakePubSub:
+    def __init__(self, messages) -> None:
+        self.messages = list(messages)
+        self.closed = False
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        if not self.messages:
+            return None
+        event, data = self.messages.pop(0)
+        return {"type": "message", "data": orjson.dumps({"event": event, "data": data})}
+
+    async def subscribe(self, *channels):
+        pass
+
+    async def unsubscribe(self, *channels):
+        pass
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def _collect(stream) -> list:
+    return [chunk async for chunk in stream]
+
+
+async def _connected() -> bool:
+    return False
+
+
+def test_stream_relays_events_until_terminal_status():
+    pubsub = FakePubSub(
+        [
+            ("status", {"id": "r1", "status": "running"}),
+            ("finding", {"id": "r1", "title": "SQL injection"}),
+            ("status", {"id": "r1", "status": "completed"}),
+            ("status", {"id": "r1", "status": "never-sent"}),
+        ]
+    )
+
+    chunks = asyncio.run(_collect(stream_events("r1", "pending", pubsub, _connected)))
+
+    assert chunks[0] == b'event: status\ndata: {"id":"r1","status":"pending"}\n\n'
+    assert [chunk.split(b"\n")[0] for chunk in chunks] == [
+        b"event: status",
+        b"event: status",
+        b"event: finding",
+        b"event: status",
+    ]
+    assert b"completed" in chunks[-1]
+    assert pubsub.closed
+
+
+def test_finished_review_gets_one_event_and_heartbeats_keep_idle_streams_alive():
+    assert len(asyncio.run(_collect(stream_events("r1", "failed", FakePubSub([]), _connected)))) == 1
+
+    disconnect_after = iter([False, False, True])
+
+    async def _disconnected() -> bool:
+        return next(disconnect_after)
+
+    chunks = asyncio.run(
+        _collect(stream_events("r1", "running", FakePubSub([]), _disconnected, heartbeat_seconds=0, poll_seconds=0))
+    )
+    assert chunks[1:] == [b": keep-alive\n\n", b": keep-alive\n\n"]
+
+
+def test_findings_are_published_in_one_pipeline(monkeypatch):
+    published = []
+
+    class FakePipeline:
+        def publish(self, channel, message):
+            published.append((channel, orjson.loads(message)))
+
+        def execute(self):
+            return []
+
+    class FakeRedis:
+        def pipeline(self, transaction=True):
+            return FakePipeline()
+
+    monkeypatch.setattr(review_events, "get_redis_client", lambda: FakeRedis())
+
+    review_events.publish_findings("r1", [{"title": "a"}, {"title": "b"}])
+
+    assert [channel for channel, _ in published] == ["review:events:r1", "review:events:r1"]
+    assert published[1][1] == {"event": "finding", "data": {"id": "r1", "title": "b"}}
+
+
+def test_event_stream_closes_its_subscription_when_the_status_lookup_fails(monkeypatch):
+    pubsub = FakePubSub([])
+
+    async def _lookup_fails(db, review_id):
+        raise OperationalError("SELECT status", {}, Exception("database is locked"))
+
+    class _Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(review_routes, "get_async_redis_client", lambda: SimpleNamespace(pubsub=lambda: pubsub))
+    monkeypatch.setattr(review_routes, "AsyncSessionLocal", _Session)
+    monkeypatch.setattr(review_routes, "get_review_status_async", _lookup_fails)
+
+    with pytest.raises(OperationalError):
+        asyncio.run(review_routes.stream_review_events("r1", None))
+    assert pubsub.closed
@@ -0,0 +1,146 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (register tables)
+from app.core.db import Base
+from app.models.diff_blob import DiffBlob
+from app.models.review_comment import ReviewCommentRecord
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.diff_store import attach_diff, review_diff, store_diff
+from app.services.review_export import (
+    InvalidRecordError,
+    import_review_records,
+    iter_review_records,
+    parse_records,
+)
+
+START = datetime(2026, 1, 1)
+RAW_RESPONSE = json.dumps(
+    {
+        "comments": [
+            {
+                "agent": "security",
+                "file_path": "app.py",
+                "line_number_start": 3,
+                "line_number_end": 4,
+                "category": "security",
+                "severity": "high",
+                "title": "Hardcoded secret",
+                "body": "Move it to settings.",
+            }
+        ],
+        "metadata": {},
+    }
+)
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+@pytest.fixture()
+def source():
+    session = _session()
+    for index in range(5):
+        review = ReviewRequest(
+            id=f"r{index}",
+            source="github",
+            status="completed" if index % 2 == 0 else "failed",
+            repo="org/api",
+            pr_number=index,
+            created_at=START + timedelta(hours=index),
+        )
+        attach_diff(review, store_diff(session, f"diff {index % 2}"))
+        session.add(review)
+        if review.status == "completed":
+            session.add(ReviewResult(review_request_id=review.id, summary=f"summary {index}", raw_response=RAW_RESPONSE))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _ndjson(records):
+    return [json.dumps(record) + "\n" for record in records]
+
+
+def test_export_is_oldest_first_and_filterable(source):
+    records = list(iter_review_records(source, status="completed", batch_size=2))
+
+    assert [record["review"]["id"] for record in records] == ["r0", "r2", "r4"]
+    assert records[0]["review"]["created_at"] == "2026-01-01T00:00:00"
+    assert records[0]["result"]["summary"] == "summary 0"
+    assert records[0]["diff"] is None
+    failed = list(iter_review_records(source, status="failed", include_diff=True))
+    assert [(record["result"], record["diff"]) for record in failed] == [(None, "diff 1"), (None, "diff 1")]
+
+
+def test_round_trip_rebuilds_diffs_results_and_findings(source):
+    lines = _ndjson(iter_review_records(source, include_diff=True, batch_size=2))
+    target = _session()
+
+    report = import_review_records(target, parse_records(lines), batch_size=2)
+
+    assert (report.imported, report.skipped) == (5, 0)
+    imported = target.get(ReviewRequest, "r3")
+    assert imported.status == "failed"
+    assert imported.created_at == START + timedelta(hours=3)
+    assert review_diff(target, imported) == "diff 1"
+    assert target.scalar(select(func.count()).select_from(DiffBlob)) == 2
+    assert target.scalar(select(ReviewResult.summary).where(ReviewResult.review_request_id == "r4")) == "summary 4"
+    findings = target.scalars(select(ReviewCommentRecord).order_by(ReviewCommentRecord.review_request_id)).all()
+    assert [(row.review_request_id, row.repo, row.severity) for row in findings] == [
+        ("r0", "org/api", "high"),
+        ("r2", "org/api", "high"),
+        ("r4", "org/api", "high"),
+    ]
+    assert _ndjson(iter_review_records(target, include_diff=True)) == lines
+
+
+def test_import_skips_existing_and_duplicate_ids(source):
+    lines = _ndjson(iter_review_records(source))
+
+    report = import_review_records(source, parse_records(lines + lines[:1]), batch_size=10)
+
+    assert (report.imported, report.skipped) == (0, 6)
+    assert source.scalar(select(func.count()).select_from(ReviewRequest)) == 5
+
+
+def _record(**review):
+    fields = {"id": "r1", "source": "manual", "status": "completed", "created_at": "2026-01-01T00:00:00"}
+    fields.update(review)
+    return {"review": fields, "result": None, "diff": None}
+
+
+def test_parse_records_reports_the_bad_line():
+    lines = _ndjson([_record()]) + ["\n", "not json\n"]
+
+    with pytest.raises(InvalidRecordError, match="line 12"):
+        list(parse_records(lines, first_line=10))
+    with pytest.raises(InvalidRecordError, match="line 1: not a review record"):
+        list(parse_records(['{"id": "r1"}']))
+
+
+@pytest.mark.parametrize(
+    "record, error",
+    [
+        (_record(source=None), "review.source is missing"),
+        (_record(status="running"), "review r1 is running; only finished reviews can be imported"),
+        (_record(created_at="yesterday"), "review.created_at is not an ISO timestamp"),
+        (_record(updated_at=5), "review.updated_at is not an ISO timestamp"),
+        ({**_record(), "result": {"summary": "s", "created_at": "2026-13-01"}}, "result.created_at is not an ISO"),
+        ({**_record(), "diff": ["x"]}, "diff is not a string"),
+    ],
+)
+def test_parse_records_rejects_records_it_cannot_import(record, error):
+    with pytest.raises(InvalidRecordError, match=f"line 1: {error}"):
+        list(parse_records(_ndjson([record])))
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models.review_request import ReviewRequest
+from app.services.review_service import InvalidCursorError, decode_cursor, encode_cursor, list_reviews
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture()
+def db(db):
+    # Pairs share a timestamp so paging has to break ties on id.
+    db.add_all(
+        ReviewRequest(
+            id=f"r{index:02d}",
+            source="github" if index % 2 else "manual",
+            status="completed" if index % 3 == 0 else "pending",
+            repo="org/api" if index < 6 else "org/web",
+            diff_snapshot="x" * 1000,
+            created_at=START + timedelta(minutes=index // 2),
+        )
+        for index in range(10)
+    )
+    db.commit()
+    return db
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(db):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = list_reviews(db, limit=3, cursor=cursor)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            break
+
+    assert seen == [f"r{index:02d}" for index in reversed(range(10))]
+
+
+def test_filters_combine(db):
+    rows, cursor = list_reviews(
+        db, repo="org/api", status="pending", created_after=START + timedelta(minutes=1), limit=10
+    )
+
+    assert [row.id for row in rows] == ["r05", "r04", "r02"]
+    assert cursor is None
+
+
+def test_listing_never_selects_the_diff(db, engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    list_reviews(db, limit=5)
+
+    assert statements and all("diff_snapshot" not in statement for statement in statements)
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(START, "r01")) == (START, "r01")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
@@ -1,6 +1,6 @@
 import textwrap
 
-from app.review_pipeline.multi_agent_pipeline import run_multi_agent_review
+from app.review_pipeline.multi_agent_pipeline import parse_file_patch, run_multi_agent_review
 from app.review_pipeline.stub_pipeline import run_stubbed_review
 
 
@@ -59,3 +59,14 @@ def test_stub_pipeline_handles_missing_diff():
     assert comments == []
     assert metadata["total_comments"] == 0
     assert metadata["files_reviewed"] == 0
+
+
+def test_parse_file_patch_tracks_new_file_line_numbers():
+    parsed = parse_file_patch(
+        "app/sample.py",
+        "@@ -3,3 +3,4 @@ def f():\n context\n-old\n+new\n+another\n context\n\\ No newline at end of file",
+    )
+
+    assert parsed.path == "app/sample.py"
+    assert parsed.additions == [(4, "new"), (5, "another")]
+    assert parsed.deletions == [(4, "old")]
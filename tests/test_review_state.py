@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.review_comment import ReviewCommentRecord
+from app.models.review_request import ReviewRequest
+from app.models.review_result import ReviewResult
+from app.services.review_service import create_review_request
+from app.services.review_state import InvalidTransitionError, claim_review, transition, upsert_result
+from app.workers import review_worker
+
+DIFF = "diff --git a/app.py b/app.py\n@@ -1,2 +1,2 @@\n-x = 1\n+password='hunter2'\n"
+
+
+@pytest.fixture()
+def sessions(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def test_only_one_claim_wins(sessions):
+    db = sessions()
+    review = create_review_request(db, source="manual", diff=DIFF, repo=None, pr_number=None)
+
+    first = claim_review(sessions(), review.id)
+    second = claim_review(sessions(), review.id)
+
+    assert first is not None and first.status == "running"
+    assert second is None
+
+
+def test_transitions_are_guarded(sessions):
+    db = sessions()
+    review = create_review_request(db, source="manual", diff=DIFF, repo=None, pr_number=None)
+
+    assert transition(db, review, "running", "completed") is False
+    with pytest.raises(InvalidTransitionError):
+        transition(db, review, "pending", "completed")
+
+
+def test_upsert_result_keeps_one_row(sessions):
+    db = sessions()
+    review = create_review_request(db, source="manual", diff=DIFF, repo=None, pr_number=None)
+
+    first = upsert_result(db, review.id, "first", "{}")
+    second = upsert_result(db, review.id, "second", "{}")
+    db.commit()
+
+    assert second.summary == "second" and second.review_request_id == review.id
+    assert first is second
+
+    assert db.scalars(select(ReviewResult.summary)).all() == ["second"]
+
+
+def _isolate_worker(sessions, monkeypatch):
+    worker_sessions = sessionmaker(bind=sessions.kw["bind"], autoflush=False)
+    monkeypatch.setattr(review_worker, "SessionLocal", worker_sessions)
+    for name in ("publish_status", "publish_findings", "cache_response", "release_tenant_slot", "record_completion"):
+        monkeypatch.setattr(review_worker, name, lambda *args, **kwargs: None)
+    monkeypatch.setattr(review_worker, "is_superseded", lambda review: False)
+    return worker_sessions
+
+
+def test_job_commits_twice_and_runs_once(sessions, monkeypatch):
+    review = create_review_request(sessions(), source="manual", diff=DIFF, repo=None, pr_number=None)
+    commits = []
+    worker_sessions = _isolate_worker(sessions, monkeypatch)
+    event.listen(worker_sessions, "after_commit", lambda session: commits.append(session))
+    completions = []
+    monkeypatch.setattr(review_worker, "record_completion", lambda queue, review_id: completions.append(review_id))
+
+    review_worker.process_review_job(review.id)
+    review_worker.process_review_job(review.id)
+
+    db = sessions()
+    assert len(commits) == 2
+    assert completions == [review.id]
+    assert db.get(ReviewRequest, review.id).status == "completed"
+    assert db.scalar(select(func.count()).select_from(ReviewResult)) == 1
+    assert db.scalar(select(func.count()).select_from(ReviewCommentRecord)) > 0
+
+
+def test_async_job_timeout_marks_review_failed(sessions, monkeypatch):
+    review = create_review_request(sessions(), source="manual", diff=DIFF, repo=None, pr_number=None)
+    _isolate_worker(sessions, monkeypatch)
+
+    class HangingOrchestrator:
+        async def arun(self, diff):
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(review_worker, "get_orchestrator", lambda mode: HangingOrchestrator())
+
+    async def _run_with_timeout():
+        await asyncio.wait_for(review_worker.process_review_job_async(review.id), 0.2)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_run_with_timeout())
+
+    assert sessions().get(ReviewRequest, review.id).status == "failed"
+
+
+def test_job_frees_its_fair_slot_even_when_nothing_is_claimed(sessions, monkeypatch):
+    review = create_review_request(sessions(), source="manual", diff=DIFF, repo=None, pr_number=None)
+    _isolate_worker(sessions, monkeypatch)
+    released = []
+    monkeypatch.setattr(review_worker, "release_tenant_slot", lambda *args: released.append(args))
+    db = sessions()
+    transition(db, review, "pending", "superseded")
+    db.commit()
+
+    review_worker.process_review_job(review.id, fair_tenant="repo:o/r")
+
+    assert released == [(review.id, "repo:o/r")]
+
+
+def test_reaper_fails_reviews_abandoned_by_a_crashed_worker(sessions, monkeypatch):
+    crashed = create_review_request(sessions(), source="manual", diff=DIFF, repo=None, pr_number=None)
+    live = create_review_request(sessions(), source="manual", diff=DIFF, repo=None, pr_number=None)
+    claim_review(sessions(), live.id)
+    db = sessions()
+    # The worker claimed the review an hour ago and died without finishing it.
+    transition(db, crashed, "pending", "running")
+    db.execute(
+        update(ReviewRequest)
+        .where(ReviewRequest.id == crashed.id)
+        .values(updated_at=datetime.utcnow() - timedelta(hours=1))
+    )
+    db.commit()
+    _isolate_worker(sessions, monkeypatch)
+    monkeypatch.setattr(review_worker.settings, "review_lease_seconds", 600)
+
+    assert review_worker.reap_abandoned_reviews(sessions()) == [crashed.id]
+    assert review_worker.reap_abandoned_reviews(sessions()) == []
+    db = sessions()
+    assert db.get(ReviewRequest, crashed.id).status == "failed"
+    assert db.get(ReviewRequest, live.id).status == "running"
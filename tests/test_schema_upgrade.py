@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (register tables)
+from app.core.db import Base
+from app.core.schema import upgrade_schema
+from app.services.review_service import list_reviews
+
+# review_requests as created before diffs, head SHAs and listing indexes were added.
+LEGACY_REVIEW_REQUESTS = """
+CREATE TABLE review_requests (
+    id VARCHAR NOT NULL PRIMARY KEY,
+    source VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    diff_snapshot TEXT,
+    repo VARCHAR,
+    pr_number VARCHAR,
+    created_at DATETIME,
+    updated_at DATETIME
+)
+"""
+
+
+def test_upgrade_adds_missing_columns_tables_and_indexes_once():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(LEGACY_REVIEW_REQUESTS)
+        connection.exec_driver_sql(
+            "INSERT INTO review_requests (id, source, status, created_at)"
+            " VALUES ('old', 'manual', 'completed', '2025-01-01')"
+        )
+
+    applied = upgrade_schema(engine, Base.metadata)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("review_requests")}
+    assert {"diff_sha256", "diff_size", "diff_stored_size", "installation_id", "head_sha"} <= columns
+    indexes = {index["name"] for index in inspector.get_indexes("review_requests")}
+    assert "ix_review_requests_status_created_id" in indexes
+    assert "CREATE TABLE review_comments" in applied
+    assert upgrade_schema(engine, Base.metadata) == []
+
+    rows, _ = list_reviews(sessionmaker(bind=engine)())
+    assert [row.id for row in rows] == ["old"]